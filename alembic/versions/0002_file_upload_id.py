@@ -0,0 +1,36 @@
+"""Add the multipart upload ID to files.
+
+Databases created with create_all after multipart uploads were added already
+have the column, so it is only added when missing.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-01-06 00:00:01
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: str | None = "0001"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Apply the migration."""
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("file")}
+    if "upload_id" not in columns:
+        # A nullable column without a default is a metadata-only change in Postgres
+        op.add_column(
+            "file", sa.Column("upload_id", sa.String(length=512), nullable=True)
+        )
+
+
+def downgrade() -> None:
+    """Revert the migration."""
+    with op.batch_alter_table("file") as batch_op:
+        batch_op.drop_column("upload_id")
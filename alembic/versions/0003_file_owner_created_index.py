@@ -0,0 +1,56 @@
+"""Index files by (owner_id, created_at, id) for listings.
+
+Every file listing filters on owner_id and pages in (created_at, id) order,
+so this index turns listings into index range scans. It is built with
+CREATE INDEX CONCURRENTLY, which doesn't block writes to a large, live table.
+CONCURRENTLY can't run inside a transaction, hence the autocommit block.
+
+If a concurrent build fails, Postgres leaves an INVALID index behind, so the
+upgrade drops any index with this name before building it. That index can only
+be such a leftover: Alembic re-runs the migration only after it failed, and
+building the index is its last step.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-01-06 00:00:02
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: str | None = "0002"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+INDEX_NAME = "ix_file_owner_id_created_at_id"
+
+
+def upgrade() -> None:
+    """Apply the migration."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            INDEX_NAME,
+            table_name="file",
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            INDEX_NAME,
+            "file",
+            ["owner_id", "created_at", "id"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Revert the migration."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            INDEX_NAME,
+            table_name="file",
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,79 @@
+"""Track the upload status, ETag and real size of files.
+
+Existing files start out pending, so the upload reconciler checks each of them
+against S3 and marks the ones whose object never arrived as failed.
+
+size_bytes becomes a BIGINT, since multipart uploads can be up to 5 TiB. On
+Postgres this rewrites the table under an exclusive lock, so apply it at a
+quiet time on large installations.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-01-06 00:00:03
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: str | None = "0003"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+INDEX_NAME = "ix_file_status_created_at"
+
+
+def upgrade() -> None:
+    """Apply the migration."""
+    with op.batch_alter_table("file") as batch_op:
+        # A constant default doesn't rewrite the table on Postgres 11+
+        batch_op.add_column(
+            sa.Column(
+                "status", sa.String(length=16), server_default="pending", nullable=False
+            )
+        )
+        batch_op.add_column(sa.Column("etag", sa.String(length=128), nullable=True))
+        batch_op.alter_column(
+            "size_bytes",
+            existing_type=sa.Integer(),
+            type_=sa.BigInteger(),
+            existing_nullable=False,
+        )
+
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            INDEX_NAME,
+            table_name="file",
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            INDEX_NAME,
+            "file",
+            ["status", "created_at"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Revert the migration."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            INDEX_NAME,
+            table_name="file",
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
+
+    with op.batch_alter_table("file") as batch_op:
+        batch_op.alter_column(
+            "size_bytes",
+            existing_type=sa.BigInteger(),
+            type_=sa.Integer(),
+            existing_nullable=False,
+        )
+        batch_op.drop_column("etag")
+        batch_op.drop_column("status")
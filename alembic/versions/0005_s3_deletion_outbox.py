@@ -0,0 +1,40 @@
+"""Add the outbox of S3 objects waiting to be deleted.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2025-01-06 00:00:04
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: str | None = "0004"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Apply the migration."""
+    op.create_table(
+        "s3_deletion",
+        sa.Column("id", sa.String(length=36), nullable=False),
+        sa.Column("s3_key", sa.String(length=255), nullable=False),
+        sa.Column("attempts", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_s3_deletion_next_attempt_at", "s3_deletion", ["next_attempt_at"]
+    )
+
+
+def downgrade() -> None:
+    """Revert the migration."""
+    op.drop_index("ix_s3_deletion_next_attempt_at", table_name="s3_deletion")
+    op.drop_table("s3_deletion")
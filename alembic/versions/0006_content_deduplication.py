@@ -0,0 +1,82 @@
+"""Deduplicate uploads by content.
+
+Adds the SHA-256 of files, the reference counts of shared objects, and lets
+several files point at the same S3 key.
+
+Downgrading fails if files share an object, since s3_key becomes unique again.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2025-01-06 00:00:05
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: str | None = "0005"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+INDEX_NAME = "ix_file_owner_id_sha256"
+# Names the unnamed unique constraint on s3_key when SQLite's table is reflected
+NAMING_CONVENTION = {"uq": "uq_%(table_name)s_%(column_0_name)s"}
+
+
+def _s3_key_constraint_name() -> str:
+    """Get the name of the unique constraint on file.s3_key.
+
+    Returns:
+        Postgres' generated name, or the name NAMING_CONVENTION gives it on SQLite.
+    """
+    if op.get_context().dialect.name == "postgresql":
+        return "file_s3_key_key"
+    return "uq_file_s3_key"
+
+
+def upgrade() -> None:
+    """Apply the migration."""
+    op.create_table(
+        "blob",
+        sa.Column("s3_key", sa.String(length=255), nullable=False),
+        sa.Column("ref_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("s3_key"),
+    )
+    with op.batch_alter_table("file", naming_convention=NAMING_CONVENTION) as batch_op:
+        # A nullable column without a default is a metadata-only change in Postgres
+        batch_op.add_column(sa.Column("sha256", sa.String(length=64), nullable=True))
+        batch_op.drop_constraint(_s3_key_constraint_name(), type_="unique")
+
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            INDEX_NAME,
+            table_name="file",
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            INDEX_NAME,
+            "file",
+            ["owner_id", "sha256"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Revert the migration."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            INDEX_NAME,
+            table_name="file",
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
+
+    with op.batch_alter_table("file") as batch_op:
+        batch_op.create_unique_constraint(_s3_key_constraint_name(), ["s3_key"])
+        batch_op.drop_column("sha256")
+    op.drop_table("blob")
@@ -0,0 +1,60 @@
+"""Add per-user storage usage counters.
+
+The counters are filled from the existing files.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2025-01-06 00:00:06
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: str | None = "0006"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Apply the migration."""
+    op.create_table(
+        "user_usage",
+        sa.Column("user_id", sa.String(length=36), nullable=False),
+        sa.Column("file_count", sa.BigInteger(), nullable=False),
+        sa.Column("total_bytes", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+
+    user = sa.table("user", sa.column("id"))
+    file = sa.table("file", sa.column("owner_id"), sa.column("size_bytes"))
+    usage = sa.table(
+        "user_usage",
+        sa.column("user_id"),
+        sa.column("file_count"),
+        sa.column("total_bytes"),
+        sa.column("updated_at"),
+    )
+    op.execute(
+        usage.insert().from_select(
+            ["user_id", "file_count", "total_bytes", "updated_at"],
+            sa.select(
+                user.c.id,
+                sa.func.count(file.c.owner_id),
+                sa.func.coalesce(sa.func.sum(file.c.size_bytes), 0),
+                sa.func.current_timestamp(),
+            )
+            .select_from(user.outerjoin(file, file.c.owner_id == user.c.id))
+            .group_by(user.c.id),
+        )
+    )
+
+
+def downgrade() -> None:
+    """Revert the migration."""
+    op.drop_table("user_usage")
@@ -0,0 +1,91 @@
+"""Add full-text search over file names and descriptions.
+
+On Postgres, adds a stored generated tsvector column and a GIN index on
+(owner_id, search_vector), using the btree_gin extension. Adding the column
+rewrites the file table under an exclusive lock, so run this migration in a
+maintenance window on large databases; the index is then built concurrently.
+
+On SQLite, adds an FTS5 table kept in sync with file by triggers, filled from
+the existing files.
+
+The statements are copied from app.db.file_search so this migration doesn't
+change if that module does.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2025-01-06 00:00:07
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: str | None = "0007"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', translate(filename, '._-', '   ')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+)
+SQLITE_TRIGGERS = (
+    (
+        "CREATE TRIGGER file_search_insert AFTER INSERT ON file BEGIN "
+        "INSERT INTO file_search (file_id, owner_id, filename, description) "
+        "VALUES (new.id, new.owner_id, new.filename, new.description); END"
+    ),
+    (
+        "CREATE TRIGGER file_search_update "
+        "AFTER UPDATE OF owner_id, filename, description ON file BEGIN "
+        "UPDATE file_search SET owner_id = new.owner_id, filename = new.filename, "
+        "description = new.description WHERE file_id = old.id; END"
+    ),
+    (
+        "CREATE TRIGGER file_search_delete AFTER DELETE ON file BEGIN "
+        "DELETE FROM file_search WHERE file_id = old.id; END"
+    ),
+)
+
+
+def upgrade() -> None:
+    """Apply the migration."""
+    if op.get_context().dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+        op.execute(
+            "ALTER TABLE file ADD COLUMN search_vector tsvector "
+            f"GENERATED ALWAYS AS ({SEARCH_VECTOR}) STORED"
+        )
+        with op.get_context().autocommit_block():
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_file_search")
+            op.execute(
+                "CREATE INDEX CONCURRENTLY ix_file_search "
+                "ON file USING gin (owner_id, search_vector)"
+            )
+        return
+
+    op.execute(
+        "CREATE VIRTUAL TABLE file_search USING fts5("
+        "file_id UNINDEXED, owner_id UNINDEXED, filename, description)"
+    )
+    for trigger in SQLITE_TRIGGERS:
+        op.execute(trigger)
+    op.execute(
+        "INSERT INTO file_search (file_id, owner_id, filename, description) "
+        "SELECT id, owner_id, filename, description FROM file"
+    )
+
+
+def downgrade() -> None:
+    """Revert the migration."""
+    if op.get_context().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_file_search")
+        op.execute("ALTER TABLE file DROP COLUMN search_vector")
+        # btree_gin is left installed, since other objects may use it
+        return
+
+    for trigger in ("file_search_insert", "file_search_update", "file_search_delete"):
+        op.execute(f"DROP TRIGGER {trigger}")
+    op.execute("DROP TABLE file_search")
@@ -0,0 +1,58 @@
+"""Index files for each listing sort order and filter.
+
+Adds (owner_id, size_bytes, id) and (owner_id, filename, id) for listings
+sorted by size and name, like 0003 did for creation time, and
+(owner_id, content_type) and (owner_id, updated_at) for the filters without
+a sort order. The content type index uses varchar_pattern_ops on Postgres so
+prefix LIKE queries can use it whatever the database collation.
+
+The indexes are built with CREATE INDEX CONCURRENTLY, outside a transaction.
+Like 0003, each is dropped first if it exists, which on a re-run after a
+failure removes the INVALID leftover of the failed build.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2025-01-06 00:00:08
+"""
+
+from collections.abc import Sequence
+from typing import Any
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: str | None = "0008"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+INDEXES: dict[str, tuple[list[str], dict[str, Any]]] = {
+    "ix_file_owner_id_size_bytes_id": (["owner_id", "size_bytes", "id"], {}),
+    "ix_file_owner_id_filename_id": (["owner_id", "filename", "id"], {}),
+    "ix_file_owner_id_content_type": (
+        ["owner_id", "content_type"],
+        {"postgresql_ops": {"content_type": "varchar_pattern_ops"}},
+    ),
+    "ix_file_owner_id_updated_at": (["owner_id", "updated_at"], {}),
+}
+
+
+def upgrade() -> None:
+    """Apply the migration."""
+    with op.get_context().autocommit_block():
+        for name, (columns, options) in INDEXES.items():
+            op.drop_index(
+                name, table_name="file", if_exists=True, postgresql_concurrently=True
+            )
+            op.create_index(
+                name, "file", columns, postgresql_concurrently=True, **options
+            )
+
+
+def downgrade() -> None:
+    """Revert the migration."""
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.drop_index(
+                name, table_name="file", if_exists=True, postgresql_concurrently=True
+            )
@@ -0,0 +1,34 @@
+"""Add a version to per-user usage, bumped by every change to a user's files.
+
+Listings derive their ETag from it. Adding a NOT NULL column with a constant
+default is a metadata-only change in Postgres.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2025-01-06 00:00:09
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: str | None = "0009"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Apply the migration."""
+    op.add_column(
+        "user_usage",
+        sa.Column("version", sa.BigInteger(), server_default="0", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Revert the migration."""
+    with op.batch_alter_table("user_usage") as batch_op:
+        batch_op.drop_column("version")
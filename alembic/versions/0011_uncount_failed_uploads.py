@@ -0,0 +1,56 @@
+"""Stop counting failed uploads in per-user usage.
+
+Failed uploads used to keep their declared size counted until deleted. Their
+counts are taken out of user_usage, now that failing an upload releases them
+and deleting a failed upload no longer does.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2025-01-06 00:00:10
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0011"
+down_revision: str | None = "0010"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def _shift_failed_uploads(sign: str) -> None:
+    """Add or subtract every user's failed uploads from their counters.
+
+    Args:
+        sign: "+" to count the failed uploads, "-" to stop counting them.
+    """
+    op.execute(
+        f"""
+        UPDATE user_usage SET
+            file_count = file_count {sign} (
+                SELECT count(*) FROM file
+                WHERE file.owner_id = user_usage.user_id AND file.status = 'failed'
+            ),
+            total_bytes = total_bytes {sign} (
+                SELECT coalesce(sum(file.size_bytes), 0) FROM file
+                WHERE file.owner_id = user_usage.user_id AND file.status = 'failed'
+            ),
+            version = version + 1
+        WHERE EXISTS (
+            SELECT 1 FROM file
+            WHERE file.owner_id = user_usage.user_id AND file.status = 'failed'
+        )
+        """  # noqa: S608 - sign is one of two literals
+    )
+
+
+def upgrade() -> None:
+    """Apply the migration."""
+    _shift_failed_uploads("-")
+
+
+def downgrade() -> None:
+    """Revert the migration."""
+    _shift_failed_uploads("+")
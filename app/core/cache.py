@@ -0,0 +1,113 @@
+"""Bounded in-process caches with per-entry expiry."""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """Thread-safe LRU cache whose entries expire after a time-to-live.
+
+    When full, the least recently used entry is evicted. The cache is local to
+    the worker process: invalidating an entry doesn't reach other workers, so
+    the TTL bounds how long they can serve a stale value.
+
+    Attributes:
+        maxsize: Maximum number of entries. Zero disables the cache.
+        ttl: Default number of seconds an entry stays valid.
+        hits: Number of lookups that found a valid entry.
+        misses: Number of lookups that didn't.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries. Zero disables the cache.
+            ttl: Default number of seconds an entry stays valid.
+            clock: Function returning the current time in seconds.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> V | None:
+        """Get the value for a key, if present and not expired.
+
+        Args:
+            key: The key to look up.
+
+        Returns:
+            The cached value or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        """Store a value, evicting the least recently used entry if full.
+
+        Args:
+            key: The key to store the value under.
+            value: The value.
+            ttl: Number of seconds the entry stays valid. Defaults to self.ttl.
+        """
+        if self.maxsize <= 0:
+            return
+        expires_at = self._clock() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: K) -> None:
+        """Remove the entry for a key, if any.
+
+        Args:
+            key: The key to remove.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        """Get the cache's size and hit/miss counters.
+
+        Returns:
+            A dictionary with the hits, misses, size and maxsize.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
@@ -0,0 +1,44 @@
+"""Weak ETags and If-None-Match handling for conditional GETs.
+
+The ETags are derived from what changes with a resource (a file's updated_at,
+the version of a user's files) rather than from the response body, so a
+request can be answered with 304 Not Modified before the body is loaded or
+serialized.
+"""
+
+import hashlib
+
+
+def weak_etag(*parts: object) -> str:
+    """Build a weak ETag from the values that identify a representation.
+
+    Args:
+        *parts: Values that change whenever the representation does.
+
+    Returns:
+        The ETag, including the W/ prefix and quotes.
+    """
+    key = "\0".join(str(part) for part in parts)
+    digest = hashlib.blake2b(key.encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Check an If-None-Match header against an ETag, using weak comparison.
+
+    Args:
+        if_none_match: The header's value, if any.
+        etag: The current ETag of the resource.
+
+    Returns:
+        Whether the client's copy is current, so 304 can be returned.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
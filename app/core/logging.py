@@ -1,12 +1,18 @@
 """Logging configuration for the application."""
 
+import copy
 import json
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from typing import Any
 
 from app.core.config import settings
 
+# Writes the queued log records, while logging runs in queued mode
+_listener: QueueListener | None = None
+
 
 class JsonFormatter(logging.Formatter):
     """Formatter for outputting logs in JSON format for CloudWatch."""
@@ -66,11 +72,106 @@ class JsonFormatter(logging.Formatter):
         return json.dumps(log_record)
 
 
+class BoundedQueueHandler(QueueHandler):
+    """Queue handler that applies a drop policy when its queue is full.
+
+    Request threads only put records on the queue; a QueueListener thread
+    formats and writes them. When the writer falls behind, the policy decides
+    what happens to a new record:
+
+    - "drop_new": the new record is dropped.
+    - "drop_old": the oldest queued record is dropped to make room.
+    - "block": the logging thread waits for room, as synchronous logging would.
+
+    Attributes:
+        policy: The drop policy.
+        dropped: Number of records dropped so far.
+    """
+
+    def __init__(self, log_queue: queue.Queue, policy: str):
+        """Initialize the handler.
+
+        Args:
+            log_queue: The bounded queue the listener reads.
+            policy: The drop policy: "drop_new", "drop_old" or "block".
+        """
+        super().__init__(log_queue)
+        self.policy = policy
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Make a record safe to format later, on the listener's thread.
+
+        Unlike QueueHandler.prepare, the record isn't formatted here: the
+        message is merged with its arguments, which could change before the
+        listener gets to it, but exc_info is kept for the target handlers'
+        formatters.
+
+        Args:
+            record: The record being logged.
+
+        Returns:
+            A copy of the record to put on the queue.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Put a record on the queue, applying the drop policy if it's full.
+
+        Args:
+            record: The prepared record.
+        """
+        if self.policy == "block":
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            if self.policy != "drop_old":
+                self._count_drop()
+                return
+        try:
+            self.queue.get_nowait()
+            self.queue.task_done()
+            self._count_drop()
+            self.queue.put_nowait(record)
+        except (queue.Empty, queue.Full):
+            # Other threads took the room first
+            self._count_drop()
+
+    def _count_drop(self) -> None:
+        """Count a dropped record, under the handler's lock."""
+        with self.lock:
+            self.dropped += 1
+
+
+class _FlushingQueueListener(QueueListener):
+    """Queue listener whose stop waits for room on a full queue.
+
+    QueueListener.stop puts its sentinel with put_nowait, which fails on a full
+    bounded queue; waiting lets the listener drain the records ahead of it.
+    """
+
+    def enqueue_sentinel(self) -> None:
+        """Put the sentinel telling the listener thread to stop."""
+        self.queue.put(self._sentinel)
+
+
 def setup_logging() -> None:
     """Configure application logging.
 
     Sets up JSON formatting for logs in production and standard formatting in development.
+
+    With LOG_QUEUE_SIZE above zero, the root logger only queues records and a
+    background thread writes them to stdout and the log file, so logging calls
+    don't wait on those writes. Call shutdown_logging on shutdown to flush the
+    queue.
     """
+    shutdown_logging()
     root_logger = logging.getLogger()
 
     # Clear existing handlers to ensure we don't duplicate log output
@@ -103,9 +204,50 @@ def setup_logging() -> None:
             "Unable to set up file logging to /app/logs/app.log. Continuing with stdout only."
         )
 
+    if settings.LOG_QUEUE_SIZE > 0:
+        global _listener  # noqa: PLW0603
+        handlers = root_logger.handlers
+        log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+        _listener = _FlushingQueueListener(
+            log_queue, *handlers, respect_handler_level=True
+        )
+        root_logger.handlers = [
+            BoundedQueueHandler(log_queue, settings.LOG_QUEUE_FULL_POLICY)
+        ]
+        _listener.start()
+
     # Set propagate=False for some noisy third-party loggers to reduce log volume
     for logger_name in ("uvicorn", "uvicorn.access", "uvicorn.error"):
         logging.getLogger(logger_name).propagate = False
 
     # Log startup information
     logging.info(f"Logging initialized: {'DEBUG' if settings.DEBUG else 'PRODUCTION'} mode")
+
+
+def shutdown_logging() -> None:
+    """Write all queued log records and go back to logging synchronously.
+
+    Stops the listener thread started by setup_logging once it has written
+    every record queued before the call, and attaches its handlers to the root
+    logger directly, so records logged later in shutdown are still written.
+    Does nothing unless logging is queued.
+    """
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    root_logger = logging.getLogger()
+    queue_handlers = [
+        handler
+        for handler in root_logger.handlers
+        if isinstance(handler, BoundedQueueHandler)
+    ]
+    listener.stop()
+    for handler in queue_handlers:
+        root_logger.removeHandler(handler)
+    for handler in listener.handlers:
+        root_logger.addHandler(handler)
+        handler.flush()
+    dropped = sum(handler.dropped for handler in queue_handlers)
+    if dropped:
+        logging.warning(f"Dropped {dropped} log records while the log queue was full")
@@ -0,0 +1,89 @@
+"""Opaque cursor tokens for keyset pagination.
+
+A cursor holds the sort key of the last row of a page. The next page starts
+right after that key, so the database can seek straight to it in an index
+instead of scanning and discarding every earlier row as OFFSET does.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor can't be decoded."""
+
+
+def _json_default(value: Any) -> str:
+    """Serialize values the json module doesn't support natively.
+
+    Args:
+        value: The value to serialize.
+
+    Returns:
+        The value as a string.
+
+    Raises:
+        TypeError: If the value can't be serialized.
+    """
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Can't encode {type(value).__name__} in a cursor")
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of a row as an opaque cursor token.
+
+    Args:
+        *values: The sort key values, e.g. creation time and ID.
+
+    Returns:
+        A URL-safe cursor token.
+    """
+    payload = json.dumps(values, default=_json_default, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, length: int) -> list[Any]:
+    """Decode a cursor token back into sort key values.
+
+    Datetimes come back as ISO 8601 strings; use parse_cursor_datetime on them.
+
+    Args:
+        token: The cursor token.
+        length: The number of values the cursor must contain.
+
+    Returns:
+        The sort key values.
+
+    Raises:
+        InvalidCursorError: If the token is malformed.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursorError("Invalid pagination cursor")
+    if not isinstance(values, list) or len(values) != length:
+        raise InvalidCursorError("Invalid pagination cursor")
+    return values
+
+
+def parse_cursor_datetime(value: Any) -> datetime:
+    """Parse a datetime decoded from a cursor.
+
+    Args:
+        value: The decoded value.
+
+    Returns:
+        The datetime.
+
+    Raises:
+        InvalidCursorError: If the value isn't an ISO 8601 datetime.
+    """
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise InvalidCursorError("Invalid pagination cursor")
@@ -0,0 +1,171 @@
+"""Shared S3 client and presigner for the API application.
+
+Building a boto3 client is expensive: it resolves the endpoint, walks the
+credential provider chain and loads the S3 service model. boto3 clients are
+thread-safe once created, so each worker process builds a single client on
+first use and shares it across all request threads. The presigner for upload
+and download URLs is shared the same way and uses the same credentials.
+"""
+
+import threading
+
+import boto3
+from botocore.client import BaseClient
+from botocore.config import Config
+
+from app.core.config import settings
+from app.core.presign import S3Presigner
+
+# MinIO service in docker-compose, used when running in debug mode
+LOCAL_S3_ENDPOINT_URL = "http://minio:9000"
+
+_s3_session: boto3.session.Session | None = None
+_s3_client: BaseClient | None = None
+_s3_presigner: S3Presigner | None = None
+_s3_lock = threading.Lock()
+
+
+def build_s3_session() -> boto3.session.Session:
+    """Build a boto3 session holding the credentials from the application settings.
+
+    Returns:
+        A boto3 session with explicit credentials for MinIO or non-EC2
+        environments, and the default credential chain otherwise.
+    """
+    # Explicit credentials are always used for local MinIO. In production, if
+    # USE_INSTANCE_ROLE is False and real credentials are provided (not the MinIO
+    # defaults), use them as well (for testing or non-EC2 environments).
+    use_explicit_credentials = settings.DEBUG or (
+        not settings.USE_INSTANCE_ROLE
+        and settings.AWS_ACCESS_KEY_ID != "minio"
+        and settings.AWS_SECRET_ACCESS_KEY != "minio123"  # noqa: S105
+    )
+    if use_explicit_credentials:
+        return boto3.session.Session(
+            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+            region_name=settings.AWS_REGION,
+        )
+
+    # Without explicit credentials boto3 checks environment variables and instance role
+    return boto3.session.Session(region_name=settings.AWS_REGION)
+
+
+def build_s3_client(session: boto3.session.Session | None = None) -> BaseClient:
+    """Build a new S3 client from the application settings.
+
+    Args:
+        session: Session to create the client from. A new one is built if omitted.
+
+    Returns:
+        A boto3 S3 client configured for MinIO in debug mode and for AWS otherwise.
+    """
+    # Use a dedicated session: creating clients from the default session is not
+    # thread-safe, and this keeps credential resolution isolated to this client.
+    session = session or build_s3_session()
+
+    if settings.DEBUG:
+        # Local development with MinIO
+        return session.client(
+            "s3",
+            endpoint_url=LOCAL_S3_ENDPOINT_URL,
+            # Use path-style instead of virtual-hosted style (required for MinIO)
+            config=Config(
+                s3={"addressing_style": "path"},
+                max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+            ),
+        )
+
+    # Production AWS configuration
+    # Create a configuration with signature version 4, required for all regions
+    s3_config = Config(
+        signature_version="s3v4",
+        region_name=settings.AWS_REGION,
+        max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+    )
+    return session.client("s3", region_name=settings.AWS_REGION, config=s3_config)
+
+
+def build_s3_presigner(session: boto3.session.Session | None = None) -> S3Presigner:
+    """Build a new presigner from the application settings.
+
+    Args:
+        session: Session to take the credentials from. A new one is built if omitted.
+
+    Returns:
+        A presigner for the configured bucket, producing the same URLs as the client.
+    """
+    session = session or build_s3_session()
+
+    if settings.DEBUG:
+        return S3Presigner(
+            credentials=session.get_credentials(),
+            region=settings.AWS_REGION,
+            bucket=settings.S3_BUCKET_NAME,
+            endpoint_url=LOCAL_S3_ENDPOINT_URL,
+            addressing_style="path",
+        )
+
+    return S3Presigner(
+        credentials=session.get_credentials(),
+        region=settings.AWS_REGION,
+        bucket=settings.S3_BUCKET_NAME,
+    )
+
+
+def _get_s3_session() -> boto3.session.Session:
+    """Get the shared session. Must be called with the module lock held.
+
+    Returns:
+        The shared boto3 session.
+    """
+    global _s3_session  # noqa: PLW0603
+
+    if _s3_session is None:
+        _s3_session = build_s3_session()
+    return _s3_session
+
+
+def get_s3_client() -> BaseClient:
+    """Get the process-wide shared S3 client, building it on first use.
+
+    Returns:
+        The shared boto3 S3 client.
+    """
+    global _s3_client  # noqa: PLW0603
+
+    if _s3_client is None:
+        with _s3_lock:
+            # Check again inside the lock in case another thread built it first
+            if _s3_client is None:
+                _s3_client = build_s3_client(_get_s3_session())
+    return _s3_client
+
+
+def get_s3_presigner() -> S3Presigner:
+    """Get the process-wide shared presigner, building it on first use.
+
+    Returns:
+        The shared presigner.
+    """
+    global _s3_presigner  # noqa: PLW0603
+
+    if _s3_presigner is None:
+        with _s3_lock:
+            # Check again inside the lock in case another thread built it first
+            if _s3_presigner is None:
+                _s3_presigner = build_s3_presigner(_get_s3_session())
+    return _s3_presigner
+
+
+def reset_s3_client() -> None:
+    """Drop the shared S3 client and presigner so they are rebuilt on next use.
+
+    This is mainly useful in tests that change settings or mock AWS.
+    """
+    global _s3_session, _s3_client, _s3_presigner  # noqa: PLW0603
+
+    with _s3_lock:
+        _s3_session = None
+        _s3_client = None
+        _s3_presigner = None
@@ -1,12 +1,23 @@
 """Security utilities for the API application."""
 
+import asyncio
+import hashlib
+import math
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any
+from typing import Any, TypeVar
 
 from jose import jwt
+from jose.exceptions import JWTError
 from passlib.context import CryptContext
+from pydantic import ValidationError
 
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.schemas.token import TokenPayload
 
 # Password hashing setup
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -14,6 +25,94 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # JWT token ALGORITHM
 ALGORITHM = "HS256"
 
+T = TypeVar("T")
+
+
+class TokenRevokedError(JWTError):
+    """Raised when a revoked access token is used."""
+
+
+class PasswordHashingBusyError(Exception):
+    """Raised when too many password hashing jobs are already waiting."""
+
+
+class PasswordHashExecutor:
+    """Bounded thread pool dedicated to bcrypt hashing and verification.
+
+    bcrypt takes a few hundred milliseconds of CPU per call but releases the GIL,
+    so it runs well in threads. Running it in its own small pool keeps a burst of
+    logins from occupying the threads that other requests' blocking work runs
+    on. Jobs beyond max_pending are rejected instead of queueing without limit.
+
+    Attributes:
+        workers: Number of threads hashing passwords.
+        max_pending: Maximum number of jobs running or queued at once.
+        rejected: Number of jobs rejected because the pool was full.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        """Initialize the executor.
+
+        Args:
+            workers: Number of threads hashing passwords.
+            max_pending: Maximum number of jobs running or queued at once.
+        """
+        self.workers = workers
+        self.max_pending = max_pending
+        self.rejected = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hash"
+        )
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run a function in the pool and wait for its result.
+
+        Args:
+            fn: The function to run.
+            *args: Arguments for the function.
+
+        Returns:
+            The function's return value.
+
+        Raises:
+            PasswordHashingBusyError: If max_pending jobs are already waiting.
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordHashingBusyError("Too many password checks in progress")
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def stats(self) -> dict[str, int]:
+        """Get the pool's size and queue depth.
+
+        Returns:
+            A dictionary with the number of workers, jobs in progress, jobs queued
+            waiting for a worker, the queue limit and rejected jobs.
+        """
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "pending": self._pending,
+                "queued": max(0, self._pending - self.workers),
+                "max_pending": self.max_pending,
+                "rejected": self.rejected,
+            }
+
+
+password_hash_executor = PasswordHashExecutor(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
 
 def create_access_token(subject: str | Any, expires_delta: timedelta | None = None) -> str:
     """Create a JWT access token.
@@ -36,6 +135,83 @@ def create_access_token(subject: str | Any, expires_delta: timedelta | None = No
     return encoded_jwt
 
 
+# Claims of verified access tokens, keyed by the token's SHA-256 and kept until
+# the token expires, so each token's signature is checked once per worker
+token_cache: TTLCache[bytes, TokenPayload] = TTLCache(
+    maxsize=settings.TOKEN_CACHE_MAX_SIZE, ttl=0
+)
+# Revoked tokens, by SHA-256, with their expiry times. Not an LRU cache, since
+# forgetting a revocation early would let the token in again.
+_revoked_tokens: dict[bytes, float] = {}
+_revoked_lock = threading.Lock()
+
+
+def _token_key(token: str) -> bytes:
+    """Hash a token, so cache keys don't hold usable credentials.
+
+    Args:
+        token: The encoded JWT.
+
+    Returns:
+        The token's SHA-256 digest.
+    """
+    return hashlib.sha256(token.encode()).digest()
+
+
+def decode_access_token(token: str) -> TokenPayload:
+    """Verify an access token and get its claims.
+
+    Tokens seen before are served from token_cache until their exp, skipping
+    the signature check, base64 decoding and validation. Tokens without an exp
+    are verified every time.
+
+    Args:
+        token: The encoded JWT.
+
+    Returns:
+        The token's claims.
+
+    Raises:
+        JWTError: If the token is invalid, expired or revoked.
+        ValidationError: If the claims don't match TokenPayload.
+    """
+    key = _token_key(token)
+    if _revoked_tokens and key in _revoked_tokens:
+        raise TokenRevokedError("Token has been revoked")
+    payload = token_cache.get(key)
+    if payload is None:
+        claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+        payload = TokenPayload(**claims)
+        if payload.exp is not None and payload.exp > time.time():
+            token_cache.set(key, payload, ttl=payload.exp - time.time())
+    return payload
+
+
+def revoke_access_token(token: str) -> None:
+    """Reject an access token from now on, e.g. when its user logs out.
+
+    Revocations are kept in this worker process until the token expires. Like
+    the caches, they don't reach other workers, so deployments running several
+    need to call this in each of them.
+
+    Args:
+        token: The encoded JWT.
+    """
+    key = _token_key(token)
+    try:
+        exp = TokenPayload(**jwt.get_unverified_claims(token)).exp
+    except (JWTError, ValidationError):
+        # Malformed tokens are rejected anyway
+        return
+    now = time.time()
+    with _revoked_lock:
+        for revoked, expires_at in list(_revoked_tokens.items()):
+            if expires_at <= now:
+                del _revoked_tokens[revoked]
+        _revoked_tokens[key] = math.inf if exp is None else exp
+    token_cache.invalidate(key)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash.
 
@@ -59,3 +235,36 @@ def get_password_hash(password: str) -> str:
         A hashed version of the password.
     """
     return pwd_context.hash(password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against a hash in the password hashing pool.
+
+    Args:
+        plain_password: The plain-text password to verify.
+        hashed_password: The hashed password to verify against.
+
+    Returns:
+        True if the password matches the hash, False otherwise.
+
+    Raises:
+        PasswordHashingBusyError: If the pool's queue is full.
+    """
+    return await password_hash_executor.run(
+        verify_password, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password in the password hashing pool.
+
+    Args:
+        password: The password to hash.
+
+    Returns:
+        A hashed version of the password.
+
+    Raises:
+        PasswordHashingBusyError: If the pool's queue is full.
+    """
+    return await password_hash_executor.run(get_password_hash, password)
@@ -0,0 +1,37 @@
+"""JSON responses encoded in one pass by pydantic-core.
+
+Returning a list of models from a route makes FastAPI validate each item
+against the response model again, convert the result to plain Python with
+jsonable_encoder and then encode that with the json module. For lists of
+database rows that are already trusted, validating them once with a cached
+TypeAdapter and dumping straight to JSON bytes with pydantic-core's Rust
+encoder gives the same body for a fraction of the CPU time.
+"""
+
+from collections.abc import Mapping
+from typing import Any
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+def json_response(
+    adapter: TypeAdapter[Any],
+    content: Any,
+    headers: Mapping[str, str] | None = None,
+) -> Response:
+    """Build a JSON response from ORM objects or models.
+
+    The route should still declare its response_model, which documents the
+    body in the OpenAPI schema; FastAPI doesn't process returned Responses.
+
+    Args:
+        adapter: Adapter for the response body's type, built once at import.
+        content: The body, e.g. a list of ORM objects read from attributes.
+        headers: Headers to send with the response.
+
+    Returns:
+        The response, with the body already encoded.
+    """
+    body = adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -5,3 +5,10 @@ This module is used by Alembic to generate migrations.
 
 # Import the base class first
 from app.db.base_class import Base  # noqa
+
+# Then import all models so they are registered on Base.metadata
+from app.models.blob import Blob  # noqa
+from app.models.file import File  # noqa
+from app.models.s3_deletion import S3Deletion  # noqa
+from app.models.user import User  # noqa
+from app.models.user_usage import UserUsage  # noqa
@@ -3,7 +3,29 @@
 import re
 from typing import Any
 
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.ext.declarative import as_declarative, declared_attr
+from sqlalchemy.sql import functions
+from sqlalchemy.sql.compiler import SQLCompiler
+
+
+@compiles(functions.now, "sqlite")
+def _sqlite_now(element: functions.now, compiler: SQLCompiler, **kw: Any) -> str:
+    """Render now() on SQLite in the format SQLAlchemy stores datetimes in.
+
+    SQLite's CURRENT_TIMESTAMP has no fractional seconds, so server-generated
+    timestamps wouldn't compare correctly with datetime parameters, which
+    SQLAlchemy binds with microseconds. Postgres is unaffected.
+
+    Args:
+        element: The now() function element.
+        compiler: The SQL compiler.
+        **kw: Compiler keyword arguments.
+
+    Returns:
+        The SQL expression for the current time.
+    """
+    return "STRFTIME('%Y-%m-%d %H:%M:%f000', 'now')"
 
 
 @as_declarative()
@@ -0,0 +1,177 @@
+"""Full-text search index over file names and descriptions.
+
+The index isn't part of the File model's columns, since each database builds
+it differently:
+
+- Postgres: a stored generated tsvector column, file.search_vector, with the
+  filename weighted above the description, in a GIN index on
+  (owner_id, search_vector). btree_gin lets the index narrow matches to one
+  owner, so a search only visits that owner's matching rows however many files
+  other users have.
+- SQLite: an FTS5 table, file_search, kept in sync with file by triggers. It
+  makes search work for local development and the tests.
+
+Migration 0008 creates both; tables made with create_all get them from the
+listeners installed by install.
+"""
+
+import re
+import uuid
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy import (
+    DDL,
+    Float,
+    Select,
+    Table,
+    column,
+    event,
+    func,
+    literal_column,
+    select,
+    table,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+# Punctuation in filenames is indexed as spaces, so "q3_report.pdf" is found
+# by "report" the way FTS5's tokenizer splits it
+POSTGRES_SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', translate(filename, '._-', '   ')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+)
+POSTGRES_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS btree_gin",
+    (
+        "ALTER TABLE file ADD COLUMN search_vector tsvector "
+        f"GENERATED ALWAYS AS ({POSTGRES_SEARCH_VECTOR}) STORED"
+    ),
+    "CREATE INDEX ix_file_search ON file USING gin (owner_id, search_vector)",
+)
+SQLITE_DDL = (
+    (
+        "CREATE VIRTUAL TABLE file_search USING fts5("
+        "file_id UNINDEXED, owner_id UNINDEXED, filename, description)"
+    ),
+    (
+        "CREATE TRIGGER file_search_insert AFTER INSERT ON file BEGIN "
+        "INSERT INTO file_search (file_id, owner_id, filename, description) "
+        "VALUES (new.id, new.owner_id, new.filename, new.description); END"
+    ),
+    (
+        "CREATE TRIGGER file_search_update "
+        "AFTER UPDATE OF owner_id, filename, description ON file BEGIN "
+        "UPDATE file_search SET owner_id = new.owner_id, filename = new.filename, "
+        "description = new.description WHERE file_id = old.id; END"
+    ),
+    (
+        "CREATE TRIGGER file_search_delete AFTER DELETE ON file BEGIN "
+        "DELETE FROM file_search WHERE file_id = old.id; END"
+    ),
+)
+# Schema objects outside the models, which autogenerate mustn't drop
+SEARCH_TABLE_PREFIX = "file_search"
+SEARCH_COLUMN = "search_vector"
+SEARCH_INDEX = "ix_file_search"
+# Relative weights of the filename and description columns for FTS5's bm25
+SQLITE_FILENAME_WEIGHT = 4.0
+SQLITE_DESCRIPTION_WEIGHT = 1.0
+MAX_SEARCH_TERMS = 16
+
+_TERM = re.compile(r"[^\W_]+")
+
+
+def install(file_table: Table) -> None:
+    """Create the search index whenever the file table is created.
+
+    Args:
+        file_table: The file table.
+    """
+    for statement in POSTGRES_DDL:
+        event.listen(
+            file_table, "after_create", DDL(statement).execute_if(dialect="postgresql")
+        )
+    for statement in SQLITE_DDL:
+        event.listen(
+            file_table, "after_create", DDL(statement).execute_if(dialect="sqlite")
+        )
+
+
+def include_name(name: str | None, type_: str, parent_names: dict[str, Any]) -> bool:
+    """Hide the search index from Alembic's schema comparison.
+
+    Args:
+        name: Name of the reflected object.
+        type_: Kind of object, e.g. "table" or "column".
+        parent_names: Names of the schema and table the object belongs to.
+
+    Returns:
+        Whether autogenerate should consider the object.
+    """
+    if type_ == "table":
+        return not (name or "").startswith(SEARCH_TABLE_PREFIX)
+    if type_ == "column":
+        return name != SEARCH_COLUMN
+    if type_ == "index":
+        return name != SEARCH_INDEX
+    return True
+
+
+def search_terms(query: str) -> list[str]:
+    """Split a search query into the words to look for.
+
+    Punctuation separates words, as it does in the index, and is dropped, so
+    no query syntax reaches the database.
+
+    Args:
+        query: The query as the user typed it.
+
+    Returns:
+        The lowercase words, at most MAX_SEARCH_TERMS of them.
+    """
+    return _TERM.findall(query.lower())[:MAX_SEARCH_TERMS]
+
+
+def ranked_matches(
+    dialect: str, owner_id: uuid.UUID | str, terms: Sequence[str]
+) -> Select:
+    """Build a query of an owner's files matching all terms, with their rank.
+
+    Each term matches words starting with it, so results show up while the
+    user is still typing. Higher ranks are better matches.
+
+    Args:
+        dialect: Name of the database dialect.
+        owner_id: ID of the owner whose files are searched.
+        terms: Words to look for, as returned by search_terms.
+
+    Returns:
+        A query selecting the file_id and rank of each match.
+    """
+    if dialect == "postgresql":
+        tsquery = func.to_tsquery(
+            literal_column("'simple'"), " & ".join(f"{term}:*" for term in terms)
+        )
+        search_vector = column(SEARCH_COLUMN, TSVECTOR)
+        file = table("file", column("id"), column("owner_id"), search_vector)
+        return select(
+            file.c.id.label("file_id"),
+            func.ts_rank(search_vector, tsquery, type_=Float).label("rank"),
+        ).where(file.c.owner_id == str(owner_id), search_vector.op("@@")(tsquery))
+
+    file_search = table("file_search", column("file_id"), column("owner_id"))
+    # bm25 is lower for better matches; the unindexed columns get no weight
+    bm25 = func.bm25(
+        literal_column("file_search"),
+        0.0,
+        0.0,
+        SQLITE_FILENAME_WEIGHT,
+        SQLITE_DESCRIPTION_WEIGHT,
+        type_=Float,
+    )
+    return select(file_search.c.file_id, (-bm25).label("rank")).where(
+        literal_column("file_search").op("MATCH")(
+            " ".join(f'"{term}"*' for term in terms)
+        ),
+        file_search.c.owner_id == str(owner_id),
+    )
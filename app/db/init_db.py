@@ -1,7 +1,13 @@
 """Database initialization module."""
 
 import logging
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
 
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect, text
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
@@ -12,23 +18,93 @@ from app.schemas.user import UserCreate
 
 logger = logging.getLogger(__name__)
 
+ALEMBIC_INI_PATH = Path(__file__).resolve().parents[2] / "alembic.ini"
+# Revision matching the schema create_all produced before migrations existed
+BASELINE_REVISION = "0001"
+# Key of the Postgres advisory lock held while migrating, arbitrary but fixed
+MIGRATION_LOCK_KEY = 0x7765_7570
+
+
+def get_alembic_config() -> Config:
+    """Get the Alembic configuration for running migrations from the application.
+
+    Returns:
+        The Alembic configuration.
+    """
+    config = Config(str(ALEMBIC_INI_PATH))
+    # Keep the application's logging setup instead of alembic.ini's
+    config.attributes["configure_logger"] = False
+    return config
+
+
+@contextmanager
+def migration_lock() -> Iterator[None]:
+    """Keep other processes from migrating the database until the block ends.
+
+    On Postgres, this is a session-level advisory lock held on a connection of
+    its own, in autocommit mode so it doesn't hold back the CONCURRENTLY index
+    builds of the migrations running on other connections. SQLite databases
+    are only used by single processes, and aren't locked.
+
+    Yields:
+        None, once the lock is held.
+    """
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(
+            text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY}
+        )
+        try:
+            yield
+        finally:
+            connection.execute(
+                text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY}
+            )
+
+
+def run_migrations() -> None:
+    """Upgrade the database schema to the latest migration.
+
+    Databases created with create_all before migrations existed have tables but
+    no alembic_version table. They are stamped with the baseline revision first
+    so only the later migrations are applied.
+
+    Runs under migration_lock, so processes starting together migrate one at a
+    time, and the later ones find the schema up to date.
+    """
+    config = get_alembic_config()
+
+    with migration_lock():
+        with engine.connect() as connection:
+            inspector = inspect(connection)
+            is_legacy = inspector.has_table("user") and not inspector.has_table(
+                "alembic_version"
+            )
+        if is_legacy:
+            logger.info(f"Stamping existing database with revision {BASELINE_REVISION}")
+            command.stamp(config, BASELINE_REVISION)
+
+        logger.info("Running database migrations")
+        command.upgrade(config, "head")
+        logger.info("Database migrations complete")
+
 
 def init_db() -> None:
     """Initialize the database.
 
-    Creates the database tables if they don't exist.
+    Applies any pending migrations, creating the tables if they don't exist,
+    unless RUN_MIGRATIONS_ON_STARTUP is off and they are run as a deploy step.
     """
-    # Create db tables
-    # Import Base from base module to ensure all models are properly registered
-    from app.db.base import Base
     from app.db.relations import setup_relationships
 
     # Setup relationships between models
     setup_relationships()
 
-    logger.info("Creating database tables")
-    Base.metadata.create_all(bind=engine)
-    logger.info("Database tables created")
+    if settings.RUN_MIGRATIONS_ON_STARTUP:
+        run_migrations()
 
     # Create superuser if configured
     if settings.FIRST_SUPERUSER and settings.FIRST_SUPERUSER_PASSWORD:
@@ -1,12 +1,37 @@
 """SQLAlchemy session management module."""
 
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
 
 from app.core.config import settings
 
+# Database URL prefixes and the asyncio driver used for each
+ASYNC_DRIVERS = (
+    ("postgresql+psycopg2://", "postgresql+asyncpg://"),
+    ("postgresql://", "postgresql+asyncpg://"),
+    ("sqlite+pysqlite://", "sqlite+aiosqlite://"),
+    ("sqlite://", "sqlite+aiosqlite://"),
+)
+
+
+def get_async_database_uri(uri: str) -> str:
+    """Get the asyncio equivalent of a database URL.
+
+    Args:
+        uri: Database URL for a sync driver, e.g. postgresql://...
+
+    Returns:
+        The same URL using an asyncio driver, e.g. postgresql+asyncpg://...
+    """
+    for sync_prefix, async_prefix in ASYNC_DRIVERS:
+        if uri.startswith(sync_prefix):
+            return async_prefix + uri[len(sync_prefix) :]
+    return uri
+
+
 # Create the SQLAlchemy engine
 engine = create_engine(
     str(settings.SQLALCHEMY_DATABASE_URI),
@@ -18,6 +43,21 @@ engine = create_engine(
 # Create a SessionLocal class for database connections
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Create the asyncio engine, used by the async API routes
+async_engine = create_async_engine(
+    settings.SQLALCHEMY_ASYNC_DATABASE_URI
+    or get_async_database_uri(str(settings.SQLALCHEMY_DATABASE_URI)),
+    pool_pre_ping=True,
+    pool_size=10,
+    max_overflow=20,
+)
+
+# Objects must stay usable after commit: expired attributes can't be lazy-loaded
+# outside of an await, so don't expire them on commit
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
 
 def get_db() -> Generator[Session, None, None]:
     """Get a database session.
@@ -32,3 +72,16 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Get an asyncio database session.
+
+    This function is used as a dependency in async FastAPI endpoints. Waiting
+    on the database doesn't hold a threadpool thread.
+
+    Yields:
+        A SQLAlchemy asyncio session.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
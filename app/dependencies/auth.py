@@ -2,17 +2,15 @@
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt
 from jose.exceptions import JWTError
 from pydantic import ValidationError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.security import ALGORITHM
-from app.db.session import get_db
+from app.core.security import decode_access_token
+from app.db.session import get_async_db
 from app.models.user import User as UserModel
-from app.schemas.token import TokenPayload
-from app.services.user_service import UserService
+from app.services.user_service import AsyncUserService
 
 # OAuth2 compatible Bearer token authentication
 oauth2_scheme = OAuth2PasswordBearer(
@@ -20,13 +18,18 @@ oauth2_scheme = OAuth2PasswordBearer(
 )
 
 
-def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
+async def get_current_user(
+    db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)
 ) -> UserModel:
     """Get the current user based on the JWT token.
 
+    The dependencies are async so FastAPI runs them on the event loop instead of
+    handing each one to the threadpool. Verified tokens are cached until they
+    expire and users for a short while, both in-process, which saves the
+    signature check and a query on most requests.
+
     Args:
-        db: Database session.
+        db: Asyncio database session.
         token: JWT token from the Authorization header.
 
     Returns:
@@ -36,8 +39,7 @@ def get_current_user(
         HTTPException: If the token is invalid or the user doesn't exist.
     """
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
-        token_data = TokenPayload(**payload)
+        token_data = decode_access_token(token)
         if token_data.sub is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -51,14 +53,14 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user_service = UserService(db)
-    user = user_service.get(id=token_data.sub)
+    user_service = AsyncUserService(db)
+    user = await user_service.get_cached(id=token_data.sub)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 
-def get_current_active_user(
+async def get_current_active_user(
     current_user: UserModel = Depends(get_current_user),
 ) -> UserModel:
     """Get the current active user.
@@ -77,7 +79,7 @@ def get_current_active_user(
     return current_user
 
 
-def get_current_active_superuser(
+async def get_current_active_superuser(
     current_user: UserModel = Depends(get_current_user),
 ) -> UserModel:
     """Get the current active superuser.
@@ -1,19 +1,26 @@
 """Main application module for the We-Upload API."""
 
+import asyncio
 import logging
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
-from app.core.logging import setup_logging
+from app.core.logging import setup_logging, shutdown_logging
+from app.core.s3 import get_s3_client
 from app.db.init_db import create_first_superuser, init_db
 from app.routers import files, health, login, users
+from app.services.s3_deletion_worker import S3DeletionWorker
+from app.services.upload_reconciler import UploadReconciler
 
 # Initialize logging first
 setup_logging()
 logger = logging.getLogger(__name__)
 
+# Background tasks started at startup, cancelled at shutdown
+background_tasks: set[asyncio.Task] = set()
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="Multi-User File Upload & Sharing Backend API",
@@ -49,16 +56,47 @@ async def startup_event() -> None:
     """
     logger.info("Starting application initialization")
 
-    # Initialize database and create tables if they don't exist
+    # Initialize database and apply any pending migrations
     init_db()
 
     # Create initial superuser if configured
     if settings.FIRST_SUPERUSER:
         create_first_superuser()
 
+    # Build the shared S3 client up front so the first request doesn't pay for it
+    get_s3_client()
+
+    # Settle uploads whose clients never confirmed them
+    if settings.UPLOAD_RECONCILE_INTERVAL > 0:
+        reconciler = UploadReconciler()
+        background_tasks.add(
+            asyncio.create_task(reconciler.run(settings.UPLOAD_RECONCILE_INTERVAL))
+        )
+
+    # Delete the S3 objects of deleted files
+    if settings.S3_DELETE_INTERVAL > 0:
+        deletion_worker = S3DeletionWorker()
+        background_tasks.add(
+            asyncio.create_task(deletion_worker.run(settings.S3_DELETE_INTERVAL))
+        )
+
     logger.info("Application initialization complete")
 
 
+@app.on_event("shutdown")
+async def shutdown_event() -> None:
+    """Execute actions on application shutdown.
+
+    Cancels the background tasks and waits for them to stop, then writes the
+    log records still queued.
+    """
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    background_tasks.clear()
+    shutdown_logging()
+
+
 if __name__ == "__main__":
     import uvicorn
 
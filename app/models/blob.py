@@ -0,0 +1,24 @@
+"""Shared S3 object database model."""
+
+from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy.sql import func
+
+from app.db.base_class import Base
+
+
+class Blob(Base):
+    """Reference count of an S3 object shared by several files.
+
+    Files whose content was deduplicated point at the object of an earlier file
+    with the same SHA-256. An object without a blob row belongs to a single file.
+    The object is only deleted once the last file referencing it is deleted.
+
+    Attributes:
+        s3_key: Key of the shared object.
+        ref_count: Number of files whose s3_key is this object.
+        created_at: When the object was first shared.
+    """
+
+    s3_key = Column(String(255), primary_key=True)
+    ref_count = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
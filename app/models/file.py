@@ -1,52 +1,107 @@
 """File database model."""
 
+import enum
 import uuid
 from typing import TYPE_CHECKING
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     Column,
     DateTime,
     ForeignKey,
-    Integer,
+    Index,
     String,
     Text,
 )
 from sqlalchemy.sql import func
 
+from app.db import file_search
 from app.db.base_class import Base
 
 if TYPE_CHECKING:
     from .user import User  # noqa: F401
 
 
+class FileStatus(str, enum.Enum):
+    """Upload state of a file.
+
+    Attributes:
+        PENDING: The upload URL was issued but the object isn't confirmed in S3.
+        UPLOADING: The content is being streamed to S3 through the API.
+        COMPLETE: The object exists in S3; its size and ETag are recorded.
+        FAILED: The object never arrived before the upload URL expired.
+    """
+
+    PENDING = "pending"
+    UPLOADING = "uploading"
+    COMPLETE = "complete"
+    FAILED = "failed"
+
+
 class File(Base):
     """File model for storing file metadata.
 
     Attributes:
         id: Unique identifier for the file.
         filename: Original filename.
-        s3_key: Key in the S3 bucket where the file is stored.
+        s3_key: Key in the S3 bucket where the file is stored. Files with the
+            same content can share an object, see Blob.
         content_type: MIME type of the file.
-        size_bytes: File size in bytes.
+        size_bytes: File size in bytes, as stored in S3 once the upload is complete.
         description: Optional description of the file.
         is_public: Whether the file is publicly accessible.
         owner_id: ID of the user who owns the file.
+        upload_id: ID of the S3 multipart upload in progress, if any.
+        status: Upload state, see FileStatus.
+        etag: ETag of the object in S3, once the upload is complete.
+        sha256: Hex SHA-256 of the content, if the client provided it.
         created_at: When the file was created.
         updated_at: When the file was last updated.
         owner: The user who owns the file.
     """
 
+    __table_args__ = (
+        # Back owner listings in each sort order, see
+        # FileService.owner_files_statement
+        Index("ix_file_owner_id_created_at_id", "owner_id", "created_at", "id"),
+        Index("ix_file_owner_id_size_bytes_id", "owner_id", "size_bytes", "id"),
+        Index("ix_file_owner_id_filename_id", "owner_id", "filename", "id"),
+        # Back the listing filters that don't have a sort order of their own;
+        # pattern ops let Postgres use the index for LIKE 'prefix%'
+        Index(
+            "ix_file_owner_id_content_type",
+            "owner_id",
+            "content_type",
+            postgresql_ops={"content_type": "varchar_pattern_ops"},
+        ),
+        Index("ix_file_owner_id_updated_at", "owner_id", "updated_at"),
+        # Lets the upload reconciler find pending files oldest first
+        Index("ix_file_status_created_at", "status", "created_at"),
+        # Finds an owner's earlier upload of the same content, see
+        # FileService.create_duplicate
+        Index("ix_file_owner_id_sha256", "owner_id", "sha256"),
+    )
+
     id = Column(
         String(36), primary_key=True, index=True, default=lambda: str(uuid.uuid4())
     )
     filename = Column(String(255), nullable=False)
-    s3_key = Column(String(255), nullable=False, unique=True)
+    s3_key = Column(String(255), nullable=False)
     content_type = Column(String(100), nullable=False)
-    size_bytes = Column(Integer, nullable=False)
+    size_bytes = Column(BigInteger, nullable=False)
     description = Column(Text, nullable=True)
     is_public = Column(Boolean, default=False, nullable=False)
     owner_id = Column(String(36), ForeignKey("user.id"), nullable=False)
+    upload_id = Column(String(512), nullable=True)
+    status = Column(
+        String(16),
+        default=FileStatus.PENDING.value,
+        server_default=FileStatus.PENDING.value,
+        nullable=False,
+    )
+    etag = Column(String(128), nullable=True)
+    sha256 = Column(String(64), nullable=True)
     created_at = Column(DateTime, default=func.now(), nullable=False)
     updated_at = Column(
         DateTime, default=func.now(), onupdate=func.now(), nullable=False
@@ -58,3 +113,7 @@ class File(Base):
     # When SQLAlchemy loads a File instance, it can automatically populate these attributes
     # with related objects (such as the owner User) based on foreign key relationships.
     owner = None
+
+
+# The search index isn't a mapped column, see app.db.file_search
+file_search.install(File.__table__)
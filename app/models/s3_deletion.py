@@ -0,0 +1,36 @@
+"""S3 deletion outbox database model."""
+
+import uuid
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
+from sqlalchemy.sql import func
+
+from app.db.base_class import Base
+
+
+class S3Deletion(Base):
+    """Tombstone for an S3 object that must be deleted.
+
+    Rows are written in the same transaction that deletes a file's metadata, and
+    removed by the S3 deletion worker once the object is gone from S3.
+
+    Attributes:
+        id: Unique identifier for the tombstone.
+        s3_key: Key of the object to delete.
+        attempts: Number of failed attempts to delete the object.
+        next_attempt_at: When the worker may next try to delete the object.
+        last_error: Error of the last failed attempt, if any.
+        created_at: When the file was deleted.
+    """
+
+    __table_args__ = (
+        # Lets the worker find due tombstones oldest first
+        Index("ix_s3_deletion_next_attempt_at", "next_attempt_at"),
+    )
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    s3_key = Column(String(255), nullable=False)
+    attempts = Column(Integer, default=0, server_default="0", nullable=False)
+    next_attempt_at = Column(DateTime, default=func.now(), nullable=False)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
@@ -0,0 +1,35 @@
+"""Per-user storage usage database model."""
+
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, String
+from sqlalchemy.sql import func
+
+from app.db.base_class import Base
+
+
+class UserUsage(Base):
+    """Counters of the files a user stores, kept in step with the file table.
+
+    The counters are updated in the same transaction as every change to a
+    user's files, so reading a user's usage doesn't aggregate their files. They
+    count every file row, including pending uploads, which reserve their
+    declared size until the real size is known. The version goes up with every
+    change to the user's files, including ones that leave the counters alone,
+    so it identifies the state of their file listings.
+
+    Attributes:
+        user_id: ID of the user.
+        file_count: Number of files the user has, not counting failed uploads.
+        total_bytes: Sum of the size_bytes of those files.
+        version: Number of changes made to the user's files.
+        updated_at: When the counters last changed.
+    """
+
+    user_id = Column(
+        String(36), ForeignKey("user.id", ondelete="CASCADE"), primary_key=True
+    )
+    file_count = Column(BigInteger, default=0, nullable=False)
+    total_bytes = Column(BigInteger, default=0, nullable=False)
+    version = Column(BigInteger, default=0, server_default="0", nullable=False)
+    updated_at = Column(
+        DateTime, default=func.now(), onupdate=func.now(), nullable=False
+    )
@@ -1,60 +1,449 @@
 """File upload and download router."""
 
 import uuid
-
-from fastapi import APIRouter, Depends, HTTPException, Path, Query
-from sqlalchemy.orm import Session
-
-from app.db.session import get_db
+from typing import Annotated
+from urllib.parse import quote
+
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    Header,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.etag import etag_matches, weak_etag
+from app.core.pagination import InvalidCursorError
+from app.core.serialization import json_response
+from app.db.session import get_async_db
 from app.dependencies.auth import get_current_user
+from app.models.file import File as FileModel
 from app.models.user import User as UserModel
 from app.schemas.file import (
+    FILE_ADAPTER,
+    FILE_LIST_ADAPTER,
     File,
+    FileBatchDeleteResponse,
+    FileBatchUploadResponse,
     FileCreate,
     FileDownloadResponse,
+    FileFields,
+    FileListQuery,
+    FileMultipartCompleteRequest,
+    FileMultipartPartUrlsRequest,
+    FileMultipartPartUrlsResponse,
+    FileMultipartUploadResponse,
     FileUpdate,
     FileUploadResponse,
+    file_field_names,
+    sparse_file_adapter,
+)
+from app.services.archive import stream_archive
+from app.services.file_service import (
+    AsyncFileService,
+    ContentTooLargeError,
+    ContentUploadError,
+    MultipartUploadError,
+    RangeNotSatisfiableError,
+    UploadIncompleteError,
+    iter_s3_body,
 )
-from app.services.file_service import FileService
+from app.services.usage_service import AsyncUsageService, QuotaExceededError
 
 router = APIRouter()
 
 
+def _can_read(file: FileModel | Row, user: UserModel) -> bool:
+    """Check whether a user may see a file's metadata.
+
+    Args:
+        file: The file, or a row with its owner_id and is_public.
+        user: The user.
+
+    Returns:
+        Whether the user may see the file.
+    """
+    return file.is_public or file.owner_id == user.id or user.is_superuser
+
+
+async def _get_modifiable_file(
+    file_service: AsyncFileService, file_id: uuid.UUID, user: UserModel
+) -> FileModel:
+    """Get a file the user is allowed to modify.
+
+    Args:
+        file_service: File service bound to the request's database session.
+        file_id: The ID of the file.
+        user: The authenticated user making the request.
+
+    Returns:
+        The file.
+
+    Raises:
+        HTTPException: If the file doesn't exist or the user doesn't own it.
+    """
+    file = await file_service.get(id=file_id)
+    if not file:
+        raise HTTPException(status_code=404, detail="File not found")
+    if file.owner_id != user.id and not user.is_superuser:
+        raise HTTPException(
+            status_code=403, detail="Not enough permissions to modify this file"
+        )
+    return file
+
+
 @router.post("/upload", response_model=FileUploadResponse)
-def create_upload_url(
+async def create_upload_url(
     file_info: FileCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user),
 ) -> FileUploadResponse:
     """Create a presigned URL for uploading a file to S3.
 
     This endpoint generates a presigned URL that the client can use to upload
     a file directly to S3, bypassing the API server for the actual file data.
+    If the client sends the SHA-256 of content it already uploaded, the file
+    reuses that content and no upload URL is returned.
 
     Args:
         file_info: Information about the file to be uploaded.
-        db: Database session.
+        db: Asyncio database session.
         current_user: The authenticated user making the request.
 
     Returns:
         A response containing the upload URL and file ID.
 
     Raises:
-        HTTPException: If there's an error generating the upload URL.
+        HTTPException: If the file doesn't fit in the user's storage quota or
+            there's an error generating the upload URL.
     """
-    file_service = FileService(db)
+    file_service = AsyncFileService(db)
     try:
-        return file_service.create_upload_url(file_info=file_info, user=current_user)
+        return await file_service.create_upload_url(
+            file_info=file_info, user=current_user
+        )
+    except QuotaExceededError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Failed to generate upload URL: {e!s}"
         )
 
 
+@router.post("/upload/batch", response_model=FileBatchUploadResponse)
+async def create_upload_urls(
+    file_infos: list[FileCreate] = Body(
+        ..., min_length=1, max_length=settings.FILE_BATCH_MAX_ITEMS
+    ),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user),
+) -> FileBatchUploadResponse:
+    """Create presigned URLs for uploading many files to S3 in one request.
+
+    All file metadata is stored in a single transaction. Items that fail are
+    reported individually in the response without affecting the other items.
+
+    Args:
+        file_infos: Information about each file to be uploaded.
+        db: Asyncio database session.
+        current_user: The authenticated user making the request.
+
+    Returns:
+        A response with the upload URL and file ID, or an error, for each item.
+
+    Raises:
+        HTTPException: If there's an unexpected error processing the batch.
+    """
+    file_service = AsyncFileService(db)
+    try:
+        return await file_service.create_upload_urls(
+            file_infos=file_infos, user=current_user
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to generate upload URLs: {e!s}"
+        )
+
+
+@router.post("/delete-batch", response_model=FileBatchDeleteResponse)
+async def delete_files(
+    file_ids: list[uuid.UUID] = Body(
+        ..., min_length=1, max_length=settings.FILE_BATCH_MAX_ITEMS
+    ),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user),
+) -> FileBatchDeleteResponse:
+    """Delete many files in one request.
+
+    Files that don't exist or that the user doesn't own are reported in the
+    response without affecting the other files.
+
+    Args:
+        file_ids: IDs of the files to delete.
+        db: Asyncio database session.
+        current_user: The authenticated user making the request.
+
+    Returns:
+        A response with the outcome for each file, in request order.
+
+    Raises:
+        HTTPException: If there's an unexpected error processing the batch.
+    """
+    file_service = AsyncFileService(db)
+    try:
+        return await file_service.remove_multi(file_ids=file_ids, user=current_user)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to delete files: {e!s}")
+
+
+@router.post("/{file_id}/complete", response_model=File)
+async def complete_upload(
+    file_id: uuid.UUID = Path(..., description="The ID of the uploaded file"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user),
+) -> File:
+    """Confirm that a file has been uploaded to its presigned URL.
+
+    The object is checked in S3, and the file's status becomes complete with the
+    object's real size and ETag.
+
+    Args:
+        file_id: The ID of the uploaded file.
+        db: Asyncio database session.
+        current_user: The authenticated user making the request.
+
+    Returns:
+        The uploaded file information.
+
+    Raises:
+        HTTPException: If the file doesn't exist, the user doesn't own it, the
+            object isn't in S3 yet, or it is larger than declared and doesn't fit
+            in the user's storage quota, which fails the upload.
+    """
+    file_service = AsyncFileService(db)
+    file = await _get_modifiable_file(file_service, file_id, current_user)
+    try:
+        file = await file_service.complete_upload(file_obj=file)
+        return File.model_validate(file)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
+    except UploadIncompleteError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except QuotaExceededError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to complete upload: {e!s}")
+
+
+@router.put("/{file_id}/content", response_model=File)
+async def upload_content(
+    request: Request,
+    file_id: uuid.UUID = Path(..., description="The ID of the file to upload"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user),
+) -> File:
+    """Upload a file's content through the API instead of its presigned URL.
+
+    For clients that can't reach S3. The request body is streamed into S3 as it
+    arrives, so memory use doesn't grow with the file's size, and the file's
+    status becomes complete with its real size, ETag and SHA-256.
+
+    Args:
+        request: The request, whose body is the file's content.
+        file_id: The ID of the file, as returned by the upload endpoint.
+        db: Asyncio database session.
+        current_user: The authenticated user making the request.
+
+    Returns:
+        The uploaded file information.
+
+    Raises:
+        HTTPException: If the file doesn't exist, the user doesn't own it, the
+            file isn't waiting for its content, is too large to upload through
+            the API or for the user's storage quota, or S3 fails.
+    """
+    file_service = AsyncFileService(db)
+    file = await _get_modifiable_file(file_service, file_id, current_user)
+    # Return the connection to the pool while a slow client sends the body;
+    # the upload only needs it again to record its progress
+    await db.commit()
+    try:
+        file = await file_service.upload_content(file, request.stream())
+        return File.model_validate(file)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
+    except (ContentTooLargeError, QuotaExceededError) as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ContentUploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except UploadIncompleteError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to upload file: {e!s}")
+
+
+@router.post("/multipart", response_model=FileMultipartUploadResponse)
+async def initiate_multipart_upload(
+    file_info: FileCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user),
+) -> FileMultipartUploadResponse:
+    """Start a multipart upload for a large file.
+
+    The response says how to split the file. The client then requests presigned
+    URLs for the parts, uploads them in parallel and completes the upload.
+
+    Args:
+        file_info: Information about the file to be uploaded.
+        db: Asyncio database session.
+        current_user: The authenticated user making the request.
+
+    Returns:
+        A response with the file ID, upload ID, part size and part count.
+
+    Raises:
+        HTTPException: If the file can't be uploaded, doesn't fit in the user's
+            storage quota, or S3 fails.
+    """
+    file_service = AsyncFileService(db)
+    try:
+        return await file_service.initiate_multipart_upload(
+            file_info=file_info, user=current_user
+        )
+    except MultipartUploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except QuotaExceededError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to initiate multipart upload: {e!s}"
+        )
+
+
+@router.post("/{file_id}/multipart/parts", response_model=FileMultipartPartUrlsResponse)
+async def create_part_upload_urls(
+    parts_in: FileMultipartPartUrlsRequest,
+    file_id: uuid.UUID = Path(..., description="The ID of the file being uploaded"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user),
+) -> FileMultipartPartUrlsResponse:
+    """Create presigned URLs for uploading parts of a multipart upload.
+
+    Args:
+        parts_in: The part numbers to create URLs for.
+        file_id: The ID of the file being uploaded.
+        db: Asyncio database session.
+        current_user: The authenticated user making the request.
+
+    Returns:
+        A response with one upload URL per part.
+
+    Raises:
+        HTTPException: If the file doesn't exist, the user doesn't own it, or no
+            upload is in progress.
+    """
+    file_service = AsyncFileService(db)
+    file = await _get_modifiable_file(file_service, file_id, current_user)
+    try:
+        return file_service.create_part_upload_urls(
+            file_obj=file, part_numbers=parts_in.part_numbers
+        )
+    except MultipartUploadError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to generate part upload URLs: {e!s}"
+        )
+
+
+@router.post("/{file_id}/multipart/complete", response_model=File)
+async def complete_multipart_upload(
+    complete_in: FileMultipartCompleteRequest,
+    file_id: uuid.UUID = Path(..., description="The ID of the file being uploaded"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user),
+) -> File:
+    """Complete a multipart upload once all parts are uploaded.
+
+    Args:
+        complete_in: Number and ETag of every uploaded part.
+        file_id: The ID of the file being uploaded.
+        db: Asyncio database session.
+        current_user: The authenticated user making the request.
+
+    Returns:
+        The uploaded file information.
+
+    Raises:
+        HTTPException: If the file doesn't exist, the user doesn't own it, no
+            upload is in progress, S3 rejects the parts, or the parts add up to
+            more than declared and don't fit in the user's storage quota, which
+            fails the upload.
+    """
+    file_service = AsyncFileService(db)
+    file = await _get_modifiable_file(file_service, file_id, current_user)
+    try:
+        file = await file_service.complete_multipart_upload(
+            file_obj=file, parts=complete_in.parts
+        )
+        return File.model_validate(file)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
+    except (MultipartUploadError, UploadIncompleteError) as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except QuotaExceededError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to complete multipart upload: {e!s}"
+        )
+
+
+@router.delete("/{file_id}/multipart", response_model=File)
+async def abort_multipart_upload(
+    file_id: uuid.UUID = Path(..., description="The ID of the file being uploaded"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user),
+) -> File:
+    """Abort a multipart upload and delete the file.
+
+    Args:
+        file_id: The ID of the file being uploaded.
+        db: Asyncio database session.
+        current_user: The authenticated user making the request.
+
+    Returns:
+        The deleted file information.
+
+    Raises:
+        HTTPException: If the file doesn't exist, the user doesn't own it, or no
+            upload is in progress.
+    """
+    file_service = AsyncFileService(db)
+    file = await _get_modifiable_file(file_service, file_id, current_user)
+    try:
+        file = await file_service.abort_multipart_upload(file_obj=file)
+        return File.model_validate(file)
+    except MultipartUploadError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to abort multipart upload: {e!s}"
+        )
+
+
 @router.get("/download/{file_id}", response_model=FileDownloadResponse)
-def create_download_url(
+async def create_download_url(
     file_id: uuid.UUID = Path(..., description="The ID of the file to download"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user),
 ) -> FileDownloadResponse:
     """Create a presigned URL for downloading a file from S3.
@@ -64,7 +453,7 @@ def create_download_url(
 
     Args:
         file_id: The ID of the file to download.
-        db: Database session.
+        db: Asyncio database session.
         current_user: The authenticated user making the request.
 
     Returns:
@@ -73,9 +462,11 @@ def create_download_url(
     Raises:
         HTTPException: If the file doesn't exist or the user doesn't have access to it.
     """
-    file_service = FileService(db)
+    file_service = AsyncFileService(db)
     try:
-        return file_service.create_download_url(file_id=file_id, user=current_user)
+        return await file_service.create_download_url(
+            file_id=file_id, user=current_user
+        )
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="File not found")
     except PermissionError:
@@ -88,79 +479,294 @@ def create_download_url(
         )
 
 
-@router.get("", response_model=list[File])
-def list_files(
-    skip: int = Query(0, ge=0, description="Number of files to skip"),
+@router.get("/{file_id}/content", response_class=StreamingResponse)
+async def download_content(
+    file_id: uuid.UUID = Path(..., description="The ID of the file to download"),
+    range_header: str | None = Header(None, alias="Range"),
+    if_range: str | None = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user),
+) -> StreamingResponse:
+    """Download a file's content through the API instead of a presigned URL.
+
+    For clients that can't reach S3. The object is streamed from S3 in buffers
+    of DOWNLOAD_CHUNK_SIZE bytes, so memory use doesn't grow with the file's
+    size. A single byte range can be requested to resume or parallelize
+    downloads, with If-Range holding the ETag the earlier bytes came with.
+
+    Args:
+        file_id: The ID of the file to download.
+        range_header: The Range header, e.g. "bytes=0-1023".
+        if_range: The If-Range header, only honoured with the current ETag.
+        db: Asyncio database session.
+        current_user: The authenticated user making the request.
+
+    Returns:
+        The content, with status 206 if a range is served.
+
+    Raises:
+        HTTPException: If the file doesn't exist, the user doesn't have access to
+            it, it hasn't been uploaded yet, the range is outside the content, or
+            S3 fails.
+    """
+    file_service = AsyncFileService(db)
+    try:
+        file, s3_object = await file_service.open_content(
+            file_id=file_id,
+            user=current_user,
+            range_header=range_header,
+            if_range=if_range,
+        )
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
+    except PermissionError:
+        raise HTTPException(
+            status_code=403, detail="Not enough permissions to access this file"
+        )
+    except UploadIncompleteError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except RangeNotSatisfiableError as e:
+        headers = None
+        if e.size_bytes is not None:
+            headers = {"Content-Range": f"bytes */{e.size_bytes}"}
+        raise HTTPException(status_code=416, detail=str(e), headers=headers)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to download file: {e!s}")
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Length": str(s3_object["ContentLength"]),
+        "Content-Disposition": f"attachment; filename*=UTF-8''{quote(file.filename)}",
+        "ETag": f'"{file.etag}"',
+    }
+    if "ContentRange" in s3_object:
+        headers["Content-Range"] = s3_object["ContentRange"]
+    # The blocking reads run in a thread pool, one chunk at a time
+    return StreamingResponse(
+        iter_s3_body(s3_object["Body"], settings.DOWNLOAD_CHUNK_SIZE),
+        status_code=206 if "ContentRange" in s3_object else 200,
+        media_type=str(file.content_type),
+        headers=headers,
+    )
+
+
+@router.get("/archive", response_class=StreamingResponse)
+async def download_archive(
+    ids: list[uuid.UUID] | None = Query(
+        None,
+        max_length=settings.FILE_BATCH_MAX_ITEMS,
+        description="IDs of the files to archive, in order (default: all your files)",
+    ),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user),
+) -> StreamingResponse:
+    """Download many files as one ZIP archive.
+
+    The archive is built while the files are streamed from S3, so it starts
+    downloading right away and memory use doesn't grow with its size.
+
+    Args:
+        ids: IDs of the files to archive. By default, all of the user's uploaded
+            files are archived.
+        db: Asyncio database session.
+        current_user: The authenticated user making the request.
+
+    Returns:
+        The ZIP archive.
+
+    Raises:
+        HTTPException: If a file doesn't exist, the user doesn't have access to
+            it, or it hasn't been uploaded yet.
+    """
+    file_service = AsyncFileService(db)
+    try:
+        files = await file_service.get_archive_files(user=current_user, file_ids=ids)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except UploadIncompleteError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    # The blocking reads and compression run in a thread pool, one chunk at a time
+    return StreamingResponse(
+        stream_archive(files, file_service.files),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="files.zip"'},
+    )
+
+
+@router.get("/search", response_model=list[File])
+async def search_files(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to look for"),
     limit: int = Query(
-        100, ge=1, le=100, description="Maximum number of files to return"
+        20, ge=1, le=100, description="Maximum number of files to return"
+    ),
+    cursor: str | None = Query(
+        None, description="Cursor from the X-Next-Cursor header of the previous page"
     ),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user),
+) -> Response:
+    """Search the current user's files by filename and description.
+
+    Every word must match the start of a word in the filename or description.
+    The best matches come first, filename matches ranking above description
+    ones. When more files match, the X-Next-Cursor response header holds an
+    opaque cursor for the next page.
+
+    Args:
+        q: The search query.
+        limit: Maximum number of records to return.
+        cursor: Cursor for the next page.
+        db: Asyncio database session.
+        current_user: The authenticated user making the request.
+
+    Returns:
+        The matching files, best first.
+
+    Raises:
+        HTTPException: If the cursor is invalid or the search fails.
+    """
+    file_service = AsyncFileService(db)
+    try:
+        results = await file_service.search(
+            owner_id=str(current_user.id), query=q, limit=limit, cursor=cursor
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to search files: {e!s}")
+
+    next_cursor = file_service.next_search_cursor(results, limit)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return json_response(FILE_LIST_ADAPTER, [file for file, _ in results], headers)
+
+
+@router.get("", response_model=list[File])
+async def list_files(
+    query: Annotated[FileListQuery, Query()],
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user),
-) -> list[File]:
-    """List all files owned by the current user.
+) -> Response:
+    """List the files owned by the current user, oldest first by default.
+
+    When more files are available, the X-Next-Cursor response header holds an
+    opaque cursor for the next page, valid for the same sort order. Following
+    cursors is much faster than increasing skip for deep pages. Failed uploads
+    are only listed when asked for with the status filter. With fields, only
+    those columns are read and returned.
+
+    The response has a weak ETag derived from the version of the user's files,
+    which changes with every change to them, and the query. When If-None-Match
+    holds it, 304 Not Modified is returned without listing the files.
 
     Args:
-        skip: Number of files to skip (for pagination).
-        limit: Maximum number of records to return (for pagination).
-        db: Database session.
+        query: Paging, sort order and filters, from the query string.
+        if_none_match: ETags of the client's cached copies.
+        db: Asyncio database session.
         current_user: The authenticated user making the request.
 
     Returns:
-        A list of files owned by the user.
+        A list of files owned by the user, or an empty 304 response.
+
+    Raises:
+        HTTPException: If the cursor is invalid or listing fails.
     """
-    file_service = FileService(db)
+    # Read before the files, so a change committed in between can only make
+    # the ETag older than the listing, never newer
+    version = await AsyncUsageService(db).version(current_user.id)
+    etag = weak_etag("files", current_user.id, version, query.model_dump_json())
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    file_service = AsyncFileService(db)
     # Convert UUID to string to match database column type
     owner_id_str = str(current_user.id)
     try:
-        files = file_service.get_multi_by_owner(
-            owner_id=owner_id_str, skip=skip, limit=limit
+        files = await file_service.get_multi_by_owner(
+            owner_id=owner_id_str,
+            skip=query.skip,
+            limit=query.limit,
+            cursor=query.cursor,
+            filters=query,
+            sort=query.sort,
+            fields=file_field_names(query.fields),
         )
-        return [File.model_validate(file) for file in files]
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         # Add error logging
         print(f"Error listing files: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to list files: {e}")
 
+    headers = {"ETag": etag}
+    next_cursor = file_service.next_cursor(files, query.limit, query.sort)
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if query.fields:
+        return json_response(
+            sparse_file_adapter(query.fields, many=True), files, headers
+        )
+    return json_response(FILE_LIST_ADAPTER, files, headers)
+
 
 @router.get("/{file_id}", response_model=File)
-def get_file(
+async def get_file(
     file_id: uuid.UUID = Path(..., description="The ID of the file to retrieve"),
-    db: Session = Depends(get_db),
+    fields: FileFields | None = Query(
+        None, description="File fields to return, separated by commas, e.g. id,filename"
+    ),
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user),
-) -> File:
+) -> Response:
     """Get a specific file by ID.
 
+    The response has a weak ETag derived from the file's updated_at. When
+    If-None-Match holds it, 304 Not Modified is returned after reading only the
+    columns needed to check access and compute the ETag. With fields, only those
+    columns are read and returned, and the ETag differs from the full file's.
+
     Args:
         file_id: The ID of the file to retrieve.
-        db: Database session.
+        fields: File fields to return, all by default.
+        if_none_match: ETags of the client's cached copies.
+        db: Asyncio database session.
         current_user: The authenticated user making the request.
 
     Returns:
-        The requested file information.
+        The requested file information, or an empty 304 response.
 
     Raises:
         HTTPException: If the file doesn't exist or the user doesn't have access to it.
     """
-    file_service = FileService(db)
-    file = file_service.get(id=file_id)
+    file_service = AsyncFileService(db)
+    if if_none_match:
+        state = await file_service.get_state(file_id)
+        if state and _can_read(state, current_user):
+            etag = weak_etag("file", file_id, state.updated_at.isoformat(), fields)
+            if etag_matches(if_none_match, etag):
+                return Response(status_code=304, headers={"ETag": etag})
+
+    file = await file_service.get(id=file_id, fields=file_field_names(fields))
     if not file:
         raise HTTPException(status_code=404, detail="File not found")
-    if (
-        not file.is_public
-        and file.owner_id != current_user.id
-        and not current_user.is_superuser
-    ):
+    if not _can_read(file, current_user):
         raise HTTPException(
             status_code=403, detail="Not enough permissions to access this file"
         )
-    return File.model_validate(file)
+    etag = weak_etag("file", file_id, file.updated_at.isoformat(), fields)
+    adapter = sparse_file_adapter(fields) if fields else FILE_ADAPTER
+    return json_response(adapter, file, {"ETag": etag})
 
 
 @router.put("/{file_id}", response_model=File)
-def update_file(
+async def update_file(
     file_id: uuid.UUID,
     file_in: FileUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user),
 ) -> File:
     """Update a file's metadata.
@@ -168,7 +774,7 @@ def update_file(
     Args:
         file_id: The ID of the file to update.
         file_in: The updated file data.
-        db: Database session.
+        db: Asyncio database session.
         current_user: The authenticated user making the request.
 
     Returns:
@@ -177,8 +783,8 @@ def update_file(
     Raises:
         HTTPException: If the file doesn't exist or the user doesn't have access to it.
     """
-    file_service = FileService(db)
-    file = file_service.get(id=file_id)
+    file_service = AsyncFileService(db)
+    file = await file_service.get(id=file_id)
     if not file:
         raise HTTPException(status_code=404, detail="File not found")
     if file.owner_id != current_user.id and not current_user.is_superuser:
@@ -186,14 +792,17 @@ def update_file(
             status_code=403, detail="Not enough permissions to modify this file"
         )
 
-    file = file_service.update(db_obj=file, obj_in=file_in)
+    try:
+        file = await file_service.update(db_obj=file, obj_in=file_in)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
     return File.model_validate(file)
 
 
 @router.delete("/{file_id}", response_model=File)
-def delete_file(
+async def delete_file(
     file_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user),
 ) -> File:
     """Delete a file.
@@ -202,7 +811,7 @@ def delete_file(
 
     Args:
         file_id: The ID of the file to delete.
-        db: Database session.
+        db: Asyncio database session.
         current_user: The authenticated user making the request.
 
     Returns:
@@ -211,8 +820,8 @@ def delete_file(
     Raises:
         HTTPException: If the file doesn't exist or the user doesn't have access to it.
     """
-    file_service = FileService(db)
-    file = file_service.get(id=file_id)
+    file_service = AsyncFileService(db)
+    file = await file_service.get(id=file_id)
     if not file:
         raise HTTPException(status_code=404, detail="File not found")
     if file.owner_id != current_user.id and not current_user.is_superuser:
@@ -221,7 +830,7 @@ def delete_file(
         )
 
     try:
-        file = file_service.remove(id=file_id)
+        file = await file_service.remove(id=file_id)
         if not file:
             raise HTTPException(status_code=404, detail="File not found")
         return File.model_validate(file)
@@ -4,7 +4,10 @@ from fastapi import APIRouter, Depends
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+from app.core.security import password_hash_executor, token_cache
 from app.db.session import get_db
+from app.services.file_service import download_url_cache
+from app.services.user_service import user_cache
 
 router = APIRouter()
 
@@ -36,3 +39,20 @@ def db_health_check(db: Session = Depends(get_db)) -> dict:
     # Execute a simple query to check database connectivity
     db.execute(text("SELECT 1"))
     return {"status": "ok", "database": "connected"}
+
+
+@router.get("/health/metrics")
+def metrics() -> dict:
+    """In-process metrics endpoint.
+
+    Reports the counters of this worker process only.
+
+    Returns:
+        A dictionary with cache and password hashing pool statistics.
+    """
+    return {
+        "user_cache": user_cache.stats(),
+        "token_cache": token_cache.stats(),
+        "download_url_cache": download_url_cache.stats(),
+        "password_hashing": password_hash_executor.stats(),
+    }
@@ -5,35 +5,47 @@ from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.security import create_access_token
-from app.db.session import get_db
+from app.core.security import PasswordHashingBusyError, create_access_token
+from app.db.session import get_async_db
 from app.schemas.token import Token
-from app.services.user_service import UserService
+from app.services.user_service import AsyncUserService
 
 router = APIRouter()
 
 
 @router.post("/login/access-token", response_model=Token)
-def login_access_token(
-    db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()
+async def login_access_token(
+    db: AsyncSession = Depends(get_async_db), form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """OAuth2 compatible token login, get an access token for future requests.
 
+    The password is checked in the dedicated password hashing pool, so a burst of
+    logins can't starve other requests.
+
     Args:
-        db: Database session.
+        db: Asyncio database session.
         form_data: OAuth2 form data with username and password.
 
     Returns:
         Access token.
 
     Raises:
-        HTTPException: If authentication fails.
+        HTTPException: If authentication fails or too many logins are in progress.
     """
-    user_service = UserService(db)
-    user = user_service.authenticate(email=form_data.username, password=form_data.password)
+    user_service = AsyncUserService(db)
+    try:
+        user = await user_service.authenticate(
+            email=form_data.username, password=form_data.password
+        )
+    except PasswordHashingBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -16,24 +16,27 @@ Details:
 from fastapi import APIRouter, Body, Depends, HTTPException, Path, Query
 from fastapi.encoders import jsonable_encoder
 from pydantic import EmailStr
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.core.security import PasswordHashingBusyError
+from app.db.session import get_async_db
 from app.dependencies.auth import get_current_active_superuser, get_current_active_user
 from app.models.user import User as UserModel
 from app.schemas.user import (
     User as UserSchema,
     UserCreate,
     UserUpdate,
+    UserUsage,
 )
-from app.services.user_service import UserService
+from app.services.usage_service import AsyncUsageService
+from app.services.user_service import AsyncUserService
 
 router = APIRouter()
 
 
 @router.get("", response_model=list[UserSchema])
-def read_users(
-    db: Session = Depends(get_db),
+async def read_users(
+    db: AsyncSession = Depends(get_async_db),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     current_user: UserModel = Depends(get_current_active_superuser),
@@ -43,7 +46,7 @@ def read_users(
     Only superusers can access this endpoint.
 
     Args:
-        db: Database session.
+        db: Asyncio database session.
         skip: Number of records to skip (for pagination).
         limit: Maximum number of records to return (for pagination).
         current_user: The current superuser.
@@ -51,15 +54,15 @@ def read_users(
     Returns:
         List of users.
     """
-    user_service = UserService(db)
-    users = user_service.get_multi(skip=skip, limit=limit)
+    user_service = AsyncUserService(db)
+    users = await user_service.get_multi(skip=skip, limit=limit)
     return users
 
 
 @router.post("", response_model=UserSchema)
-def create_user(
+async def create_user(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_in: UserCreate,
     current_user: UserModel = Depends(get_current_active_superuser),
 ) -> UserModel:
@@ -68,7 +71,7 @@ def create_user(
     Only superusers can access this endpoint.
 
     Args:
-        db: Database session.
+        db: Asyncio database session.
         user_in: New user data.
         current_user: The current superuser.
 
@@ -76,21 +79,27 @@ def create_user(
         The created user.
 
     Raises:
-        HTTPException: If a user with the same email already exists.
+        HTTPException: If a user with the same email already exists or too many
+            passwords are being hashed.
     """
-    user_service = UserService(db)
-    user = user_service.get_by_email(email=user_in.email)
+    user_service = AsyncUserService(db)
+    user = await user_service.get_by_email(email=user_in.email)
     if user:
         raise HTTPException(
             status_code=400,
             detail="A user with this email already exists",
         )
-    user = user_service.create(obj_in=user_in)
+    try:
+        user = await user_service.create(obj_in=user_in)
+    except PasswordHashingBusyError as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "1"}
+        )
     return user
 
 
 @router.get("/me", response_model=UserSchema)
-def read_user_me(
+async def read_user_me(
     current_user: UserModel = Depends(get_current_active_user),
 ) -> UserModel:
     """Get current user.
@@ -105,9 +114,9 @@ def read_user_me(
 
 
 @router.put("/me", response_model=UserSchema)
-def update_user_me(
+async def update_user_me(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     password: str = Body(None),
     full_name: str = Body(None),
     email: EmailStr = Body(None),
@@ -116,7 +125,7 @@ def update_user_me(
     """Update current user.
 
     Args:
-        db: Database session.
+        db: Asyncio database session.
         password: New password (optional).
         full_name: New full name (optional).
         email: New email (optional).
@@ -124,8 +133,11 @@ def update_user_me(
 
     Returns:
         Updated user information.
+
+    Raises:
+        HTTPException: If too many passwords are being hashed.
     """
-    user_service = UserService(db)
+    user_service = AsyncUserService(db)
     current_user_data = jsonable_encoder(current_user)
     user_in = UserUpdate(**current_user_data)
     if password is not None:
@@ -134,22 +146,44 @@ def update_user_me(
         user_in.full_name = full_name
     if email is not None:
         user_in.email = email
-    user = user_service.update(db_obj=current_user, obj_in=user_in)
+    try:
+        user = await user_service.update(db_obj=current_user, obj_in=user_in)
+    except PasswordHashingBusyError as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "1"}
+        )
     return user
 
 
+@router.get("/me/usage", response_model=UserUsage)
+async def read_user_me_usage(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_active_user),
+) -> UserUsage:
+    """Get the current user's storage usage.
+
+    Args:
+        db: Asyncio database session.
+        current_user: The current user.
+
+    Returns:
+        The user's file count, total bytes stored and storage quota.
+    """
+    return await AsyncUsageService(db).get(current_user.id)
+
+
 @router.get("/{user_id}", response_model=UserSchema)
-def read_user_by_id(
+async def read_user_by_id(
     user_id: str = Path(...),
     current_user: UserModel = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> UserModel:
     """Get a specific user by ID.
 
     Args:
         user_id: The ID of the user to retrieve.
         current_user: The current user.
-        db: Database session.
+        db: Asyncio database session.
 
     Returns:
         The requested user.
@@ -158,8 +192,8 @@ def read_user_by_id(
         HTTPException: If the user doesn't exist or the current user
         doesn't have permission to view it.
     """
-    user_service = UserService(db)
-    user = user_service.get(id=user_id)
+    user_service = AsyncUserService(db)
+    user = await user_service.get(id=user_id)
     if user == current_user:
         return user
     if not current_user.is_superuser:
@@ -172,9 +206,9 @@ def read_user_by_id(
 
 
 @router.put("/{user_id}", response_model=UserSchema)
-def update_user(
+async def update_user(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_id: str = Path(...),
     user_in: UserUpdate,
     current_user: UserModel = Depends(get_current_active_superuser),
@@ -184,7 +218,7 @@ def update_user(
     Only superusers can access this endpoint.
 
     Args:
-        db: Database session.
+        db: Asyncio database session.
         user_id: The ID of the user to update.
         user_in: Updated user data.
         current_user: The current superuser.
@@ -193,14 +227,20 @@ def update_user(
         The updated user.
 
     Raises:
-        HTTPException: If the user doesn't exist.
+        HTTPException: If the user doesn't exist or too many passwords are being
+            hashed.
     """
-    user_service = UserService(db)
-    user = user_service.get(id=user_id)
+    user_service = AsyncUserService(db)
+    user = await user_service.get(id=user_id)
     if not user:
         raise HTTPException(
             status_code=404,
             detail="User not found",
         )
-    user = user_service.update(db_obj=user, obj_in=user_in)
+    try:
+        user = await user_service.update(db_obj=user, obj_in=user_in)
+    except PasswordHashingBusyError as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "1"}
+        )
     return user
@@ -1,8 +1,22 @@
 """File Pydantic schemas."""
 
-from datetime import datetime
+import enum
+import functools
+from datetime import datetime, timezone
+from typing import Annotated, Any
 
-from pydantic import UUID4, BaseModel
+from pydantic import (
+    UUID4,
+    AfterValidator,
+    BaseModel,
+    ConfigDict,
+    Field,
+    TypeAdapter,
+    create_model,
+    field_validator,
+)
+
+from app.models.file import FileStatus
 
 
 # Shared properties
@@ -29,8 +43,16 @@ class FileCreate(FileBase):
     """Schema for creating a new file.
 
     This schema is used when uploading file metadata.
+
+    Attributes:
+        sha256: Optional lowercase hex SHA-256 of the content. If the owner
+            already uploaded a file with the same SHA-256 and size, the new file
+            shares its object and nothing needs to be uploaded. Otherwise S3
+            rejects an upload whose content doesn't match.
     """
 
+    sha256: str | None = Field(default=None, pattern=r"^[0-9a-f]{64}$")
+
 
 # Properties to receive via API on update
 class FileUpdate(BaseModel):
@@ -57,6 +79,9 @@ class FileInDBBase(FileBase):
         id: Unique identifier for the file.
         s3_key: Key in the S3 bucket where the file is stored.
         owner_id: ID of the user who owns the file.
+        status: Upload state: pending, uploading, complete or failed.
+        etag: ETag of the object in S3, once the upload is complete.
+        sha256: Hex SHA-256 of the content, if the client provided it.
         created_at: When the file was created.
         updated_at: When the file was last updated.
     """
@@ -64,6 +89,9 @@ class FileInDBBase(FileBase):
     id: UUID4
     s3_key: str
     owner_id: UUID4
+    status: str
+    etag: str | None = None
+    sha256: str | None = None
     created_at: datetime
     updated_at: datetime
 
@@ -78,16 +106,180 @@ class File(FileInDBBase):
     """Schema for file data returned via API."""
 
 
+# Built once, since building an adapter compiles its validator and serializer
+FILE_ADAPTER: TypeAdapter[File] = TypeAdapter(File)
+FILE_LIST_ADAPTER: TypeAdapter[list[File]] = TypeAdapter(list[File])
+
+
+def normalize_file_fields(value: str) -> str:
+    """Validate a comma-separated selection of File fields.
+
+    Args:
+        value: Field names separated by commas, e.g. "id,filename".
+
+    Returns:
+        The distinct names in the order File declares them, separated by
+        commas, so equal selections compare and cache as equal.
+
+    Raises:
+        ValueError: If a name isn't a File field or none is given.
+    """
+    names = {name.strip() for name in value.split(",")} - {""}
+    unknown = names - File.model_fields.keys()
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {', '.join(sorted(unknown))}. "
+            f"Choose from: {', '.join(File.model_fields)}"
+        )
+    if not names:
+        raise ValueError("Select at least one field")
+    return ",".join(name for name in File.model_fields if name in names)
+
+
+# Sparse fieldset: the File fields to return, from the fields query parameter
+FileFields = Annotated[str, AfterValidator(normalize_file_fields)]
+
+
+def file_field_names(fields: str | None) -> tuple[str, ...] | None:
+    """Split a normalized field selection into names.
+
+    Args:
+        fields: A selection validated as FileFields, or None for all fields.
+
+    Returns:
+        The selected names, or None for all fields.
+    """
+    return tuple(fields.split(",")) if fields else None
+
+
+@functools.lru_cache(maxsize=128)
+def sparse_file_adapter(fields: str, *, many: bool = False) -> TypeAdapter[Any]:
+    """Get an adapter for files with only some of File's fields.
+
+    Adapters are cached per selection, since building one compiles its
+    validator and serializer.
+
+    Args:
+        fields: A selection validated as FileFields.
+        many: Whether to adapt a list of files rather than one.
+
+    Returns:
+        The adapter, which reads the fields from ORM objects' attributes.
+    """
+    model = create_model(
+        "SparseFile",
+        __config__=ConfigDict(from_attributes=True),
+        **{
+            name: (File.model_fields[name].annotation, File.model_fields[name])
+            for name in fields.split(",")
+        },
+    )
+    return TypeAdapter(list[model] if many else model)
+
+
+class FileSort(str, enum.Enum):
+    """Orders files can be listed in; a leading "-" means descending.
+
+    Ties are broken by file ID in the same direction.
+    """
+
+    CREATED_AT = "created_at"
+    CREATED_AT_DESC = "-created_at"
+    SIZE_BYTES = "size_bytes"
+    SIZE_BYTES_DESC = "-size_bytes"
+    FILENAME = "filename"
+    FILENAME_DESC = "-filename"
+
+
+class FileListFilter(BaseModel):
+    """Filters for listing a user's files. Unset filters match every file.
+
+    Attributes:
+        status: Upload status. By default, all files except failed uploads.
+        content_type: Prefix of the MIME type, e.g. "image/" or "text/csv".
+        min_size: Smallest size in bytes.
+        max_size: Largest size in bytes.
+        created_after: Earliest creation time.
+        created_before: Latest creation time.
+        updated_after: Earliest update time.
+        updated_before: Latest update time.
+        is_public: Whether the file is public.
+    """
+
+    status: FileStatus | None = None
+    # Characters allowed in MIME types; none of them are LIKE or GLOB wildcards
+    # except "_", which is escaped
+    content_type: str | None = Field(
+        default=None, max_length=100, pattern=r"^[A-Za-z0-9!#$&^_.+/-]+$"
+    )
+    min_size: int | None = Field(default=None, ge=0)
+    max_size: int | None = Field(default=None, ge=0)
+    created_after: datetime | None = None
+    created_before: datetime | None = None
+    updated_after: datetime | None = None
+    updated_before: datetime | None = None
+    is_public: bool | None = None
+
+    @field_validator(
+        "created_after", "created_before", "updated_after", "updated_before"
+    )
+    @classmethod
+    def to_naive_utc(cls, value: datetime | None) -> datetime | None:
+        """Convert aware times to naive UTC, as timestamps are stored.
+
+        Args:
+            value: The time, naive times being taken as UTC.
+
+        Returns:
+            The naive UTC time.
+        """
+        if value is None or value.tzinfo is None:
+            return value
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class FileListQuery(FileListFilter):
+    """Query string of file listings: paging, sort order and filters.
+
+    Attributes:
+        skip: Number of files to skip. Ignored with a cursor.
+        limit: Maximum number of files to return.
+        cursor: Cursor from the X-Next-Cursor header of the previous page.
+        sort: Order of the files.
+        fields: File fields to return, separated by commas. All by default.
+    """
+
+    skip: int = Field(
+        default=0, ge=0, description="Number of files to skip (ignored with a cursor)"
+    )
+    limit: int = Field(
+        default=100, ge=1, le=100, description="Maximum number of files to return"
+    )
+    cursor: str | None = Field(
+        default=None,
+        description="Cursor from the X-Next-Cursor header of the previous page",
+    )
+    sort: FileSort = Field(
+        default=FileSort.CREATED_AT,
+        description="Order of the files; a leading '-' means descending",
+    )
+    fields: FileFields | None = Field(
+        default=None,
+        description="File fields to return, separated by commas, e.g. id,filename",
+    )
+
+
 # Additional schemas
 class FileUploadResponse(BaseModel):
     """Schema for the response from a file upload request.
 
     Attributes:
-        upload_url: Presigned URL for uploading the file to S3.
+        upload_url: Presigned URL for uploading the file to S3, or None if the
+            content is already stored and the file is complete.
         file_id: ID of the file in the database.
     """
 
-    upload_url: str
+    upload_url: str | None = None
     file_id: UUID4
 
 
@@ -103,3 +295,131 @@ class FileDownloadResponse(BaseModel):
     download_url: str
     filename: str
     content_type: str
+
+
+class FileBatchUploadItem(BaseModel):
+    """Schema for the result of one item in a batch upload request.
+
+    Either file_id and upload_url are set, or error explains why the item failed.
+
+    Attributes:
+        index: Position of the item in the request.
+        file_id: ID of the file in the database.
+        upload_url: Presigned URL for uploading the file to S3.
+        error: Why the item could not be processed.
+    """
+
+    index: int
+    file_id: UUID4 | None = None
+    upload_url: str | None = None
+    error: str | None = None
+
+
+class FileBatchUploadResponse(BaseModel):
+    """Schema for the response from a batch upload request.
+
+    Attributes:
+        items: One result per requested file, in request order.
+    """
+
+    items: list[FileBatchUploadItem]
+
+
+class FileBatchDeleteItem(BaseModel):
+    """Schema for the result of one file in a batch delete request.
+
+    The object of a deleted file is removed from S3 afterwards, by the S3
+    deletion worker.
+
+    Attributes:
+        file_id: ID of the file.
+        deleted: Whether the file was deleted.
+        error: Why the file could not be deleted.
+    """
+
+    file_id: UUID4
+    deleted: bool
+    error: str | None = None
+
+
+class FileBatchDeleteResponse(BaseModel):
+    """Schema for the response from a batch delete request.
+
+    Attributes:
+        items: One result per requested file, in request order.
+    """
+
+    items: list[FileBatchDeleteItem]
+
+
+class FileMultipartUploadResponse(BaseModel):
+    """Schema for the response from a multipart upload initiation request.
+
+    The client splits the file into part_count parts of part_size bytes (the last
+    part may be smaller) and requests an upload URL for each.
+
+    Attributes:
+        file_id: ID of the file in the database.
+        upload_id: ID of the S3 multipart upload.
+        part_size: Size of each part in bytes.
+        part_count: Number of parts to upload.
+    """
+
+    file_id: UUID4
+    upload_id: str
+    part_size: int
+    part_count: int
+
+
+class FileMultipartPartUrlsRequest(BaseModel):
+    """Schema for requesting presigned URLs for multipart upload parts.
+
+    Attributes:
+        part_numbers: Numbers of the parts to upload, starting at 1.
+    """
+
+    part_numbers: list[int] = Field(..., min_length=1, max_length=1000)
+
+
+class FileMultipartPartUrl(BaseModel):
+    """Schema for the presigned URL of one multipart upload part.
+
+    Attributes:
+        part_number: Number of the part.
+        upload_url: Presigned URL for uploading the part to S3.
+    """
+
+    part_number: int
+    upload_url: str
+
+
+class FileMultipartPartUrlsResponse(BaseModel):
+    """Schema for the response from a multipart part URLs request.
+
+    Attributes:
+        parts: One upload URL per requested part.
+    """
+
+    parts: list[FileMultipartPartUrl]
+
+
+class FileMultipartPart(BaseModel):
+    """Schema for an uploaded multipart upload part.
+
+    Attributes:
+        part_number: Number of the part.
+        etag: ETag header S3 returned when the part was uploaded.
+    """
+
+    part_number: int = Field(..., ge=1, le=10_000)
+    etag: str
+
+
+class FileMultipartCompleteRequest(BaseModel):
+    """Schema for completing a multipart upload.
+
+    Attributes:
+        parts: Every uploaded part.
+    """
+
+    parts: list[FileMultipartPart] = Field(..., min_length=1, max_length=10_000)
@@ -84,3 +84,17 @@ class UserInDB(UserInDBBase):
     """
 
     hashed_password: str
+
+
+class UserUsage(BaseModel):
+    """Schema for a user's storage usage.
+
+    Attributes:
+        file_count: Number of files the user has.
+        total_bytes: Total size of the user's files in bytes.
+        quota_bytes: Most bytes the user may store, or None if unlimited.
+    """
+
+    file_count: int
+    total_bytes: int
+    quota_bytes: int | None = None
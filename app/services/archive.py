@@ -0,0 +1,183 @@
+"""Streaming ZIP archives of files' content."""
+
+import contextlib
+import zipfile
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import PurePosixPath
+from typing import Any
+
+from sqlalchemy import Row
+
+from app.core.config import settings
+from app.services.file_service import FileService, iter_s3_body
+
+# Content that deflate can't shrink further, so it's stored as is
+ALREADY_COMPRESSED_PREFIXES = ("audio/", "video/")
+ALREADY_COMPRESSED_TYPES = frozenset(
+    {
+        "application/gzip",
+        "application/vnd.rar",
+        "application/x-7z-compressed",
+        "application/x-bzip2",
+        "application/x-gzip",
+        "application/x-rar-compressed",
+        "application/x-xz",
+        "application/zip",
+        "application/zstd",
+        "image/avif",
+        "image/gif",
+        "image/heic",
+        "image/jpeg",
+        "image/png",
+        "image/webp",
+    }
+)
+# Office documents are ZIP archives themselves
+ALREADY_COMPRESSED_TYPE_PREFIXES = ("application/vnd.openxmlformats-officedocument.",)
+
+# Earliest timestamp a ZIP entry can have
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+# Opens the next object of each archive while the current one streams out
+_prefetch_executor = ThreadPoolExecutor(
+    max_workers=settings.ARCHIVE_PREFETCH_WORKERS,
+    thread_name_prefix="archive-prefetch",
+)
+
+
+def is_compressed(content_type: str) -> bool:
+    """Check whether content of a type is already compressed.
+
+    Args:
+        content_type: MIME type of the content.
+
+    Returns:
+        True if deflating the content wouldn't make it smaller.
+    """
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return media_type in ALREADY_COMPRESSED_TYPES or media_type.startswith(
+        ALREADY_COMPRESSED_PREFIXES + ALREADY_COMPRESSED_TYPE_PREFIXES
+    )
+
+
+def archive_names(filenames: Iterable[str]) -> list[str]:
+    """Name archive entries after files, numbering repeated names.
+
+    Args:
+        filenames: The files' names, in archive order.
+
+    Returns:
+        A unique entry name for each file, e.g. "a.txt", "a (1).txt".
+    """
+    names: list[str] = []
+    taken: set[str] = set()
+    for filename in filenames:
+        # Entries must not escape the directory the archive is extracted to
+        name = PurePosixPath(filename.replace("\\", "/")).name or "file"
+        path = PurePosixPath(name)
+        candidate, number = name, 0
+        while candidate in taken:
+            number += 1
+            candidate = f"{path.stem} ({number}){path.suffix}"
+        taken.add(candidate)
+        names.append(candidate)
+    return names
+
+
+class _ZipSink:
+    """Unseekable output that buffers what ZipFile writes until it's drained."""
+
+    def __init__(self) -> None:
+        """Start with an empty buffer."""
+        self._chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        """Buffer data written by ZipFile.
+
+        Args:
+            data: The data.
+
+        Returns:
+            The number of bytes written.
+        """
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        """Do nothing; the data is drained by the archive's reader."""
+
+    def drain(self) -> bytes:
+        """Take the data written since the last drain.
+
+        Returns:
+            The data.
+        """
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_archive(
+    files: list[Row[Any]],
+    file_service: FileService,
+    chunk_size: int = settings.DOWNLOAD_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """Build a ZIP archive of files' content as it's read from S3.
+
+    Memory use is a few chunks, whatever the number and size of the files:
+    each chunk read from S3 is compressed and handed out before the next one is
+    read. Entries use ZIP64 when they need to, so archives and files can be
+    larger than 4 GiB. Already-compressed content is stored rather than
+    deflated, which would only cost CPU. The next file's object is opened in
+    the background while the current one is streamed, hiding S3's latency.
+
+    Args:
+        files: The files, as returned by FileService.get_archive_files.
+        file_service: File service to read the objects with.
+        chunk_size: Size of the chunks read from S3.
+
+    Yields:
+        The archive, one chunk at a time.
+    """
+    sink = _ZipSink()
+    names = archive_names(file.filename for file in files)
+    opening: Future[dict[str, Any]] | None = None
+    if files:
+        opening = _prefetch_executor.submit(
+            file_service.read_s3_object, files[0].s3_key
+        )
+    try:
+        with zipfile.ZipFile(sink, mode="w") as archive:
+            for index, (file, name) in enumerate(zip(files, names, strict=True)):
+                s3_object = opening.result()
+                opening = None
+                if index + 1 < len(files):
+                    opening = _prefetch_executor.submit(
+                        file_service.read_s3_object, files[index + 1].s3_key
+                    )
+
+                info = zipfile.ZipInfo(
+                    name, date_time=max(file.created_at.timetuple()[:6], ZIP_EPOCH)
+                )
+                info.compress_type = (
+                    zipfile.ZIP_STORED
+                    if is_compressed(file.content_type)
+                    else zipfile.ZIP_DEFLATED
+                )
+                # Lets ZipFile decide whether the entry needs ZIP64 sizes
+                info.file_size = file.size_bytes
+                with archive.open(info, mode="w") as entry:
+                    for chunk in iter_s3_body(s3_object["Body"], chunk_size):
+                        entry.write(chunk)
+                        # Deflate holds back output until it has enough input
+                        if data := sink.drain():
+                            yield data
+                yield sink.drain()
+        # Closing the archive wrote its central directory
+        yield sink.drain()
+    finally:
+        # The client went away before the prefetched object was streamed
+        if opening is not None and not opening.cancel():
+            with contextlib.suppress(Exception):
+                opening.result()["Body"].close()
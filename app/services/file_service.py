@@ -1,21 +1,305 @@
 """File service for file operations."""
 
+import asyncio
+import base64
+import hashlib
+import logging
+import re
+import time
 import uuid
-from typing import Any
+from collections import Counter
+from collections.abc import AsyncIterable, Callable, Iterator, Sequence
+from datetime import datetime, timezone
+from typing import Any, ParamSpec, TypeVar
 
-import boto3
+from botocore.client import BaseClient
 from botocore.exceptions import ClientError
-from sqlalchemy.orm import Session
+from sqlalchemy import Row, Select, delete, insert, select, tuple_, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only
 
+from app.core.cache import TTLCache
 from app.core.config import settings
-from app.models.file import File as FileModel
+from app.core.pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    parse_cursor_datetime,
+)
+from app.core.presign import PresignError, S3Presigner
+from app.core.s3 import get_s3_client, get_s3_presigner
+from app.db.file_search import ranked_matches, search_terms
+from app.models.blob import Blob
+from app.models.file import (
+    File as FileModel,
+    FileStatus,
+)
+from app.models.s3_deletion import S3Deletion
 from app.models.user import User as UserModel
 from app.schemas.file import (
+    FileBatchDeleteItem,
+    FileBatchDeleteResponse,
+    FileBatchUploadItem,
+    FileBatchUploadResponse,
     FileCreate,
     FileDownloadResponse,
+    FileListFilter,
+    FileMultipartPart,
+    FileMultipartPartUrl,
+    FileMultipartPartUrlsResponse,
+    FileMultipartUploadResponse,
+    FileSort,
     FileUpdate,
     FileUploadResponse,
 )
+from app.services.usage_service import QuotaExceededError, UsageService
+
+logger = logging.getLogger(__name__)
+
+# S3 multipart upload limits
+MULTIPART_MAX_PARTS = 10_000
+MULTIPART_MAX_OBJECT_SIZE = 5 * 1024**4  # 5 TiB
+MIB = 1024 * 1024
+# Most keys S3 accepts in one DeleteObjects request
+S3_DELETE_OBJECTS_MAX_KEYS = 1000
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+# Presigned download URLs, keyed by S3 key
+download_url_cache: TTLCache[str, str] = TTLCache(
+    maxsize=settings.DOWNLOAD_URL_CACHE_SIZE, ttl=0
+)
+
+
+class MultipartUploadError(Exception):
+    """Raised when a multipart upload request doesn't fit the upload's state."""
+
+
+class UploadIncompleteError(Exception):
+    """Raised when a file is marked complete before its object is in S3."""
+
+
+class ContentUploadError(Exception):
+    """Raised when content streamed through the API can't become a file's object."""
+
+
+class ContentTooLargeError(ContentUploadError):
+    """Raised when content is too large to be streamed through the API."""
+
+
+class RangeNotSatisfiableError(Exception):
+    """Raised when a requested byte range lies outside a file's content."""
+
+    def __init__(self, message: str, size_bytes: int | None = None) -> None:
+        """Keep the content's size, when known, for the Content-Range header."""
+        super().__init__(message)
+        self.size_bytes = size_bytes
+
+
+# A single byte range, the only kind S3 serves
+SINGLE_BYTE_RANGE = re.compile(r"bytes=(\d+-\d*|-\d+)")
+
+
+def requested_range(
+    range_header: str | None, if_range: str | None, etag: str | None
+) -> str | None:
+    """Get the byte range to request from S3 for a download.
+
+    As HTTP allows, unsupported ranges are ignored and the whole content is
+    served. The range is also ignored if If-Range doesn't carry the content's
+    current ETag; If-Range dates aren't compared, so they always get the whole
+    content too.
+
+    Args:
+        range_header: The request's Range header.
+        if_range: The request's If-Range header.
+        etag: ETag of the file's content, without quotes.
+
+    Returns:
+        The Range to pass to S3, or None to get the whole object.
+    """
+    if not range_header or not SINGLE_BYTE_RANGE.fullmatch(range_header.strip()):
+        return None
+    if if_range is not None and if_range.strip() != f'"{etag}"':
+        return None
+    return range_header.strip()
+
+
+def iter_s3_body(body: Any, chunk_size: int) -> Iterator[bytes]:
+    """Read an S3 object's body in fixed-size chunks, closing it when done.
+
+    Args:
+        body: The StreamingBody of a GetObject response.
+        chunk_size: Size of each chunk in bytes.
+
+    Yields:
+        The content, one chunk at a time.
+    """
+    try:
+        yield from body.iter_chunks(chunk_size)
+    finally:
+        body.close()
+
+
+def _ceil_div(numerator: int, denominator: int) -> int:
+    """Divide two integers, rounding up.
+
+    Args:
+        numerator: The dividend.
+        denominator: The divisor.
+
+    Returns:
+        The smallest integer not less than numerator / denominator.
+    """
+    return -(-numerator // denominator)
+
+
+def choose_part_size(size_bytes: int) -> int:
+    """Choose the part size for a multipart upload.
+
+    Parts are at least MULTIPART_MIN_PART_SIZE, and large enough that the file
+    fits in S3's maximum of 10,000 parts. Sizes are rounded up to whole MiB.
+
+    Args:
+        size_bytes: Total size of the file.
+
+    Returns:
+        The part size in bytes.
+    """
+    part_size = max(
+        settings.MULTIPART_MIN_PART_SIZE, _ceil_div(size_bytes, MULTIPART_MAX_PARTS)
+    )
+    return _ceil_div(part_size, MIB) * MIB
+
+
+def count_parts(size_bytes: int) -> int:
+    """Count the parts a multipart upload of the given size is split into.
+
+    Args:
+        size_bytes: Total size of the file.
+
+    Returns:
+        The number of parts, at least one.
+    """
+    return max(1, _ceil_div(size_bytes, choose_part_size(size_bytes)))
+
+
+def _counted_usage(status: str, size_bytes: int) -> tuple[int, int]:
+    """Get what a file counts for in its owner's usage.
+
+    Args:
+        status: The file's upload status.
+        size_bytes: The file's size.
+
+    Returns:
+        The number of files and bytes counted: none for failed uploads.
+    """
+    if status == FileStatus.FAILED.value:
+        return 0, 0
+    return 1, size_bytes
+
+
+def content_upload_max_size() -> int:
+    """Get the largest content that can be streamed through the API.
+
+    Returns:
+        The size in bytes: MULTIPART_MAX_PARTS parts of CONTENT_UPLOAD_PART_SIZE,
+        at most S3's maximum object size.
+    """
+    return min(
+        settings.CONTENT_UPLOAD_PART_SIZE * MULTIPART_MAX_PARTS,
+        MULTIPART_MAX_OBJECT_SIZE,
+    )
+
+
+def _batch_delete_response(
+    file_ids: list[uuid.UUID], errors: dict[str, str]
+) -> FileBatchDeleteResponse:
+    """Build the per-file results of a batch delete.
+
+    Args:
+        file_ids: IDs of the files, in request order.
+        errors: Why each file that wasn't deleted was skipped, by file ID.
+
+    Returns:
+        A response with one result per file, in request order.
+    """
+    items = []
+    for file_id in file_ids:
+        error = errors.get(str(file_id))
+        items.append(
+            FileBatchDeleteItem(file_id=file_id, deleted=error is None, error=error)
+        )
+    return FileBatchDeleteResponse(items=items)
+
+
+def _check_column_limits(file_info: FileCreate) -> str | None:
+    """Check that file information fits in the file table's columns.
+
+    Args:
+        file_info: Information about the file to be uploaded.
+
+    Returns:
+        An error message if a value doesn't fit, None otherwise.
+    """
+    for field in ("filename", "content_type"):
+        max_length = getattr(FileModel, field).type.length
+        if len(getattr(file_info, field)) > max_length:
+            return f"{field} must be at most {max_length} characters"
+    if file_info.size_bytes < 0:
+        return "size_bytes must not be negative"
+    return None
+
+
+# Column each listing order sorts by, before the ID
+_SORT_COLUMNS = {
+    FileSort.CREATED_AT: FileModel.created_at,
+    FileSort.CREATED_AT_DESC: FileModel.created_at,
+    FileSort.SIZE_BYTES: FileModel.size_bytes,
+    FileSort.SIZE_BYTES_DESC: FileModel.size_bytes,
+    FileSort.FILENAME: FileModel.filename,
+    FileSort.FILENAME_DESC: FileModel.filename,
+}
+
+
+def _decode_list_cursor(cursor: str, sort: FileSort) -> tuple[Any, str]:
+    """Decode a listing cursor for the given order.
+
+    Args:
+        cursor: Cursor returned by FileService.next_cursor.
+        sort: The order of the listing.
+
+    Returns:
+        The sort key value and ID of the last file of the previous page.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or from another order.
+    """
+    cursor_sort, key, file_id = decode_cursor(cursor, length=3)
+    if cursor_sort != sort.value:
+        raise InvalidCursorError("Pagination cursor is for a different sort order")
+    column = _SORT_COLUMNS[sort]
+    if column is FileModel.created_at:
+        return parse_cursor_datetime(key), str(file_id)
+    expected_type = int if column is FileModel.size_bytes else str
+    if not isinstance(key, expected_type):
+        raise InvalidCursorError("Invalid pagination cursor")
+    return key, str(file_id)
+
+
+def _load_only(fields: Sequence[str], *required: Any) -> Any:
+    """Build a loader option reading only some of a file's columns.
+
+    Args:
+        fields: Names of the columns to read, as in the File schema.
+        *required: Columns the caller needs as well. The ID is always read.
+
+    Returns:
+        The option.
+    """
+    return load_only(*(getattr(FileModel, name) for name in fields), *required)
 
 
 class FileService:
@@ -26,79 +310,74 @@ class FileService:
 
     Attributes:
         db: Database session.
-        s3_client: Boto3 S3 client.
+        s3_client: Boto3 S3 client, shared across the worker process.
+        presigner: SigV4 presigner for upload and download URLs.
     """
 
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        s3_client: BaseClient | None = None,
+        presigner: S3Presigner | None = None,
+    ):
         """Initialize the file service.
 
         Args:
             db: Database session.
+            s3_client: Optional S3 client. Defaults to the process-wide shared client.
+            presigner: Optional URL presigner. Defaults to the process-wide shared one.
         """
         self.db = db
+        self.usage = UsageService(db)
+        self.s3_client = s3_client or get_s3_client()
+        self.presigner = presigner or get_s3_presigner()
+        self.s3_bucket_name = settings.S3_BUCKET_NAME
+        self.is_local_dev = settings.DEBUG
 
-        # Configure S3 client
-        if settings.DEBUG:
-            # Local development with MinIO
-            self.s3_client = boto3.client(
-                "s3",
-                region_name=settings.AWS_REGION,
-                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-                endpoint_url="http://minio:9000",  # MinIO service in docker-compose
-                # Use path-style instead of virtual-hosted style (required for MinIO)
-                config=boto3.session.Config(s3={"addressing_style": "path"}),
-            )
-            self.s3_bucket_name = settings.S3_BUCKET_NAME
-            self.is_local_dev = True
-        else:
-            # Production AWS configuration
-            # Create a configuration with signature version 4, required for all regions
-            s3_config = boto3.session.Config(
-                signature_version="s3v4", region_name=settings.AWS_REGION
-            )
-
-            # In production, if USE_INSTANCE_ROLE is True, don't pass explicit credentials
-            # This allows boto3 to use the EC2 instance role or environment variables
-            if settings.USE_INSTANCE_ROLE:
-                self.s3_client = boto3.client(
-                    "s3", region_name=settings.AWS_REGION, config=s3_config
-                )
-            else:  # noqa: PLR5501
-                # Otherwise, use the provided credentials (for testing or non-EC2 environments)
-                # Skip MinIO default credentials
-                if (
-                    settings.AWS_ACCESS_KEY_ID != "minio"
-                    and settings.AWS_SECRET_ACCESS_KEY != "minio123"  # noqa: S105
-                ):
-                    self.s3_client = boto3.client(
-                        "s3",
-                        region_name=settings.AWS_REGION,
-                        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-                        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-                        config=s3_config,
-                    )
-                else:
-                    # Fallback without credentials - boto3 will check environment variables and instance role
-                    self.s3_client = boto3.client(
-                        "s3", region_name=settings.AWS_REGION, config=s3_config
-                    )
-
-            self.s3_bucket_name = settings.S3_BUCKET_NAME
-            self.is_local_dev = False
-
-    def get(self, id: uuid.UUID | str) -> FileModel | None:
+    def get(
+        self, id: uuid.UUID | str, fields: Sequence[str] | None = None
+    ) -> FileModel | None:
         """Get a file by ID.
 
         Args:
             id: File ID (can be UUID or string).
+            fields: Columns to read, all by default. The ones deciding access
+                and the ETag (owner_id, is_public and updated_at) are read too.
 
         Returns:
             The file with the given ID or None if not found.
         """
         # Convert ID to string to match database column type
         file_id = str(id) if isinstance(id, uuid.UUID) else id
-        return self.db.query(FileModel).filter(FileModel.id == file_id).first()
+        query = self.db.query(FileModel).filter(FileModel.id == file_id)
+        if fields is not None:
+            query = query.options(
+                _load_only(
+                    fields,
+                    FileModel.owner_id,
+                    FileModel.is_public,
+                    FileModel.updated_at,
+                )
+            )
+        return query.first()
+
+    def get_state(self, id: uuid.UUID | str) -> Row | None:
+        """Get what decides access to a file and whether it changed.
+
+        Only three columns are read and no ORM object is built, which is all a
+        conditional GET needs when the client's copy is current.
+
+        Args:
+            id: File ID (can be UUID or string).
+
+        Returns:
+            The file's owner_id, is_public and updated_at, or None if not found.
+        """
+        return self.db.execute(
+            select(FileModel.owner_id, FileModel.is_public, FileModel.updated_at).where(
+                FileModel.id == str(id)
+            )
+        ).first()
 
     def get_multi(self, skip: int = 0, limit: int = 100) -> list[FileModel]:
         """Get multiple files.
@@ -112,60 +391,358 @@ class FileService:
         """
         return self.db.query(FileModel).offset(skip).limit(limit).all()
 
-    def get_multi_by_owner(
-        self, owner_id: uuid.UUID | str, skip: int = 0, limit: int = 100
+    def get_multi_by_owner(  # noqa: PLR0913 - listing options are keyword-only
+        self,
+        owner_id: uuid.UUID | str,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: str | None = None,
+        filters: FileListFilter | None = None,
+        sort: FileSort = FileSort.CREATED_AT,
+        fields: Sequence[str] | None = None,
     ) -> list[FileModel]:
-        """Get multiple files by owner.
+        """Get multiple files by owner, filtered and sorted.
+
+        Pass the cursor from next_cursor to get the following page: the query
+        then seeks directly to it in the owner's index for the sort key instead
+        of skipping rows one by one.
 
         Args:
             owner_id: Owner's ID (can be UUID or string).
-            skip: Number of records to skip.
+            skip: Number of records to skip. Ignored when a cursor is given.
             limit: Maximum number of records to return.
+            cursor: Cursor returned by next_cursor for the previous page.
+            filters: Filters the files must match. By default, all files except
+                failed uploads are returned.
+            sort: Order of the files, oldest first by default.
+            fields: Columns to read, all by default. The sort key is read too,
+                for next_cursor.
 
         Returns:
             A list of files owned by the specified user.
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed or from another sort.
         """
-        # Convert UUID to string if it's a UUID object
-        owner_id_str = str(owner_id) if isinstance(owner_id, uuid.UUID) else owner_id
+        statement = self.owner_files_statement(owner_id, filters, sort, cursor)
+        if cursor is None and skip:
+            statement = statement.offset(skip)
+        if fields is not None:
+            # Skipping unrequested columns, the unbounded description in
+            # particular, saves reading and hydrating them
+            statement = statement.options(_load_only(fields, _SORT_COLUMNS[sort]))
+        return list(self.db.scalars(statement.limit(limit)).all())
 
-        return (
-            self.db.query(FileModel)
-            .filter(FileModel.owner_id == owner_id_str)
-            .offset(skip)
-            .limit(limit)
-            .all()
+    def owner_files_statement(
+        self,
+        owner_id: uuid.UUID | str,
+        filters: FileListFilter | None = None,
+        sort: FileSort = FileSort.CREATED_AT,
+        cursor: str | None = None,
+    ) -> Select:
+        """Build the query listing an owner's files, without paging limits.
+
+        Every query has an equality on owner_id, and every index on file it can
+        use starts with owner_id: one per sort key, ending with the sort key
+        and id so pages are read in order, plus ones for the content type and
+        update time filters. Other filters are checked on the rows the index
+        yields, so no combination scans the whole table.
+
+        Args:
+            owner_id: Owner's ID (can be UUID or string).
+            filters: Filters the files must match.
+            sort: Order of the files.
+            cursor: Cursor returned by next_cursor for the previous page.
+
+        Returns:
+            The query.
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed or from another sort.
+        """
+        filters = filters or FileListFilter()
+        key = _SORT_COLUMNS[sort]
+        descending = sort.value.startswith("-")
+        statement = select(FileModel).where(
+            FileModel.owner_id == str(owner_id), *self._filter_conditions(filters)
         )
+        if cursor is not None:
+            position = tuple_(key, FileModel.id)
+            after = tuple_(*_decode_list_cursor(cursor, sort))
+            statement = statement.where(
+                position < after if descending else position > after
+            )
+        if descending:
+            return statement.order_by(key.desc(), FileModel.id.desc())
+        return statement.order_by(key, FileModel.id)
 
-    def create(self, obj_in: FileCreate, owner_id: uuid.UUID | str) -> FileModel:
-        """Create a new file metadata record.
+    def _filter_conditions(self, filters: FileListFilter) -> list[Any]:
+        """Build the WHERE conditions for listing filters.
+
+        Args:
+            filters: The filters.
+
+        Returns:
+            The conditions, all of which must hold.
+        """
+        if filters.status is None:
+            conditions = [FileModel.status != FileStatus.FAILED.value]
+        else:
+            conditions = [FileModel.status == FileStatus(filters.status).value]
+        if filters.content_type is not None:
+            conditions.append(self._content_type_prefix(filters.content_type))
+        bounds = (
+            (FileModel.size_bytes, filters.min_size, filters.max_size),
+            (FileModel.created_at, filters.created_after, filters.created_before),
+            (FileModel.updated_at, filters.updated_after, filters.updated_before),
+        )
+        for column, low, high in bounds:
+            if low is not None:
+                conditions.append(column >= low)
+            if high is not None:
+                conditions.append(column <= high)
+        if filters.is_public is not None:
+            conditions.append(FileModel.is_public.is_(filters.is_public))
+        return conditions
+
+    def _content_type_prefix(self, prefix: str) -> Any:
+        """Build a content type prefix condition that can use an index.
+
+        Postgres uses its varchar_pattern_ops index for LIKE with a constant
+        prefix. SQLite's LIKE is case-insensitive and can't use an ordinary
+        index, but its case-sensitive GLOB can.
+
+        Args:
+            prefix: The prefix, restricted to MIME type characters.
+
+        Returns:
+            The condition.
+        """
+        if self.db.get_bind().dialect.name == "sqlite":
+            return FileModel.content_type.op("GLOB")(f"{prefix}*")
+        return FileModel.content_type.like(
+            prefix.replace("_", "\\_") + "%", escape="\\"
+        )
+
+    @staticmethod
+    def next_cursor(
+        files: list[FileModel], limit: int, sort: FileSort = FileSort.CREATED_AT
+    ) -> str | None:
+        """Get the cursor for the page after the given one.
+
+        Args:
+            files: The files of the current page, as returned by get_multi_by_owner.
+            limit: The page size the files were requested with.
+            sort: The order the files were requested in.
+
+        Returns:
+            The cursor, or None if this was the last page.
+        """
+        if len(files) < limit:
+            return None
+        last = files[-1]
+        key = getattr(last, _SORT_COLUMNS[sort].key)
+        return encode_cursor(sort.value, key, last.id)
+
+    def search(
+        self,
+        owner_id: uuid.UUID | str,
+        query: str,
+        limit: int = 100,
+        cursor: str | None = None,
+    ) -> list[tuple[FileModel, float]]:
+        """Search an owner's files by filename and description, best matches first.
+
+        Every word of the query must match the start of a word in the filename
+        or description; filename matches rank higher. Files are ordered by
+        (rank, id), both descending, and pages continue from the cursor returned
+        by next_search_cursor. Failed uploads aren't returned.
+
+        Args:
+            owner_id: Owner's ID (can be UUID or string).
+            query: The search query.
+            limit: Maximum number of records to return.
+            cursor: Cursor returned by next_search_cursor for the previous page.
+
+        Returns:
+            The matching files with their rank.
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed.
+        """
+        terms = search_terms(query)
+        if not terms:
+            return []
+
+        dialect = self.db.get_bind().dialect.name
+        matches = ranked_matches(dialect, owner_id, terms).subquery()
+        statement = (
+            select(FileModel, matches.c.rank)
+            .join(matches, FileModel.id == matches.c.file_id)
+            .where(FileModel.status != FileStatus.FAILED.value)
+            .order_by(matches.c.rank.desc(), FileModel.id.desc())
+        )
+        if cursor is not None:
+            rank, file_id = decode_cursor(cursor, length=2)
+            if not isinstance(rank, int | float):
+                raise InvalidCursorError("Invalid pagination cursor")
+            statement = statement.where(
+                tuple_(matches.c.rank, FileModel.id) < tuple_(rank, str(file_id))
+            )
+        rows = self.db.execute(statement.limit(limit)).all()
+        return [(row[0], row[1]) for row in rows]
+
+    @staticmethod
+    def next_search_cursor(
+        results: list[tuple[FileModel, float]], limit: int
+    ) -> str | None:
+        """Get the cursor for the page of search results after the given one.
+
+        Args:
+            results: The files and ranks of the current page, as returned by search.
+            limit: The page size the results were requested with.
+
+        Returns:
+            The cursor, or None if this was the last page.
+        """
+        if len(results) < limit:
+            return None
+        last, rank = results[-1]
+        return encode_cursor(rank, last.id)
+
+    def _new_file_values(
+        self, obj_in: FileCreate, owner_id: uuid.UUID | str
+    ) -> dict[str, Any]:
+        """Build the column values for a new file metadata record.
 
         Args:
             obj_in: File creation data.
             owner_id: ID of the file owner (can be UUID or string).
 
         Returns:
-            The created file metadata record.
+            A dictionary of column values, including a new ID and S3 key.
         """
         file_id = uuid.uuid4()
         # Ensure owner_id is a string
         owner_id_str = str(owner_id)
         s3_key = f"{owner_id_str}/{file_id}/{obj_in.filename}"
 
-        db_obj = FileModel(
-            id=str(file_id),
-            filename=obj_in.filename,
-            s3_key=s3_key,
-            content_type=obj_in.content_type,
-            size_bytes=obj_in.size_bytes,
-            description=obj_in.description,
-            is_public=obj_in.is_public,
-            owner_id=owner_id_str,
-        )
+        return {
+            "id": str(file_id),
+            "filename": obj_in.filename,
+            "s3_key": s3_key,
+            "content_type": obj_in.content_type,
+            "size_bytes": obj_in.size_bytes,
+            "description": obj_in.description,
+            "is_public": obj_in.is_public,
+            "owner_id": owner_id_str,
+            "sha256": obj_in.sha256,
+        }
+
+    def create(self, obj_in: FileCreate, owner_id: uuid.UUID | str) -> FileModel:
+        """Create a new file metadata record.
+
+        Args:
+            obj_in: File creation data.
+            owner_id: ID of the file owner (can be UUID or string).
+
+        Returns:
+            The created file metadata record.
+
+        Raises:
+            QuotaExceededError: If the file doesn't fit in the owner's quota.
+        """
+        db_obj = FileModel(**self._new_file_values(obj_in, owner_id))
         self.db.add(db_obj)
+        try:
+            self._count_new_files([db_obj.owner_id], [db_obj.size_bytes])
+        except QuotaExceededError:
+            self.db.rollback()
+            raise
         self.db.commit()
         self.db.refresh(db_obj)
         return db_obj
 
+    def create_multi(self, values: list[dict[str, Any]]) -> list[str | None]:
+        """Insert many file metadata records in one statement and transaction.
+
+        If the bulk insert fails, or the records don't all fit in their owners'
+        quotas, the rows are retried one by one, each in its own savepoint, so a
+        bad row doesn't prevent the others from being stored.
+
+        Args:
+            values: Column values for each record, as built by _new_file_values.
+
+        Returns:
+            For each record, None if it was stored or an error message otherwise.
+        """
+        if not values:
+            return []
+
+        try:
+            self.db.execute(insert(FileModel), values)
+            self._count_new_files(
+                [row["owner_id"] for row in values],
+                [row["size_bytes"] for row in values],
+            )
+            self.db.commit()
+            return [None] * len(values)
+        except (SQLAlchemyError, QuotaExceededError):
+            self.db.rollback()
+
+        errors: list[str | None] = []
+        for row in values:
+            try:
+                with self.db.begin_nested():
+                    self.db.execute(insert(FileModel), [row])
+                    self._count_new_files([row["owner_id"]], [row["size_bytes"]])
+                errors.append(None)
+            except SQLAlchemyError as e:
+                errors.append(f"Failed to store file metadata: {e.__class__.__name__}")
+            except QuotaExceededError as e:
+                errors.append(str(e))
+        self.db.commit()
+        return errors
+
+    def _count_new_files(self, owner_ids: list[str], sizes: list[int]) -> None:
+        """Add new files to their owners' usage, within their quotas.
+
+        On failure the caller must roll back, since earlier owners may already
+        have been counted.
+
+        Args:
+            owner_ids: Owner of each new file.
+            sizes: Size of each new file.
+
+        Raises:
+            QuotaExceededError: If an owner's files don't fit in their quota.
+        """
+        totals: dict[str, tuple[int, int]] = {}
+        for owner_id, size_bytes in zip(owner_ids, sizes, strict=True):
+            file_count, total_bytes = totals.get(str(owner_id), (0, 0))
+            totals[str(owner_id)] = (file_count + 1, total_bytes + size_bytes)
+        for owner_id in sorted(totals):
+            file_count, total_bytes = totals[owner_id]
+            self.usage.add(owner_id, file_count, total_bytes, enforce_quota=True)
+
+    def _lock_for_usage(self, file_obj: FileModel) -> FileModel | None:
+        """Read a file's row again under its lock, before changing its owner's usage.
+
+        Usage changes are computed from the size and status read here, in the
+        same transaction as the counters, so a file settled concurrently by the
+        upload reconciler or another request is never counted twice.
+
+        Args:
+            file_obj: The file, as loaded earlier.
+
+        Returns:
+            The same file with its current values, or None if it was deleted.
+        """
+        return self.db.get(
+            FileModel, file_obj.id, with_for_update=True, populate_existing=True
+        )
+
     def update(
         self, db_obj: FileModel, obj_in: FileUpdate | dict[str, Any]
     ) -> FileModel:
@@ -177,12 +754,24 @@ class FileService:
 
         Returns:
             The updated file metadata record.
+
+        Raises:
+            FileNotFoundError: If the file was deleted meanwhile.
         """
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
             update_data = obj_in.dict(exclude_unset=True)
 
+        db_obj = self._lock_for_usage(db_obj)
+        if db_obj is None:
+            raise FileNotFoundError("The file was deleted")
+        growth = update_data.get("size_bytes", db_obj.size_bytes) - db_obj.size_bytes
+        if db_obj.status == FileStatus.FAILED.value:
+            # Failed uploads aren't counted
+            growth = 0
+        # Bumps the owner's version even when the size doesn't change
+        self.usage.add(db_obj.owner_id, 0, growth)
         for field in update_data:
             if field in update_data:
                 setattr(db_obj, field, update_data[field])
@@ -190,109 +779,626 @@ class FileService:
         self.db.add(db_obj)
         self.db.commit()
         self.db.refresh(db_obj)
+        download_url_cache.invalidate(str(db_obj.s3_key))
         return db_obj
 
     def remove(self, id: uuid.UUID | str) -> FileModel | None:
         """Remove a file.
 
-        This removes both the file metadata from the database and
-        the actual file from S3.
+        This removes the file metadata from the database. The object is
+        deleted from S3 later by the S3 deletion worker.
 
         Args:
             id: ID of the file to remove (can be UUID or string).
 
         Returns:
             The removed file metadata record or None if not found.
-
-        Raises:
-            Exception: If there's an error deleting the file from S3.
         """
-        # Convert ID to string to match database column type
-        file_id = str(id) if isinstance(id, uuid.UUID) else id
-        file_obj = self.db.query(FileModel).filter(FileModel.id == file_id).first()
+        file_obj = self.get(id)
         if not file_obj:
             return None
 
-        # Delete file from S3
-        try:
-            self.s3_client.delete_object(
-                Bucket=self.s3_bucket_name,
-                Key=file_obj.s3_key,
-            )
-        except ClientError as e:
-            # Log the error but continue with metadata deletion
-            print(f"Error deleting file from S3: {e}")
+        self.delete_record(file_obj)
+        return file_obj
+
+    def delete_record(self, file_obj: FileModel) -> None:
+        """Delete a file metadata record and release its object.
+
+        Does nothing if the file was deleted meanwhile.
 
-        # Delete metadata from database
+        Args:
+            file_obj: The file to delete.
+        """
+        file_obj = self._lock_for_usage(file_obj)
+        if file_obj is None:
+            return
         self.db.delete(file_obj)
+        # Lock the file's row before its blob's, in the order create_duplicate does
+        self.db.flush()
+        # Committed together, so an object is never orphaned by a lost delete
+        self.release_s3_objects([str(file_obj.s3_key)])
+        file_count, total_bytes = _counted_usage(file_obj.status, file_obj.size_bytes)
+        self.usage.add(file_obj.owner_id, -file_count, -total_bytes)
         self.db.commit()
-        return file_obj
+        download_url_cache.invalidate(str(file_obj.s3_key))
 
-    def create_upload_url(
-        self, file_info: FileCreate, user: UserModel
-    ) -> FileUploadResponse:
-        """Create a presigned URL for file upload and register the file metadata.
+    def remove_multi(
+        self, file_ids: list[uuid.UUID], user: UserModel
+    ) -> FileBatchDeleteResponse:
+        """Remove many files from the database.
+
+        Ownership of all files is checked with one query and the metadata is
+        deleted with one statement. The objects are deleted from S3 later by
+        the S3 deletion worker.
 
         Args:
-            file_info: Information about the file to be uploaded.
-            user: The user uploading the file.
+            file_ids: IDs of the files to remove.
+            user: The user removing the files.
 
         Returns:
-            A response containing the upload URL and file ID.
-
-        Raises:
-            Exception: If there's an error generating the presigned URL.
+            A response with one result per file, in request order.
         """
-        # Create file metadata
-        # Pass the user.id directly as a string to avoid type conversion issues
-        file_obj = self.create(obj_in=file_info, owner_id=user.id)
-
-        # Generate presigned URL for upload
-        try:
-            params = {
-                "Bucket": self.s3_bucket_name,
-                "Key": file_obj.s3_key,
-                "ContentType": file_info.content_type,
-            }
-
-            # Generate the presigned URL for upload
-            upload_url = self.s3_client.generate_presigned_url(
-                "put_object",
-                Params=params,
-                ExpiresIn=settings.PRESIGNED_URL_EXPIRY,
-            )
+        errors, _ = self.delete_records(file_ids, user)
+        return _batch_delete_response(file_ids, errors)
 
-            # For local development, replace 'minio' hostname with 'localhost'
-            # This is necessary because the client machine can't resolve the Docker hostname
-            if self.is_local_dev and "minio:9000" in upload_url:
-                upload_url = upload_url.replace("minio:9000", "localhost:9000")
+    def delete_records(
+        self, file_ids: list[uuid.UUID], user: UserModel
+    ) -> tuple[dict[str, str], dict[str, str]]:
+        """Delete the metadata of the files the user may delete.
 
-            return FileUploadResponse(
-                upload_url=upload_url,
-                file_id=uuid.UUID(str(file_obj.id)),
-            )
-        except ClientError as e:
-            # If URL generation fails, clean up the metadata
-            self.db.delete(file_obj)
-            self.db.commit()
-            raise Exception(f"Error generating presigned URL: {e}")
-
-    def create_download_url(
-        self, file_id: uuid.UUID, user: UserModel
-    ) -> FileDownloadResponse:
-        """Create a presigned URL for file download.
+        The objects of the deleted files are released in the same transaction.
 
         Args:
-            file_id: ID of the file to download.
-            user: The user requesting the download.
+            file_ids: IDs of the files to delete.
+            user: The user deleting the files.
 
         Returns:
-            A response containing the download URL, filename, and content type.
+            Why each file that wasn't deleted was skipped, and the S3 key of each
+            deleted file, both keyed by file ID.
+        """
+        ids = list(dict.fromkeys(str(file_id) for file_id in file_ids))
+        owners = dict(
+            self.db.execute(
+                select(FileModel.id, FileModel.owner_id).where(FileModel.id.in_(ids))
+            ).all()
+        )
+
+        errors: dict[str, str] = {}
+        allowed: list[str] = []
+        for file_id in ids:
+            owner_id = owners.get(file_id)
+            if owner_id is None:
+                errors[file_id] = "File not found"
+            elif owner_id != user.id and not user.is_superuser:
+                errors[file_id] = "Not enough permissions to delete this file"
+            else:
+                allowed.append(file_id)
+        if not allowed:
+            return errors, {}
+
+        statement = (
+            delete(FileModel)
+            .where(FileModel.id.in_(allowed))
+            .returning(
+                FileModel.id,
+                FileModel.s3_key,
+                FileModel.owner_id,
+                FileModel.size_bytes,
+                FileModel.status,
+            )
+        )
+        if not user.is_superuser:
+            # Guards against the owner changing between the two statements
+            statement = statement.where(FileModel.owner_id == user.id)
+        rows = self.db.execute(
+            statement, execution_options={"synchronize_session": False}
+        ).all()
+        deleted = {row.id: row.s3_key for row in rows}
+        self.release_s3_objects(list(deleted.values()))
+        released: dict[str, tuple[int, int]] = {}
+        for row in rows:
+            file_count, total_bytes = released.get(row.owner_id, (0, 0))
+            counted_files, counted_bytes = _counted_usage(row.status, row.size_bytes)
+            released[row.owner_id] = (
+                file_count - counted_files,
+                total_bytes - counted_bytes,
+            )
+        self.usage.add_many(released)
+        self.db.commit()
+
+        for file_id in allowed:
+            if file_id not in deleted:
+                errors[file_id] = "File not found"
+        for s3_key in deleted.values():
+            download_url_cache.invalidate(s3_key)
+        return errors, deleted
+
+    def release_s3_objects(self, s3_keys: list[str]) -> None:
+        """Drop one reference to each object, queueing unreferenced ones for deletion.
+
+        Objects are deleted from S3 later by the S3 deletion worker. The caller
+        commits, so this happens in the same transaction as the metadata delete.
+
+        Args:
+            s3_keys: Key of each deleted file's object, repeated for files that
+                shared it.
+        """
+        if not s3_keys:
+            return
+        references = Counter(s3_keys)
+        blobs = (
+            self.db.query(Blob)
+            .filter(Blob.s3_key.in_(references))
+            # A consistent lock order keeps concurrent deletes from deadlocking
+            .order_by(Blob.s3_key)
+            .with_for_update()
+            .all()
+        )
+        # Objects without a blob row belonged to a single file
+        unreferenced = set(references) - {blob.s3_key for blob in blobs}
+        for blob in blobs:
+            blob.ref_count -= references[blob.s3_key]
+            if blob.ref_count <= 0:
+                self.db.delete(blob)
+                unreferenced.add(blob.s3_key)
+        if unreferenced:
+            self.db.execute(
+                insert(S3Deletion),
+                [{"s3_key": s3_key} for s3_key in sorted(unreferenced)],
+            )
+
+    def delete_s3_objects(self, s3_keys: list[str]) -> dict[str, str]:
+        """Delete objects from S3 with as few DeleteObjects requests as possible.
+
+        Args:
+            s3_keys: Keys of the objects to delete.
+
+        Returns:
+            An error message for each key that couldn't be deleted.
+        """
+        errors: dict[str, str] = {}
+        for start in range(0, len(s3_keys), S3_DELETE_OBJECTS_MAX_KEYS):
+            chunk = s3_keys[start : start + S3_DELETE_OBJECTS_MAX_KEYS]
+            try:
+                response = self.s3_client.delete_objects(
+                    Bucket=self.s3_bucket_name,
+                    Delete={
+                        "Objects": [{"Key": s3_key} for s3_key in chunk],
+                        # Only report the keys that failed
+                        "Quiet": True,
+                    },
+                )
+            except ClientError as e:
+                errors.update(dict.fromkeys(chunk, f"Error deleting file from S3: {e}"))
+                continue
+            for error in response.get("Errors", []):
+                errors[error["Key"]] = (
+                    f"Error deleting file from S3: {error.get('Code')}"
+                )
+        return errors
+
+    def _presign(
+        self,
+        method: str,
+        s3_key: str,
+        headers: dict[str, str] | None = None,
+        params: dict[str, str | int] | None = None,
+        signed_at: datetime | None = None,
+    ) -> str:
+        """Generate a presigned URL for an object, usable from the client's machine.
+
+        Args:
+            method: HTTP method the URL is valid for.
+            s3_key: Key of the object.
+            headers: Headers the client must send with exactly these values.
+            params: Extra query parameters for the S3 operation.
+            signed_at: Signing time. Defaults to now.
+
+        Returns:
+            The presigned URL.
+
+        Raises:
+            PresignError: If the URL can't be signed.
+        """
+        url = self.presigner.generate_presigned_url(
+            method,
+            s3_key,
+            expires_in=settings.PRESIGNED_URL_EXPIRY,
+            headers=headers,
+            params=params,
+            signed_at=signed_at,
+        )
+
+        # For local development, replace 'minio' hostname with 'localhost'
+        # This is necessary because the client machine can't resolve the Docker hostname
+        if self.is_local_dev and "minio:9000" in url:
+            url = url.replace("minio:9000", "localhost:9000")
+        return url
+
+    def _presign_upload(
+        self,
+        s3_key: str,
+        content_type: str,
+        size_bytes: int,
+        sha256: str | None = None,
+    ) -> str:
+        """Generate a presigned URL for uploading an object.
+
+        Args:
+            s3_key: Key of the object to upload.
+            content_type: MIME type the client must upload the object with.
+            size_bytes: Size the uploaded content must have.
+            sha256: Hex SHA-256 the uploaded content must have, if known.
+
+        Returns:
+            The presigned upload URL.
+
+        Raises:
+            PresignError: If the URL can't be signed.
+        """
+        # The content type and length are signed, so the client must upload with
+        # the same ones, and can't store more than was counted in its usage
+        headers = {"Content-Type": content_type, "Content-Length": str(size_bytes)}
+        if sha256:
+            # S3 rejects the upload if the content doesn't match, so files can
+            # only be deduplicated against content that really has this hash
+            checksum = base64.b64encode(bytes.fromhex(sha256)).decode()
+            headers["x-amz-checksum-sha256"] = checksum
+        return self._presign("PUT", s3_key, headers=headers)
+
+    def _presign_download(self, s3_key: str) -> str:
+        """Get a presigned URL for downloading an object, reusing cached URLs.
+
+        URLs are signed as of the start of fixed time windows, so every request
+        for an object within a window gets the same URL with the same expiry,
+        and browsers and proxies can cache the object under it. A window is
+        short enough that its URL always has DOWNLOAD_URL_MIN_VALIDITY seconds
+        left, and the URL is cached until the window ends.
+
+        Args:
+            s3_key: Key of the object to download.
+
+        Returns:
+            The presigned download URL.
+
+        Raises:
+            PresignError: If the URL can't be signed.
+        """
+        window = settings.PRESIGNED_URL_EXPIRY - settings.DOWNLOAD_URL_MIN_VALIDITY
+        if window <= 0:
+            return self._presign("GET", s3_key)
+
+        url = download_url_cache.get(s3_key)
+        if url is None:
+            now = time.time()
+            window_start = now - now % window
+            url = self._presign(
+                "GET",
+                s3_key,
+                signed_at=datetime.fromtimestamp(window_start, timezone.utc),
+            )
+            download_url_cache.set(s3_key, url, ttl=window_start + window - now)
+        return url
+
+    def create_upload_url(
+        self, file_info: FileCreate, user: UserModel
+    ) -> FileUploadResponse:
+        """Create a presigned URL for file upload and register the file metadata.
+
+        If the user already uploaded the same content, the file shares its
+        object and no upload URL is returned.
+
+        Args:
+            file_info: Information about the file to be uploaded.
+            user: The user uploading the file.
+
+        Returns:
+            A response containing the upload URL, if any, and file ID.
+
+        Raises:
+            QuotaExceededError: If the file doesn't fit in the user's quota.
+            Exception: If there's an error generating the presigned URL.
+        """
+        if file_info.sha256:
+            file_obj = self.create_duplicate(file_info, user)
+            if file_obj is not None:
+                return FileUploadResponse(file_id=uuid.UUID(str(file_obj.id)))
+
+        # Create file metadata
+        # Pass the user.id directly as a string to avoid type conversion issues
+        file_obj = self.create(obj_in=file_info, owner_id=user.id)
+
+        # Generate presigned URL for upload
+        try:
+            upload_url = self._presign_upload(
+                str(file_obj.s3_key),
+                file_info.content_type,
+                file_info.size_bytes,
+                file_info.sha256,
+            )
+            return FileUploadResponse(
+                upload_url=upload_url,
+                file_id=uuid.UUID(str(file_obj.id)),
+            )
+        except PresignError as e:
+            # If URL generation fails, clean up the metadata
+            self.db.delete(file_obj)
+            self.usage.add(file_obj.owner_id, -1, -file_obj.size_bytes)
+            self.db.commit()
+            raise Exception(f"Error generating presigned URL: {e}")
+
+    def create_duplicate(
+        self, file_info: FileCreate, user: UserModel
+    ) -> FileModel | None:
+        """Create a file sharing the object of the user's earlier identical upload.
+
+        Only complete uploads are matched, by SHA-256 and size. Matching is
+        limited to the user's own files, so the hash of someone else's content
+        can't be used to get a copy of it.
+
+        Args:
+            file_info: Information about the file to be uploaded, with its SHA-256.
+            user: The user uploading the file.
+
+        Returns:
+            The created file, already complete, or None if there's no match.
+
+        Raises:
+            QuotaExceededError: If the file doesn't fit in the user's quota.
+        """
+        # Locking the match keeps it from being deleted before its blob is counted
+        original = (
+            self.db.query(FileModel)
+            .filter(
+                FileModel.owner_id == str(user.id),
+                FileModel.sha256 == file_info.sha256,
+                FileModel.size_bytes == file_info.size_bytes,
+                FileModel.status == FileStatus.COMPLETE.value,
+            )
+            .order_by(FileModel.created_at, FileModel.id)
+            .limit(1)
+            .with_for_update()
+            .first()
+        )
+        if original is None:
+            return None
+
+        blob = self.db.get(Blob, original.s3_key, with_for_update=True)
+        if blob is None:
+            # The object had a single file until now
+            self.db.add(Blob(s3_key=original.s3_key, ref_count=2))
+        else:
+            blob.ref_count += 1
+
+        values = self._new_file_values(file_info, owner_id=user.id)
+        values.update(
+            s3_key=original.s3_key,
+            status=FileStatus.COMPLETE.value,
+            etag=original.etag,
+        )
+        file_obj = FileModel(**values)
+        self.db.add(file_obj)
+        try:
+            # Copies count in full, though they share the stored object
+            self._count_new_files([file_obj.owner_id], [file_obj.size_bytes])
+        except QuotaExceededError:
+            self.db.rollback()
+            raise
+        self.db.commit()
+        self.db.refresh(file_obj)
+        return file_obj
+
+    def create_upload_urls(
+        self, file_infos: list[FileCreate], user: UserModel
+    ) -> FileBatchUploadResponse:
+        """Create presigned upload URLs and file metadata for many files at once.
+
+        All metadata records are inserted with one statement in one transaction.
+        Items that fail are reported individually and don't affect the others.
+        Items aren't deduplicated, which would lock earlier files inside the bulk
+        insert, but their SHA-256 is checked by S3 so later uploads can match them.
+
+        Args:
+            file_infos: Information about each file to be uploaded.
+            user: The user uploading the files.
+
+        Returns:
+            A response with one result per item, in request order.
+        """
+        results: list[FileBatchUploadItem] = []
+        # Rows to insert, with the position of their result and their upload URL
+        pending: list[tuple[int, dict[str, Any], str]] = []
+
+        for index, file_info in enumerate(file_infos):
+            error = _check_column_limits(file_info)
+            if error:
+                results.append(FileBatchUploadItem(index=index, error=error))
+                continue
+
+            values = self._new_file_values(file_info, owner_id=user.id)
+            try:
+                upload_url = self._presign_upload(
+                    values["s3_key"],
+                    file_info.content_type,
+                    file_info.size_bytes,
+                    file_info.sha256,
+                )
+            except PresignError as e:
+                results.append(
+                    FileBatchUploadItem(
+                        index=index, error=f"Error generating presigned URL: {e}"
+                    )
+                )
+                continue
+
+            pending.append((len(results), values, upload_url))
+            results.append(FileBatchUploadItem(index=index))
+
+        errors = self.create_multi([values for _, values, _ in pending])
+        for (position, values, upload_url), error in zip(pending, errors, strict=True):
+            if error:
+                results[position].error = error
+            else:
+                results[position].file_id = uuid.UUID(values["id"])
+                results[position].upload_url = upload_url
+
+        return FileBatchUploadResponse(items=results)
+
+    def head_s3_object(self, s3_key: str) -> dict[str, Any] | None:
+        """Get the metadata of an object in S3.
+
+        Args:
+            s3_key: Key of the object.
+
+        Returns:
+            The HeadObject response, or None if the object doesn't exist.
+
+        Raises:
+            Exception: If S3 fails to answer.
+        """
+        try:
+            return self.s3_client.head_object(Bucket=self.s3_bucket_name, Key=s3_key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in {"404", "NoSuchKey"}:
+                return None
+            raise Exception(f"Error checking file in S3: {e}")
+
+    def complete_upload(self, file_obj: FileModel) -> FileModel:
+        """Confirm that a file has been uploaded through its presigned URL.
+
+        The object is looked up in S3 and its real size and ETag are recorded.
+        Completing an already complete file is a no-op.
+
+        Args:
+            file_obj: The uploaded file.
+
+        Returns:
+            The updated file metadata record.
+
+        Raises:
+            FileNotFoundError: If the file was deleted meanwhile.
+            UploadIncompleteError: If the object isn't in S3, the upload failed
+                or the file is being uploaded in parts.
+            Exception: If S3 fails to answer.
+        """
+        if file_obj.status == FileStatus.COMPLETE.value:
+            return file_obj
+        self.check_upload_completable(file_obj)
+
+        head = self.head_s3_object(str(file_obj.s3_key))
+        if head is None:
+            raise UploadIncompleteError("The file hasn't been uploaded to S3 yet")
+        return self.mark_upload_complete(file_obj, head)
+
+    @staticmethod
+    def check_upload_completable(file_obj: FileModel) -> None:
+        """Check that a file's single-request upload can be completed.
+
+        Args:
+            file_obj: The file.
+
+        Raises:
+            UploadIncompleteError: If the upload failed or the file is being
+                uploaded in parts.
+        """
+        if file_obj.status == FileStatus.FAILED.value:
+            raise UploadIncompleteError("The upload failed; upload the file again")
+        if file_obj.upload_id:
+            raise UploadIncompleteError(
+                "Multipart uploads are completed with the parts' ETags"
+            )
+
+    def mark_upload_complete(
+        self, file_obj: FileModel, head: dict[str, Any], sha256: str | None = None
+    ) -> FileModel:
+        """Record that a file's object is in S3, with its real size and ETag.
+
+        The file is read again with _lock_for_usage, so an upload settled
+        meanwhile, e.g. by the upload reconciler or a concurrent request, isn't
+        counted twice. Completing an already complete file is a no-op, while the
+        object of a file deleted or failed meanwhile is queued for deletion.
+
+        Args:
+            file_obj: The uploaded file.
+            head: The HeadObject response for the file's object.
+            sha256: Hex SHA-256 of the content, if the server computed it.
+
+        Returns:
+            The updated file metadata record.
+
+        Raises:
+            FileNotFoundError: If the file was deleted meanwhile.
+            UploadIncompleteError: If the upload failed meanwhile.
+            QuotaExceededError: If the content is larger than declared and the
+                difference doesn't fit in the owner's quota. The upload is then
+                rejected with reject_upload.
+        """
+        s3_key = file_obj.s3_key
+        file_obj = self._lock_for_usage(file_obj)
+        if file_obj is None or file_obj.status == FileStatus.FAILED.value:
+            # No file refers to the object any more; failed and pending uploads
+            # never share theirs
+            self.db.add(S3Deletion(s3_key=s3_key))
+            self.db.commit()
+            if file_obj is None:
+                raise FileNotFoundError("The file was deleted during its upload")
+            raise UploadIncompleteError("The upload failed; upload the file again")
+        if file_obj.status == FileStatus.COMPLETE.value:
+            return file_obj
+
+        # The declared size was counted until now
+        try:
+            self.usage.add(
+                file_obj.owner_id,
+                0,
+                head["ContentLength"] - file_obj.size_bytes,
+                enforce_quota=True,
+            )
+        except QuotaExceededError:
+            self.reject_upload(file_obj)
+            self.db.commit()
+            raise
+        file_obj.status = FileStatus.COMPLETE.value
+        file_obj.size_bytes = head["ContentLength"]
+        file_obj.etag = head["ETag"].strip('"')
+        file_obj.upload_id = None
+        if sha256 is not None:
+            file_obj.sha256 = sha256
+        self.db.add(file_obj)
+        self.db.commit()
+        self.db.refresh(file_obj)
+        return file_obj
+
+    def reject_upload(self, file_obj: FileModel) -> None:
+        """Fail an upload whose content doesn't fit in its owner's quota.
+
+        The declared size is released from the owner's usage, as failed uploads
+        aren't counted, and the object is queued for deletion. The caller
+        commits.
+
+        Args:
+            file_obj: The uploaded file.
+        """
+        self.usage.add(file_obj.owner_id, -1, -file_obj.size_bytes)
+        file_obj.status = FileStatus.FAILED.value
+        file_obj.upload_id = None
+        # Failed uploads never share their object, so it has no blob to release
+        self.db.add(S3Deletion(s3_key=file_obj.s3_key))
+        self.db.add(file_obj)
+
+    def get_readable(self, file_id: uuid.UUID, user: UserModel) -> FileModel:
+        """Get a file the user is allowed to download.
+
+        Args:
+            file_id: ID of the file.
+            user: The user requesting the file.
+
+        Returns:
+            The file.
 
         Raises:
             FileNotFoundError: If the file doesn't exist.
             PermissionError: If the user doesn't have permission to access the file.
-            Exception: If there's an error generating the presigned URL.
         """
         # Get file metadata
         file_obj = self.get(id=file_id)
@@ -306,30 +1412,1118 @@ class FileService:
             and not user.is_superuser
         ):
             raise PermissionError("Not enough permissions to access this file")
+        return file_obj
 
-        # Generate presigned URL for download
+    def get_s3_object(
+        self, file_obj: FileModel, byte_range: str | None = None
+    ) -> dict[str, Any]:
+        """Open a file's object in S3 for reading.
+
+        Args:
+            file_obj: The file.
+            byte_range: Range of bytes to read, as an HTTP Range header value.
+
+        Returns:
+            The GetObject response, with the content as a stream in Body.
+
+        Raises:
+            UploadIncompleteError: If the file hasn't been uploaded yet.
+            RangeNotSatisfiableError: If the range lies outside the content.
+            Exception: If S3 fails to answer.
+        """
+        if file_obj.status != FileStatus.COMPLETE.value:
+            raise UploadIncompleteError("The file hasn't been uploaded yet")
+
+        try:
+            return self.read_s3_object(str(file_obj.s3_key), byte_range)
+        except RangeNotSatisfiableError as e:
+            raise RangeNotSatisfiableError(str(e), file_obj.size_bytes) from e
+
+    def read_s3_object(
+        self, s3_key: str, byte_range: str | None = None
+    ) -> dict[str, Any]:
+        """Open an object in S3 for reading.
+
+        Args:
+            s3_key: Key of the object.
+            byte_range: Range of bytes to read, as an HTTP Range header value.
+
+        Returns:
+            The GetObject response, with the content as a stream in Body.
+
+        Raises:
+            RangeNotSatisfiableError: If the range lies outside the content.
+            Exception: If S3 fails to answer.
+        """
+        params = {"Bucket": self.s3_bucket_name, "Key": s3_key}
+        if byte_range:
+            params["Range"] = byte_range
         try:
-            params = {
-                "Bucket": self.s3_bucket_name,
-                "Key": file_obj.s3_key,
-            }
-
-            # Generate the presigned URL for download
-            download_url = self.s3_client.generate_presigned_url(
-                "get_object",
-                Params=params,
-                ExpiresIn=settings.PRESIGNED_URL_EXPIRY,
+            return self.s3_client.get_object(**params)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") == "InvalidRange":
+                raise RangeNotSatisfiableError(f"Range {byte_range} not satisfiable")
+            raise Exception(f"Error reading file from S3: {e}")
+
+    def get_archive_files(
+        self, user: UserModel, file_ids: list[uuid.UUID] | None = None
+    ) -> list[Row[Any]]:
+        """Get the files to put in an archive for a user.
+
+        Only the columns an archive needs are loaded, so archiving a long file
+        list doesn't build an ORM object per file.
+
+        Args:
+            user: The user requesting the archive.
+            file_ids: IDs of the files, in archive order. By default, all the
+                user's uploaded files, oldest first.
+
+        Returns:
+            The files' ID, filename, S3 key, content type, size and creation time.
+
+        Raises:
+            FileNotFoundError: If a requested file doesn't exist.
+            PermissionError: If the user doesn't have permission to access one.
+            UploadIncompleteError: If a requested file hasn't been uploaded yet.
+        """
+        columns = select(
+            FileModel.id,
+            FileModel.filename,
+            FileModel.s3_key,
+            FileModel.content_type,
+            FileModel.size_bytes,
+            FileModel.created_at,
+        )
+        complete = FileModel.status == FileStatus.COMPLETE.value
+        if file_ids is None:
+            query = columns.where(FileModel.owner_id == str(user.id), complete)
+            return list(
+                self.db.execute(query.order_by(FileModel.created_at, FileModel.id))
             )
 
-            # For local development, replace 'minio' hostname with 'localhost'
-            # This is necessary because the client machine can't resolve the Docker hostname
-            if self.is_local_dev and "minio:9000" in download_url:
-                download_url = download_url.replace("minio:9000", "localhost:9000")
+        ids = list(dict.fromkeys(str(file_id) for file_id in file_ids))
+        query = columns.add_columns(
+            FileModel.owner_id, FileModel.is_public, complete.label("complete")
+        ).where(FileModel.id.in_(ids))
+        rows = {row.id: row for row in self.db.execute(query)}
+        for file_id in ids:
+            row = rows.get(file_id)
+            if row is None:
+                raise FileNotFoundError(f"File with ID {file_id} not found")
+            if not row.is_public and row.owner_id != user.id and not user.is_superuser:
+                raise PermissionError("Not enough permissions to access this file")
+            if not row.complete:
+                raise UploadIncompleteError(
+                    f"File with ID {file_id} hasn't been uploaded yet"
+                )
+        return [rows[file_id] for file_id in ids]
+
+    def create_download_url(
+        self, file_id: uuid.UUID, user: UserModel
+    ) -> FileDownloadResponse:
+        """Create a presigned URL for file download.
+
+        Args:
+            file_id: ID of the file to download.
+            user: The user requesting the download.
+
+        Returns:
+            A response containing the download URL, filename, and content type.
+
+        Raises:
+            FileNotFoundError: If the file doesn't exist.
+            PermissionError: If the user doesn't have permission to access the file.
+            Exception: If there's an error generating the presigned URL.
+        """
+        file_obj = self.get_readable(file_id, user)
 
+        # Generate presigned URL for download
+        try:
+            download_url = self._presign_download(str(file_obj.s3_key))
             return FileDownloadResponse(
                 download_url=download_url,
                 filename=str(file_obj.filename),
                 content_type=str(file_obj.content_type),
             )
-        except ClientError as e:
+        except PresignError as e:
             raise Exception(f"Error generating presigned URL: {e}")
+
+    def initiate_multipart_upload(
+        self, file_info: FileCreate, user: UserModel
+    ) -> FileMultipartUploadResponse:
+        """Start an S3 multipart upload and register the file metadata.
+
+        The multipart upload ID is recorded on the file so the parts can be signed
+        and the upload completed or aborted later.
+
+        Args:
+            file_info: Information about the file to be uploaded.
+            user: The user uploading the file.
+
+        Returns:
+            A response with the file ID, upload ID and how to split the file.
+
+        Raises:
+            MultipartUploadError: If the file can't be uploaded in parts.
+            QuotaExceededError: If the file doesn't fit in the user's quota.
+            Exception: If S3 fails to start the upload.
+        """
+        values = self.new_multipart_values(file_info, user)
+        self.usage.check(user.id, file_info.size_bytes)
+        upload_id = self.start_s3_multipart_upload(
+            values["s3_key"], file_info.content_type
+        )
+        try:
+            return self.register_multipart_upload(values, upload_id)
+        except QuotaExceededError:
+            self.abort_s3_multipart_upload(FileModel(**values, upload_id=upload_id))
+            raise
+
+    def new_multipart_values(
+        self, file_info: FileCreate, user: UserModel
+    ) -> dict[str, Any]:
+        """Validate a multipart upload request and build the file's column values.
+
+        Args:
+            file_info: Information about the file to be uploaded.
+            user: The user uploading the file.
+
+        Returns:
+            A dictionary of column values, as built by _new_file_values.
+
+        Raises:
+            MultipartUploadError: If the file can't be uploaded in parts.
+        """
+        if file_info.size_bytes > MULTIPART_MAX_OBJECT_SIZE:
+            raise MultipartUploadError("Files larger than 5 TiB can't be uploaded")
+        error = _check_column_limits(file_info)
+        if error:
+            raise MultipartUploadError(error)
+        values = self._new_file_values(file_info, owner_id=user.id)
+        # S3 can't check the whole object's SHA-256 for multipart uploads, so an
+        # unverified hash isn't stored for deduplication
+        values["sha256"] = None
+        return values
+
+    def start_s3_multipart_upload(self, s3_key: str, content_type: str) -> str:
+        """Start a multipart upload in S3.
+
+        Args:
+            s3_key: Key of the object to upload.
+            content_type: MIME type of the object.
+
+        Returns:
+            The S3 upload ID.
+
+        Raises:
+            Exception: If S3 fails to start the upload.
+        """
+        try:
+            response = self.s3_client.create_multipart_upload(
+                Bucket=self.s3_bucket_name,
+                Key=s3_key,
+                ContentType=content_type,
+            )
+        except ClientError as e:
+            raise Exception(f"Error initiating multipart upload: {e}")
+        return response["UploadId"]
+
+    def register_multipart_upload(
+        self, values: dict[str, Any], upload_id: str
+    ) -> FileMultipartUploadResponse:
+        """Store the metadata of a file whose multipart upload has started.
+
+        Args:
+            values: Column values of the file, as built by new_multipart_values.
+            upload_id: The S3 upload ID.
+
+        Returns:
+            A response with the file ID, upload ID and how to split the file.
+
+        Raises:
+            QuotaExceededError: If the file no longer fits in the user's quota.
+        """
+        file_obj = FileModel(**values, upload_id=upload_id)
+        self.db.add(file_obj)
+        try:
+            self._count_new_files([file_obj.owner_id], [file_obj.size_bytes])
+        except QuotaExceededError:
+            self.db.rollback()
+            raise
+        self.db.commit()
+
+        size_bytes = values["size_bytes"]
+        return FileMultipartUploadResponse(
+            file_id=uuid.UUID(values["id"]),
+            upload_id=upload_id,
+            part_size=choose_part_size(size_bytes),
+            part_count=count_parts(size_bytes),
+        )
+
+    def create_part_upload_urls(
+        self, file_obj: FileModel, part_numbers: list[int]
+    ) -> FileMultipartPartUrlsResponse:
+        """Create presigned URLs for uploading parts of a multipart upload.
+
+        The parts can be uploaded in parallel. The client must keep the ETag header
+        returned by S3 for each part to complete the upload.
+
+        Args:
+            file_obj: The file being uploaded.
+            part_numbers: Numbers of the parts to sign, starting at 1.
+
+        Returns:
+            A response with one upload URL per part.
+
+        Raises:
+            MultipartUploadError: If no upload is in progress or a part number is
+                out of range.
+            Exception: If there's an error generating the presigned URLs.
+        """
+        if not file_obj.upload_id:
+            raise MultipartUploadError("No multipart upload in progress for this file")
+
+        part_count = count_parts(int(file_obj.size_bytes))
+        invalid = [n for n in part_numbers if not 1 <= n <= part_count]
+        if invalid:
+            raise MultipartUploadError(
+                f"Part numbers must be between 1 and {part_count}, got {invalid}"
+            )
+
+        try:
+            parts = [
+                FileMultipartPartUrl(
+                    part_number=part_number,
+                    upload_url=self._presign(
+                        "PUT",
+                        str(file_obj.s3_key),
+                        params={
+                            "uploadId": str(file_obj.upload_id),
+                            "partNumber": part_number,
+                        },
+                    ),
+                )
+                for part_number in part_numbers
+            ]
+        except PresignError as e:
+            raise Exception(f"Error generating presigned URL: {e}")
+        return FileMultipartPartUrlsResponse(parts=parts)
+
+    def complete_multipart_upload(
+        self, file_obj: FileModel, parts: list[FileMultipartPart]
+    ) -> FileModel:
+        """Complete a multipart upload from its uploaded parts.
+
+        Args:
+            file_obj: The file being uploaded.
+            parts: Number and ETag of every uploaded part.
+
+        Returns:
+            The updated file metadata record.
+
+        Raises:
+            MultipartUploadError: If no upload is in progress or S3 rejects the parts.
+            UploadIncompleteError: If the upload failed meanwhile.
+            Exception: If S3 fails to complete the upload.
+        """
+        if not file_obj.upload_id:
+            raise MultipartUploadError("No multipart upload in progress for this file")
+
+        head = self.complete_s3_multipart_upload(file_obj, parts)
+        return self.mark_upload_complete(file_obj, head)
+
+    def complete_s3_multipart_upload(
+        self, file_obj: FileModel, parts: list[FileMultipartPart]
+    ) -> dict[str, Any]:
+        """Assemble the uploaded parts of a multipart upload into the object in S3.
+
+        Args:
+            file_obj: The file being uploaded.
+            parts: Number and ETag of every uploaded part.
+
+        Returns:
+            The HeadObject response for the assembled object.
+
+        Raises:
+            MultipartUploadError: If S3 rejects the parts.
+            Exception: If S3 fails to complete the upload.
+        """
+        try:
+            self.s3_client.complete_multipart_upload(
+                Bucket=self.s3_bucket_name,
+                Key=file_obj.s3_key,
+                UploadId=file_obj.upload_id,
+                MultipartUpload={
+                    "Parts": [
+                        {"ETag": part.etag, "PartNumber": part.part_number}
+                        for part in sorted(parts, key=lambda p: p.part_number)
+                    ]
+                },
+            )
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code")
+            if code in {"InvalidPart", "InvalidPartOrder", "EntityTooSmall"}:
+                raise MultipartUploadError(f"S3 rejected the uploaded parts: {code}")
+            raise Exception(f"Error completing multipart upload: {e}")
+
+        # CompleteMultipartUpload doesn't return the object's size
+        head = self.head_s3_object(str(file_obj.s3_key))
+        if head is None:
+            raise Exception("Completed multipart upload is missing from S3")
+        return head
+
+    @staticmethod
+    def check_content_uploadable(file_obj: FileModel) -> None:
+        """Check that a file's content can be streamed through the API.
+
+        Args:
+            file_obj: The file.
+
+        Raises:
+            ContentUploadError: If the file was already uploaded, its content
+                is being streamed by another request, or it is being uploaded in
+                parts by the client.
+            ContentTooLargeError: If the file's declared size is larger than
+                content_upload_max_size.
+        """
+        if file_obj.status == FileStatus.UPLOADING.value:
+            raise ContentUploadError("The file's content is already being uploaded")
+        if file_obj.status != FileStatus.PENDING.value:
+            raise ContentUploadError("The file has already been uploaded")
+        if file_obj.upload_id:
+            raise ContentUploadError("A multipart upload is in progress for this file")
+        max_size = content_upload_max_size()
+        if file_obj.size_bytes > max_size:
+            raise ContentTooLargeError(
+                f"Files larger than {max_size} bytes must be uploaded with "
+                "presigned URLs"
+            )
+
+    @staticmethod
+    def check_content_sha256(file_obj: FileModel, sha256: str) -> None:
+        """Check uploaded content against the SHA-256 the client declared, if any.
+
+        Args:
+            file_obj: The file being uploaded.
+            sha256: Hex SHA-256 of the uploaded content.
+
+        Raises:
+            ContentUploadError: If the hashes differ.
+        """
+        if file_obj.sha256 and file_obj.sha256 != sha256:
+            raise ContentUploadError(
+                "Content doesn't match the file's SHA-256: "
+                f"expected {file_obj.sha256}, got {sha256}"
+            )
+
+    def record_upload_id(self, file_obj: FileModel, upload_id: str | None) -> None:
+        """Store or clear the ID of a file's multipart upload in progress.
+
+        Args:
+            file_obj: The file being uploaded.
+            upload_id: The S3 upload ID, or None once the upload is aborted.
+        """
+        file_obj.upload_id = upload_id
+        self.db.add(file_obj)
+        self.db.commit()
+
+    def claim_content_upload(self, file_obj: FileModel) -> None:
+        """Mark a pending file as having its content streamed through the API.
+
+        The upload reconciler leaves such files alone, so it can't settle one
+        while its content is still arriving. The check and the change are one
+        statement, so only one request at a time streams a file's content.
+
+        Args:
+            file_obj: The file, checked with check_content_uploadable.
+
+        Raises:
+            ContentUploadError: If the file stopped being pending meanwhile.
+        """
+        result = self.db.execute(
+            update(FileModel)
+            .where(
+                FileModel.id == file_obj.id,
+                FileModel.status == FileStatus.PENDING.value,
+                FileModel.upload_id.is_(None),
+            )
+            .values(status=FileStatus.UPLOADING.value)
+        )
+        self.db.commit()
+        if result.rowcount == 0:
+            raise ContentUploadError("The file's content is already being uploaded")
+
+    def release_content_upload(self, file_obj: FileModel) -> None:
+        """Make a file whose content failed to stream pending again.
+
+        Files the upload reconciler settled meanwhile are left as they are.
+
+        Args:
+            file_obj: The file being uploaded.
+        """
+        self.db.execute(
+            update(FileModel)
+            .where(
+                FileModel.id == file_obj.id,
+                FileModel.status == FileStatus.UPLOADING.value,
+            )
+            .values(status=FileStatus.PENDING.value, upload_id=None)
+        )
+        self.db.commit()
+
+    def put_s3_object(self, s3_key: str, content_type: str, body: bytes) -> None:
+        """Store an object in S3 in a single request.
+
+        Args:
+            s3_key: Key of the object.
+            content_type: MIME type of the object.
+            body: The object's content.
+
+        Raises:
+            Exception: If S3 fails to store the object.
+        """
+        try:
+            self.s3_client.put_object(
+                Bucket=self.s3_bucket_name,
+                Key=s3_key,
+                Body=body,
+                ContentType=content_type,
+            )
+        except ClientError as e:
+            raise Exception(f"Error uploading file to S3: {e}")
+
+    def upload_s3_part(
+        self, file_obj: FileModel, part_number: int, body: bytes
+    ) -> FileMultipartPart:
+        """Upload one part of a multipart upload to S3.
+
+        Args:
+            file_obj: The file being uploaded, with its upload ID.
+            part_number: Number of the part, starting at 1.
+            body: The part's content.
+
+        Returns:
+            The part's number and ETag, to complete the upload with.
+
+        Raises:
+            Exception: If S3 fails to store the part.
+        """
+        try:
+            response = self.s3_client.upload_part(
+                Bucket=self.s3_bucket_name,
+                Key=file_obj.s3_key,
+                UploadId=file_obj.upload_id,
+                PartNumber=part_number,
+                Body=body,
+            )
+        except ClientError as e:
+            raise Exception(f"Error uploading part {part_number} to S3: {e}")
+        return FileMultipartPart(part_number=part_number, etag=response["ETag"])
+
+    def abort_multipart_upload(self, file_obj: FileModel) -> FileModel:
+        """Abort a multipart upload and remove the file metadata.
+
+        S3 discards the parts uploaded so far.
+
+        Args:
+            file_obj: The file being uploaded.
+
+        Returns:
+            The removed file metadata record.
+
+        Raises:
+            MultipartUploadError: If no upload is in progress.
+            Exception: If S3 fails to abort the upload.
+        """
+        if not file_obj.upload_id:
+            raise MultipartUploadError("No multipart upload in progress for this file")
+
+        self.abort_s3_multipart_upload(file_obj)
+        self.delete_record(file_obj)
+        return file_obj
+
+    def abort_s3_multipart_upload(self, file_obj: FileModel) -> None:
+        """Abort a multipart upload in S3, discarding its parts.
+
+        Args:
+            file_obj: The file being uploaded.
+
+        Raises:
+            Exception: If S3 fails to abort the upload.
+        """
+        try:
+            self.s3_client.abort_multipart_upload(
+                Bucket=self.s3_bucket_name,
+                Key=file_obj.s3_key,
+                UploadId=file_obj.upload_id,
+            )
+        except ClientError as e:
+            # The upload may already be gone, e.g. aborted by a lifecycle rule
+            if e.response.get("Error", {}).get("Code") != "NoSuchUpload":
+                raise Exception(f"Error aborting multipart upload: {e}")
+
+
+class AsyncFileService:
+    """Service for file operations on an asyncio database session.
+
+    Database work is delegated to FileService running on the session's sync
+    facade through AsyncSession.run_sync, so queries are awaited rather than
+    blocking the event loop. Blocking S3 API calls run in a worker thread.
+
+    Attributes:
+        db: Asyncio database session.
+        files: The sync file service the database work is delegated to.
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        s3_client: BaseClient | None = None,
+        presigner: S3Presigner | None = None,
+    ):
+        """Initialize the file service.
+
+        Args:
+            db: Asyncio database session.
+            s3_client: Optional S3 client. Defaults to the process-wide shared client.
+            presigner: Optional URL presigner. Defaults to the process-wide shared one.
+        """
+        self.db = db
+        self.files = FileService(db.sync_session, s3_client, presigner)
+
+    async def _run_sync(
+        self, fn: Callable[P, T], *args: P.args, **kwargs: P.kwargs
+    ) -> T:
+        """Run a FileService method that uses the database.
+
+        Args:
+            fn: The method, bound to self.files.
+            *args: Positional arguments for the method.
+            **kwargs: Keyword arguments for the method.
+
+        Returns:
+            The method's return value.
+        """
+        return await self.db.run_sync(lambda _: fn(*args, **kwargs))
+
+    async def get(
+        self, id: uuid.UUID | str, fields: Sequence[str] | None = None
+    ) -> FileModel | None:
+        """Get a file by ID.
+
+        Args:
+            id: File ID (can be UUID or string).
+            fields: Columns to read, all by default. See FileService.get.
+
+        Returns:
+            The file with the given ID or None if not found.
+        """
+        return await self._run_sync(self.files.get, id, fields)
+
+    async def get_state(self, id: uuid.UUID | str) -> Row | None:
+        """Get what decides access to a file and whether it changed.
+
+        See FileService.get_state.
+
+        Args:
+            id: File ID (can be UUID or string).
+
+        Returns:
+            The file's owner_id, is_public and updated_at, or None if not found.
+        """
+        return await self._run_sync(self.files.get_state, id)
+
+    async def get_multi_by_owner(  # noqa: PLR0913 - listing options are keyword-only
+        self,
+        owner_id: uuid.UUID | str,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: str | None = None,
+        filters: FileListFilter | None = None,
+        sort: FileSort = FileSort.CREATED_AT,
+        fields: Sequence[str] | None = None,
+    ) -> list[FileModel]:
+        """Get multiple files by owner, filtered and sorted.
+
+        See FileService.get_multi_by_owner.
+
+        Args:
+            owner_id: Owner's ID (can be UUID or string).
+            skip: Number of records to skip. Ignored when a cursor is given.
+            limit: Maximum number of records to return.
+            cursor: Cursor returned by next_cursor for the previous page.
+            filters: Filters the files must match. By default, all files except
+                failed uploads are returned.
+            sort: Order of the files, oldest first by default.
+            fields: Columns to read, all by default. The sort key is read too,
+                for next_cursor.
+
+        Returns:
+            A list of files owned by the specified user.
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed or from another sort.
+        """
+        return await self._run_sync(
+            self.files.get_multi_by_owner,
+            owner_id,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            filters=filters,
+            sort=sort,
+            fields=fields,
+        )
+
+    next_cursor = staticmethod(FileService.next_cursor)
+
+    async def search(
+        self,
+        owner_id: uuid.UUID | str,
+        query: str,
+        limit: int = 100,
+        cursor: str | None = None,
+    ) -> list[tuple[FileModel, float]]:
+        """Search an owner's files by filename and description, best matches first.
+
+        See FileService.search.
+
+        Args:
+            owner_id: Owner's ID (can be UUID or string).
+            query: The search query.
+            limit: Maximum number of records to return.
+            cursor: Cursor returned by next_search_cursor for the previous page.
+
+        Returns:
+            The matching files with their rank.
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed.
+        """
+        return await self._run_sync(self.files.search, owner_id, query, limit, cursor)
+
+    next_search_cursor = staticmethod(FileService.next_search_cursor)
+
+    async def update(
+        self, db_obj: FileModel, obj_in: FileUpdate | dict[str, Any]
+    ) -> FileModel:
+        """Update a file's metadata.
+
+        Args:
+            db_obj: Existing file object from the database.
+            obj_in: File update data or dictionary with fields to update.
+
+        Returns:
+            The updated file metadata record.
+
+        Raises:
+            FileNotFoundError: If the file was deleted meanwhile.
+        """
+        return await self._run_sync(self.files.update, db_obj, obj_in)
+
+    async def remove(self, id: uuid.UUID | str) -> FileModel | None:
+        """Remove a file from the database, queueing its object for deletion.
+
+        Args:
+            id: ID of the file to remove (can be UUID or string).
+
+        Returns:
+            The removed file metadata record or None if not found.
+        """
+        return await self._run_sync(self.files.remove, id)
+
+    async def remove_multi(
+        self, file_ids: list[uuid.UUID], user: UserModel
+    ) -> FileBatchDeleteResponse:
+        """Remove many files from the database.
+
+        See FileService.remove_multi.
+
+        Args:
+            file_ids: IDs of the files to remove.
+            user: The user removing the files.
+
+        Returns:
+            A response with one result per file, in request order.
+        """
+        return await self._run_sync(self.files.remove_multi, file_ids, user)
+
+    async def create_upload_url(
+        self, file_info: FileCreate, user: UserModel
+    ) -> FileUploadResponse:
+        """Create a presigned URL for file upload and register the file metadata.
+
+        Args:
+            file_info: Information about the file to be uploaded.
+            user: The user uploading the file.
+
+        Returns:
+            A response containing the upload URL, if any, and file ID.
+
+        Raises:
+            QuotaExceededError: If the file doesn't fit in the user's quota.
+            Exception: If there's an error generating the presigned URL.
+        """
+        return await self._run_sync(self.files.create_upload_url, file_info, user)
+
+    async def create_upload_urls(
+        self, file_infos: list[FileCreate], user: UserModel
+    ) -> FileBatchUploadResponse:
+        """Create presigned upload URLs and file metadata for many files at once.
+
+        Args:
+            file_infos: Information about each file to be uploaded.
+            user: The user uploading the files.
+
+        Returns:
+            A response with one result per item, in request order.
+        """
+        return await self._run_sync(self.files.create_upload_urls, file_infos, user)
+
+    async def complete_upload(self, file_obj: FileModel) -> FileModel:
+        """Confirm that a file has been uploaded through its presigned URL.
+
+        Args:
+            file_obj: The uploaded file.
+
+        Returns:
+            The updated file metadata record.
+
+        Raises:
+            FileNotFoundError: If the file was deleted meanwhile.
+            UploadIncompleteError: If the object isn't in S3, the upload failed
+                or the file is being uploaded in parts.
+            Exception: If S3 fails to answer.
+        """
+        if file_obj.status == FileStatus.COMPLETE.value:
+            return file_obj
+        self.files.check_upload_completable(file_obj)
+
+        head = await asyncio.to_thread(self.files.head_s3_object, str(file_obj.s3_key))
+        if head is None:
+            raise UploadIncompleteError("The file hasn't been uploaded to S3 yet")
+        return await self._run_sync(self.files.mark_upload_complete, file_obj, head)
+
+    async def create_download_url(
+        self, file_id: uuid.UUID, user: UserModel
+    ) -> FileDownloadResponse:
+        """Create a presigned URL for file download.
+
+        Args:
+            file_id: ID of the file to download.
+            user: The user requesting the download.
+
+        Returns:
+            A response containing the download URL, filename, and content type.
+
+        Raises:
+            FileNotFoundError: If the file doesn't exist.
+            PermissionError: If the user doesn't have permission to access the file.
+            Exception: If there's an error generating the presigned URL.
+        """
+        return await self._run_sync(self.files.create_download_url, file_id, user)
+
+    async def open_content(
+        self,
+        file_id: uuid.UUID,
+        user: UserModel,
+        range_header: str | None = None,
+        if_range: str | None = None,
+    ) -> tuple[FileModel, dict[str, Any]]:
+        """Open a file's content for streaming to the user.
+
+        Args:
+            file_id: ID of the file to download.
+            user: The user requesting the download.
+            range_header: The request's Range header, see requested_range.
+            if_range: The request's If-Range header.
+
+        Returns:
+            The file, and the GetObject response with the content in Body.
+
+        Raises:
+            FileNotFoundError: If the file doesn't exist.
+            PermissionError: If the user doesn't have permission to access the file.
+            UploadIncompleteError: If the file hasn't been uploaded yet.
+            RangeNotSatisfiableError: If the range lies outside the content.
+            Exception: If S3 fails to answer.
+        """
+        file_obj = await self._run_sync(self.files.get_readable, file_id, user)
+        byte_range = requested_range(range_header, if_range, file_obj.etag)
+        s3_object = await asyncio.to_thread(
+            self.files.get_s3_object, file_obj, byte_range
+        )
+        return file_obj, s3_object
+
+    async def get_archive_files(
+        self, user: UserModel, file_ids: list[uuid.UUID] | None = None
+    ) -> list[Row[Any]]:
+        """Get the files to put in an archive for a user.
+
+        Args:
+            user: The user requesting the archive.
+            file_ids: IDs of the files, in archive order. By default, all the
+                user's uploaded files, oldest first.
+
+        Returns:
+            The files' ID, filename, S3 key, content type, size and creation time.
+
+        Raises:
+            FileNotFoundError: If a requested file doesn't exist.
+            PermissionError: If the user doesn't have permission to access one.
+            UploadIncompleteError: If a requested file hasn't been uploaded yet.
+        """
+        return await self._run_sync(self.files.get_archive_files, user, file_ids)
+
+    async def initiate_multipart_upload(
+        self, file_info: FileCreate, user: UserModel
+    ) -> FileMultipartUploadResponse:
+        """Start an S3 multipart upload and register the file metadata.
+
+        Args:
+            file_info: Information about the file to be uploaded.
+            user: The user uploading the file.
+
+        Returns:
+            A response with the file ID, upload ID and how to split the file.
+
+        Raises:
+            MultipartUploadError: If the file can't be uploaded in parts.
+            QuotaExceededError: If the file doesn't fit in the user's quota.
+            Exception: If S3 fails to start the upload.
+        """
+        values = self.files.new_multipart_values(file_info, user)
+        await self._run_sync(self.files.usage.check, user.id, file_info.size_bytes)
+        upload_id = await asyncio.to_thread(
+            self.files.start_s3_multipart_upload,
+            values["s3_key"],
+            file_info.content_type,
+        )
+        try:
+            return await self._run_sync(
+                self.files.register_multipart_upload, values, upload_id
+            )
+        except QuotaExceededError:
+            await asyncio.to_thread(
+                self.files.abort_s3_multipart_upload,
+                FileModel(**values, upload_id=upload_id),
+            )
+            raise
+
+    def create_part_upload_urls(
+        self, file_obj: FileModel, part_numbers: list[int]
+    ) -> FileMultipartPartUrlsResponse:
+        """Create presigned URLs for uploading parts of a multipart upload.
+
+        Signing is done in-process and doesn't touch the database, so this method
+        is synchronous.
+
+        Args:
+            file_obj: The file being uploaded.
+            part_numbers: Numbers of the parts to sign, starting at 1.
+
+        Returns:
+            A response with one upload URL per part.
+
+        Raises:
+            MultipartUploadError: If no upload is in progress or a part number is
+                out of range.
+            Exception: If there's an error generating the presigned URLs.
+        """
+        return self.files.create_part_upload_urls(file_obj, part_numbers)
+
+    async def complete_multipart_upload(
+        self, file_obj: FileModel, parts: list[FileMultipartPart]
+    ) -> FileModel:
+        """Complete a multipart upload from its uploaded parts.
+
+        Args:
+            file_obj: The file being uploaded.
+            parts: Number and ETag of every uploaded part.
+
+        Returns:
+            The updated file metadata record.
+
+        Raises:
+            MultipartUploadError: If no upload is in progress or S3 rejects the parts.
+            UploadIncompleteError: If the upload failed meanwhile.
+            Exception: If S3 fails to complete the upload.
+        """
+        if not file_obj.upload_id:
+            raise MultipartUploadError("No multipart upload in progress for this file")
+
+        head = await asyncio.to_thread(
+            self.files.complete_s3_multipart_upload, file_obj, parts
+        )
+        return await self._run_sync(self.files.mark_upload_complete, file_obj, head)
+
+    async def upload_content(
+        self, file_obj: FileModel, chunks: AsyncIterable[bytes]
+    ) -> FileModel:
+        """Stream a file's content into S3 and mark the upload complete.
+
+        The content is cut into parts of CONTENT_UPLOAD_PART_SIZE bytes. Each
+        part is sent to S3 while the next one is read, and reading waits while a
+        part is still being sent, so a slow S3 connection slows the client down
+        instead of piling up buffers. Memory use is about three parts, whatever
+        the file's size, declared or real. Content that fits in one part is
+        stored with a single PutObject.
+
+        Args:
+            file_obj: The file being uploaded.
+            chunks: The content, in chunks of any size.
+
+        Returns:
+            The updated file metadata record, with the real size, ETag and SHA-256.
+
+        Raises:
+            ContentUploadError: If the file isn't waiting for its content or
+                the content doesn't match the file's SHA-256.
+            ContentTooLargeError: If the file is declared, or turns out to be,
+                larger than content_upload_max_size.
+            UploadIncompleteError: If the upload failed meanwhile.
+            Exception: If S3 fails to store the content.
+        """
+        self.files.check_content_uploadable(file_obj)
+        await self._run_sync(self.files.claim_content_upload, file_obj)
+        part_size = settings.CONTENT_UPLOAD_PART_SIZE
+        max_size = content_upload_max_size()
+
+        digest = hashlib.sha256()
+        buffer = bytearray()
+        size = 0
+        parts: list[FileMultipartPart] = []
+        # The part being sent to S3, at most one at a time
+        sending: asyncio.Future[FileMultipartPart] | None = None
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > max_size:
+                    raise ContentTooLargeError(
+                        f"Content larger than {max_size} bytes must be uploaded "
+                        "with presigned URLs"
+                    )
+                digest.update(chunk)
+                buffer += chunk
+                while len(buffer) >= part_size:
+                    if not file_obj.upload_id:
+                        await self._start_content_upload(file_obj)
+                    if sending is not None:
+                        parts.append(await sending)
+                    # One copy of the part, which the buffer mustn't be exporting
+                    # when it's cut
+                    with memoryview(buffer) as view:
+                        part = bytes(view[:part_size])
+                    del buffer[:part_size]
+                    sending = asyncio.ensure_future(
+                        asyncio.to_thread(
+                            self.files.upload_s3_part, file_obj, len(parts) + 1, part
+                        )
+                    )
+                    del part
+
+            sha256 = digest.hexdigest()
+            self.files.check_content_sha256(file_obj, sha256)
+            if sending is not None:
+                parts.append(await sending)
+                sending = None
+            head = await self._finish_content_upload(file_obj, parts, bytes(buffer))
+        except BaseException:
+            # Also covers the client disconnecting, which cancels the request
+            if sending is not None:
+                sending.cancel()
+                await asyncio.gather(sending, return_exceptions=True)
+            await self._abort_content_upload(file_obj)
+            raise
+
+        return await self._run_sync(
+            self.files.mark_upload_complete, file_obj, head, sha256
+        )
+
+    async def _start_content_upload(self, file_obj: FileModel) -> None:
+        """Start the multipart upload of content streamed through the API.
+
+        Args:
+            file_obj: The file being uploaded.
+
+        Raises:
+            Exception: If S3 fails to start the upload.
+        """
+        upload_id = await asyncio.to_thread(
+            self.files.start_s3_multipart_upload,
+            str(file_obj.s3_key),
+            str(file_obj.content_type),
+        )
+        # Keeps the upload reconciler off the file while it streams
+        await self._run_sync(self.files.record_upload_id, file_obj, upload_id)
+
+    async def _finish_content_upload(
+        self, file_obj: FileModel, parts: list[FileMultipartPart], rest: bytes
+    ) -> dict[str, Any]:
+        """Store the last of the content streamed through the API.
+
+        Args:
+            file_obj: The file being uploaded.
+            parts: The parts sent so far, if the content was uploaded in parts.
+            rest: The content after the last part, or all of it.
+
+        Returns:
+            The HeadObject response for the stored object.
+
+        Raises:
+            Exception: If S3 fails to store the content.
+        """
+        s3_key = str(file_obj.s3_key)
+        if not file_obj.upload_id:
+            await asyncio.to_thread(
+                self.files.put_s3_object, s3_key, str(file_obj.content_type), rest
+            )
+            head = await asyncio.to_thread(self.files.head_s3_object, s3_key)
+            if head is None:
+                raise Exception("Uploaded file is missing from S3")
+            return head
+
+        if rest:
+            parts.append(
+                await asyncio.to_thread(
+                    self.files.upload_s3_part, file_obj, len(parts) + 1, rest
+                )
+            )
+        return await asyncio.to_thread(
+            self.files.complete_s3_multipart_upload, file_obj, parts
+        )
+
+    async def _abort_content_upload(self, file_obj: FileModel) -> None:
+        """Discard the parts of a failed streaming upload and make the file pending.
+
+        Args:
+            file_obj: The file being uploaded.
+        """
+        try:
+            if file_obj.upload_id:
+                await asyncio.to_thread(self.files.abort_s3_multipart_upload, file_obj)
+            await self._run_sync(self.files.release_content_upload, file_obj)
+        except Exception:
+            # Any upload ID stays recorded, so the client can still abort it
+            logger.exception(f"Error aborting upload of {file_obj.s3_key}")
+
+    async def abort_multipart_upload(self, file_obj: FileModel) -> FileModel:
+        """Abort a multipart upload and remove the file metadata.
+
+        Args:
+            file_obj: The file being uploaded.
+
+        Returns:
+            The removed file metadata record.
+
+        Raises:
+            MultipartUploadError: If no upload is in progress.
+            Exception: If S3 fails to abort the upload.
+        """
+        if not file_obj.upload_id:
+            raise MultipartUploadError("No multipart upload in progress for this file")
+
+        await asyncio.to_thread(self.files.abort_s3_multipart_upload, file_obj)
+        await self._run_sync(self.files.delete_record, file_obj)
+        return file_obj
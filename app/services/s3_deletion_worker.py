@@ -0,0 +1,151 @@
+"""Background deletion of the S3 objects of deleted files."""
+
+import asyncio
+import logging
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+
+from botocore.client import BaseClient
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.s3_deletion import S3Deletion
+from app.services.file_service import FileService
+
+logger = logging.getLogger(__name__)
+
+
+class S3DeletionWorker:
+    """Drains the outbox of S3 objects waiting to be deleted.
+
+    Deleting a file only writes a tombstone in the transaction that deletes its
+    metadata, so requests never wait on S3 and no object is leaked if S3 is
+    unavailable. Due tombstones are processed in batches, each deleted from S3
+    with DeleteObjects. Tombstones whose object was deleted are removed; the
+    others are retried with exponential backoff until they succeed.
+
+    The rows of a batch are locked with SKIP LOCKED while they are processed, so
+    every API worker can run a deletion worker without deleting the same objects.
+
+    Attributes:
+        batch_size: Number of tombstones processed per batch.
+        retry_backoff: Seconds to wait before retrying a failed delete.
+        max_retry_backoff: Most seconds to wait between retries.
+    """
+
+    def __init__(
+        self,
+        *,
+        session_factory: Callable[[], Session] = SessionLocal,
+        s3_client: BaseClient | None = None,
+        batch_size: int = settings.S3_DELETE_BATCH_SIZE,
+        retry_backoff: int = settings.S3_DELETE_RETRY_BACKOFF,
+        max_retry_backoff: int = settings.S3_DELETE_RETRY_MAX_BACKOFF,
+    ):
+        """Initialize the worker.
+
+        Args:
+            session_factory: Callable returning a new database session.
+            s3_client: Optional S3 client. Defaults to the process-wide shared client.
+            batch_size: Number of tombstones processed per batch.
+            retry_backoff: Seconds to wait before retrying a failed delete.
+            max_retry_backoff: Most seconds to wait between retries.
+        """
+        self.session_factory = session_factory
+        self.s3_client = s3_client
+        self.batch_size = batch_size
+        self.retry_backoff = retry_backoff
+        self.max_retry_backoff = max_retry_backoff
+
+    def run_once(self) -> dict[str, int]:
+        """Process every due tombstone, one batch at a time.
+
+        Returns:
+            The number of objects deleted and of deletes that failed.
+        """
+        counts = {"deleted": 0, "failed": 0}
+        while True:
+            batch_counts = self._drain_batch()
+            for name, count in batch_counts.items():
+                counts[name] += count
+            # Failed tombstones are rescheduled, so they aren't picked up again
+            if sum(batch_counts.values()) < self.batch_size:
+                return counts
+
+    def _drain_batch(self) -> dict[str, int]:
+        """Delete the objects of one batch of due tombstones.
+
+        Returns:
+            The batch's counts.
+        """
+        # Timestamps are stored as naive UTC
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        with self.session_factory() as db:
+            tombstones = (
+                db.query(S3Deletion)
+                .filter(S3Deletion.next_attempt_at <= now)
+                .order_by(S3Deletion.next_attempt_at, S3Deletion.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            if not tombstones:
+                return {"deleted": 0, "failed": 0}
+
+            # Several files can have had the same key, e.g. after a failed upload
+            s3_keys = list(dict.fromkeys(str(t.s3_key) for t in tombstones))
+            file_service = FileService(db, s3_client=self.s3_client)
+            try:
+                errors = file_service.delete_s3_objects(s3_keys)
+            except Exception as e:
+                logger.exception("Error deleting objects from S3")
+                errors = dict.fromkeys(s3_keys, f"Error deleting file from S3: {e}")
+
+            done = [t.id for t in tombstones if t.s3_key not in errors]
+            if done:
+                db.execute(
+                    delete(S3Deletion).where(S3Deletion.id.in_(done)),
+                    execution_options={"synchronize_session": False},
+                )
+            for tombstone in tombstones:
+                error = errors.get(str(tombstone.s3_key))
+                if error is None:
+                    continue
+                tombstone.attempts += 1
+                tombstone.last_error = error
+                tombstone.next_attempt_at = now + timedelta(
+                    seconds=self._backoff(tombstone.attempts)
+                )
+            db.commit()
+            return {"deleted": len(done), "failed": len(tombstones) - len(done)}
+
+    def _backoff(self, attempts: int) -> int:
+        """Get how long to wait before retrying a delete.
+
+        Args:
+            attempts: Number of failed attempts so far.
+
+        Returns:
+            Seconds to wait, doubling with each attempt up to max_retry_backoff.
+        """
+        # Capping the exponent keeps the number small for long-failing objects
+        return min(
+            self.retry_backoff * 2 ** min(attempts - 1, 32), self.max_retry_backoff
+        )
+
+    async def run(self, interval: float) -> None:
+        """Delete queued objects every interval seconds until cancelled.
+
+        Args:
+            interval: Seconds to wait between runs.
+        """
+        while True:
+            try:
+                counts = await asyncio.to_thread(self.run_once)
+                if counts["failed"]:
+                    logger.warning(f"Failed to delete some S3 objects: {counts}")
+            except Exception:
+                logger.exception("Error deleting queued S3 objects")
+            await asyncio.sleep(interval)
@@ -0,0 +1,237 @@
+"""Background reconciliation of pending uploads against S3."""
+
+import asyncio
+import logging
+from collections import defaultdict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from botocore.client import BaseClient
+from sqlalchemy import and_, or_, tuple_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.file import (
+    File as FileModel,
+    FileStatus,
+)
+from app.services.file_service import FileService
+from app.services.usage_service import QuotaExceededError
+
+logger = logging.getLogger(__name__)
+
+
+class UploadReconciler:
+    """Settles pending uploads by checking their objects in S3.
+
+    Files whose upload was never confirmed through POST /files/{id}/complete are
+    checked in batches, with the HeadObject calls of a batch made concurrently.
+    Files whose object exists are marked complete with its real size and ETag,
+    unless the object is larger than declared and doesn't fit in the owner's
+    quota: those are rejected, and their objects queued for deletion. Files
+    whose object is still missing after their upload URL expired, plus a grace
+    period for uploads in flight, are marked failed, and their declared size no
+    longer counts in the owner's usage. Multipart uploads are left alone; they
+    are settled by completing or aborting them. So is content being streamed
+    through the API, unless its request stopped updating the file fail_after
+    seconds ago, e.g. because its process died.
+
+    The rows of a batch are locked with SKIP LOCKED while they are checked, so
+    every API worker can run a reconciler without checking the same files.
+
+    Attributes:
+        batch_size: Number of files checked per batch.
+        min_age: Seconds a file must be pending before it is checked.
+        fail_after: Seconds after which a file whose object is missing fails.
+    """
+
+    def __init__(  # noqa: PLR0913 - keyword-only overrides of the settings
+        self,
+        *,
+        session_factory: Callable[[], Session] = SessionLocal,
+        s3_client: BaseClient | None = None,
+        batch_size: int = settings.UPLOAD_RECONCILE_BATCH_SIZE,
+        concurrency: int = settings.UPLOAD_RECONCILE_CONCURRENCY,
+        min_age: int = settings.UPLOAD_RECONCILE_MIN_AGE,
+        fail_after: int = settings.PRESIGNED_URL_EXPIRY
+        + settings.UPLOAD_RECONCILE_GRACE,
+    ):
+        """Initialize the reconciler.
+
+        Args:
+            session_factory: Callable returning a new database session.
+            s3_client: Optional S3 client. Defaults to the process-wide shared client.
+            batch_size: Number of files checked per batch.
+            concurrency: Number of HeadObject calls made at once.
+            min_age: Seconds a file must be pending before it is checked.
+            fail_after: Seconds after which a file whose object is missing fails.
+        """
+        self.session_factory = session_factory
+        self.s3_client = s3_client
+        self.batch_size = batch_size
+        self.min_age = min_age
+        self.fail_after = fail_after
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="upload-reconciler"
+        )
+
+    def run_once(self) -> dict[str, int]:
+        """Check every pending file that is old enough, one batch at a time.
+
+        Returns:
+            The number of files checked, marked complete and marked failed.
+        """
+        counts = {"checked": 0, "complete": 0, "failed": 0}
+        after: tuple[datetime, str] | None = None
+        while True:
+            batch_counts, after = self._reconcile_batch(after)
+            for name, count in batch_counts.items():
+                counts[name] += count
+            if after is None:
+                return counts
+
+    def _reconcile_batch(
+        self, after: tuple[datetime, str] | None
+    ) -> tuple[dict[str, int], tuple[datetime, str] | None]:
+        """Check one batch of pending files.
+
+        Args:
+            after: (created_at, id) of the last file of the previous batch.
+
+        Returns:
+            The batch's counts, and the position to continue from or None if
+            this was the last batch.
+        """
+        # Timestamps are stored as naive UTC
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        fail_before = now - timedelta(seconds=self.fail_after)
+        with self.session_factory() as db:
+            query = (
+                db.query(FileModel)
+                .filter(
+                    or_(
+                        FileModel.status == FileStatus.PENDING.value,
+                        and_(
+                            FileModel.status == FileStatus.UPLOADING.value,
+                            FileModel.updated_at <= fail_before,
+                        ),
+                    ),
+                    FileModel.upload_id.is_(None),
+                    FileModel.created_at <= now - timedelta(seconds=self.min_age),
+                )
+                .order_by(FileModel.created_at, FileModel.id)
+            )
+            if after is not None:
+                query = query.filter(
+                    tuple_(FileModel.created_at, FileModel.id) > tuple_(*after)
+                )
+            files = query.limit(self.batch_size).with_for_update(skip_locked=True).all()
+            if not files:
+                return {"checked": 0, "complete": 0, "failed": 0}, None
+
+            file_service = FileService(db, s3_client=self.s3_client)
+            heads = list(
+                self._executor.map(
+                    lambda file: self._head(file_service, str(file.s3_key)), files
+                )
+            )
+
+            counts = {"checked": len(files), "complete": 0, "failed": 0}
+            by_owner: defaultdict[str, list[tuple[FileModel, Any]]] = defaultdict(list)
+            for file, head in zip(files, heads, strict=True):
+                by_owner[file.owner_id].append((file, head))
+            # Owners are settled one at a time in a consistent order, which keeps
+            # concurrent changes to their counters from deadlocking
+            for owner_id in sorted(by_owner):
+                self._settle_owner_files(
+                    file_service, owner_id, by_owner[owner_id], fail_before, counts
+                )
+            # All changes of the batch are flushed and committed together
+            db.commit()
+
+            last = files[-1]
+            more = len(files) == self.batch_size
+            return counts, (last.created_at, str(last.id)) if more else None
+
+    @staticmethod
+    def _settle_owner_files(
+        file_service: FileService,
+        owner_id: str,
+        files: list[tuple[FileModel, Any]],
+        fail_before: datetime,
+        counts: dict[str, int],
+    ) -> None:
+        """Settle one owner's files of a batch and update their usage.
+
+        Real sizes replace the declared ones counted in the owner's usage. Growth
+        is checked against the quota file by file, while shrinkage and failed
+        uploads are applied together, which also gives the owner a new version.
+        The sizes and statuses used are the ones read under the files' row
+        locks, in the transaction that changes the counters.
+
+        Args:
+            file_service: File service bound to the batch's session.
+            owner_id: ID of the files' owner.
+            files: The owner's files, with their HeadObject result from _head.
+            fail_before: Files created before this fail if their object is missing.
+            counts: Counts of the batch, updated in place.
+        """
+        file_count = total_bytes = 0
+        for file, head in files:
+            if head:
+                growth = head["ContentLength"] - file.size_bytes
+                if growth <= 0:
+                    total_bytes += growth
+                else:
+                    try:
+                        file_service.usage.add(owner_id, 0, growth, enforce_quota=True)
+                    except QuotaExceededError:
+                        file_service.reject_upload(file)
+                        counts["failed"] += 1
+                        continue
+                file.status = FileStatus.COMPLETE.value
+                file.size_bytes = head["ContentLength"]
+                file.etag = head["ETag"].strip('"')
+                counts["complete"] += 1
+            elif head is None and file.created_at <= fail_before:
+                file_count -= 1
+                total_bytes -= file.size_bytes
+                file.status = FileStatus.FAILED.value
+                counts["failed"] += 1
+        file_service.usage.add(owner_id, file_count, total_bytes)
+
+    @staticmethod
+    def _head(file_service: FileService, s3_key: str) -> dict[str, Any] | bool | None:
+        """Look up an object, treating S3 errors as an unknown outcome.
+
+        Args:
+            file_service: File service to make the HeadObject call with.
+            s3_key: Key of the object.
+
+        Returns:
+            The HeadObject response, None if the object doesn't exist, or False if
+            S3 couldn't be asked.
+        """
+        try:
+            return file_service.head_s3_object(s3_key)
+        except Exception:
+            logger.exception(f"Error checking upload of {s3_key}")
+            return False
+
+    async def run(self, interval: float) -> None:
+        """Reconcile pending uploads every interval seconds until cancelled.
+
+        Args:
+            interval: Seconds to wait between runs.
+        """
+        while True:
+            try:
+                counts = await asyncio.to_thread(self.run_once)
+                if counts["complete"] or counts["failed"]:
+                    logger.info(f"Reconciled pending uploads: {counts}")
+            except Exception:
+                logger.exception("Error reconciling pending uploads")
+            await asyncio.sleep(interval)
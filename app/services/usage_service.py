@@ -0,0 +1,291 @@
+"""Per-user storage usage service."""
+
+import uuid
+from typing import Any
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.file import (
+    File as FileModel,
+    FileStatus,
+)
+from app.models.user import User as UserModel
+from app.models.user_usage import UserUsage as UserUsageModel
+from app.schemas.user import UserUsage
+
+
+class QuotaExceededError(Exception):
+    """Raised when storing a file would take a user over their storage quota."""
+
+
+class UsageService:
+    """Service for per-user storage usage counters.
+
+    Changes are made in the caller's transaction and committed by it, so the
+    counters move atomically with the files they count, provided callers
+    compute them from file rows read under lock in that transaction. Every
+    change also bumps the user's version, which callers changing files without
+    changing the counters do with touch.
+
+    Attributes:
+        db: Database session.
+    """
+
+    def __init__(self, db: Session):
+        """Initialize the usage service.
+
+        Args:
+            db: Database session.
+        """
+        self.db = db
+
+    @staticmethod
+    def quota_bytes() -> int | None:
+        """Get the storage quota per user.
+
+        Returns:
+            The most bytes a user may store, or None if there's no quota.
+        """
+        return settings.USER_QUOTA_BYTES or None
+
+    def get(self, user_id: uuid.UUID | str) -> UserUsage:
+        """Get a user's storage usage.
+
+        Args:
+            user_id: ID of the user.
+
+        Returns:
+            The user's file count, total bytes and quota.
+        """
+        usage = self.db.get(UserUsageModel, str(user_id))
+        return UserUsage(
+            file_count=usage.file_count if usage else 0,
+            total_bytes=usage.total_bytes if usage else 0,
+            quota_bytes=self.quota_bytes(),
+        )
+
+    def version(self, user_id: uuid.UUID | str) -> int:
+        """Get the version of a user's files, which changes whenever they do.
+
+        Args:
+            user_id: ID of the user.
+
+        Returns:
+            The version, 0 if the user never had files.
+        """
+        version = self.db.scalar(
+            select(UserUsageModel.version).where(UserUsageModel.user_id == str(user_id))
+        )
+        return version or 0
+
+    def check(self, user_id: uuid.UUID | str, size_bytes: int) -> None:
+        """Check that a user has room for a file, without reserving it.
+
+        For rejecting requests before doing slow work; add(enforce_quota=True)
+        makes the binding check.
+
+        Args:
+            user_id: ID of the user.
+            size_bytes: Size of the file.
+
+        Raises:
+            QuotaExceededError: If the file doesn't fit in the user's quota.
+        """
+        quota = self.quota_bytes()
+        if quota is None:
+            return
+        if self.get(user_id).total_bytes + size_bytes > quota:
+            raise QuotaExceededError(_quota_message(quota))
+
+    def add(
+        self,
+        user_id: uuid.UUID | str,
+        file_count: int,
+        total_bytes: int,
+        *,
+        enforce_quota: bool = False,
+    ) -> None:
+        """Change a user's counters.
+
+        Args:
+            user_id: ID of the user.
+            file_count: Number of files added, or removed if negative.
+            total_bytes: Number of bytes added, or removed if negative.
+            enforce_quota: Whether to refuse growth beyond the user's quota.
+
+        Raises:
+            QuotaExceededError: If enforce_quota is set and the bytes don't fit.
+        """
+        quota = self.quota_bytes()
+        if not (enforce_quota and quota is not None and total_bytes > 0):
+            self._upsert(str(user_id), file_count, total_bytes)
+            return
+
+        self._upsert(str(user_id), 0, 0)
+        # The condition is checked under the row's lock, so concurrent uploads
+        # can't both fit in the same remaining space
+        result = self.db.execute(
+            update(UserUsageModel)
+            .where(
+                UserUsageModel.user_id == str(user_id),
+                UserUsageModel.total_bytes + total_bytes <= quota,
+            )
+            .values(
+                file_count=UserUsageModel.file_count + file_count,
+                total_bytes=UserUsageModel.total_bytes + total_bytes,
+                version=UserUsageModel.version + 1,
+                updated_at=func.now(),
+            ),
+            execution_options={"synchronize_session": False},
+        )
+        if result.rowcount == 0:
+            raise QuotaExceededError(_quota_message(quota))
+
+    def add_many(self, changes: dict[str, tuple[int, int]]) -> None:
+        """Change the counters of several users.
+
+        Args:
+            changes: Number of files and bytes added to each user whose files
+                changed, by user ID. Zero changes still bump the version.
+        """
+        # A consistent lock order keeps concurrent changes from deadlocking
+        for user_id in sorted(changes):
+            file_count, total_bytes = changes[user_id]
+            self.add(user_id, file_count, total_bytes)
+
+    def touch(self, user_id: uuid.UUID | str) -> None:
+        """Record a change to a user's files that leaves the counters alone.
+
+        Args:
+            user_id: ID of the user.
+        """
+        self._upsert(str(user_id), 0, 0)
+
+    def _upsert(self, user_id: str, file_count: int, total_bytes: int) -> None:
+        """Add to a user's counters and bump their version, creating them if needed.
+
+        Args:
+            user_id: ID of the user.
+            file_count: Number of files to add.
+            total_bytes: Number of bytes to add.
+        """
+        dialect = (
+            postgresql if self.db.get_bind().dialect.name == "postgresql" else sqlite
+        )
+        statement: Any = dialect.insert(UserUsageModel).values(
+            user_id=user_id,
+            file_count=file_count,
+            total_bytes=total_bytes,
+            version=1,
+            updated_at=func.now(),
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[UserUsageModel.user_id],
+            set_={
+                "file_count": UserUsageModel.file_count + statement.excluded.file_count,
+                "total_bytes": UserUsageModel.total_bytes
+                + statement.excluded.total_bytes,
+                "version": UserUsageModel.version + 1,
+                "updated_at": func.now(),
+            },
+        )
+        self.db.execute(statement)
+
+    def recompute(self) -> int:
+        """Rebuild every user's counters from their files, in one transaction.
+
+        For repairing the counters, e.g. after restoring the file table. Changes
+        to files made while this runs can be miscounted, so run it when the API
+        is quiet. Failed uploads aren't counted.
+
+        Versions are bumped rather than reset, so they never repeat.
+
+        Returns:
+            The number of users whose counters were rebuilt.
+        """
+        # Users without counters get them, then everyone's are recounted
+        self.db.execute(
+            UserUsageModel.__table__.insert().from_select(
+                ["user_id", "file_count", "total_bytes", "version", "updated_at"],
+                select(UserModel.id, 0, 0, 0, func.now()).where(
+                    ~select(UserUsageModel.user_id)
+                    .where(UserUsageModel.user_id == UserModel.id)
+                    .exists()
+                ),
+            )
+        )
+        # Failed uploads aren't counted
+        owned = (FileModel.owner_id == UserUsageModel.user_id) & (
+            FileModel.status != FileStatus.FAILED.value
+        )
+        result = self.db.execute(
+            update(UserUsageModel).values(
+                file_count=select(func.count(FileModel.id))
+                .where(owned)
+                .scalar_subquery(),
+                total_bytes=select(func.coalesce(func.sum(FileModel.size_bytes), 0))
+                .where(owned)
+                .scalar_subquery(),
+                version=UserUsageModel.version + 1,
+                updated_at=func.now(),
+            ),
+            execution_options={"synchronize_session": False},
+        )
+        self.db.commit()
+        return result.rowcount
+
+
+class AsyncUsageService:
+    """Service for per-user storage usage on an asyncio database session.
+
+    Attributes:
+        db: Asyncio database session.
+        usage: Sync usage service running on the session's sync facade.
+    """
+
+    def __init__(self, db: AsyncSession):
+        """Initialize the usage service.
+
+        Args:
+            db: Asyncio database session.
+        """
+        self.db = db
+        self.usage = UsageService(db.sync_session)
+
+    async def get(self, user_id: uuid.UUID | str) -> UserUsage:
+        """Get a user's storage usage.
+
+        Args:
+            user_id: ID of the user.
+
+        Returns:
+            The user's file count, total bytes and quota.
+        """
+        return await self.db.run_sync(lambda _: self.usage.get(user_id))
+
+    async def version(self, user_id: uuid.UUID | str) -> int:
+        """Get the version of a user's files, which changes whenever they do.
+
+        Args:
+            user_id: ID of the user.
+
+        Returns:
+            The version, 0 if the user never had files.
+        """
+        return await self.db.run_sync(lambda _: self.usage.version(user_id))
+
+
+def _quota_message(quota: int) -> str:
+    """Describe a storage quota for error messages.
+
+    Args:
+        quota: The quota in bytes.
+
+    Returns:
+        The error message.
+    """
+    return f"Storage quota of {quota} bytes exceeded"
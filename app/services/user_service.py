@@ -3,12 +3,44 @@
 import uuid
 from typing import Any
 
-from sqlalchemy.orm import Session
-
-from app.core.security import get_password_hash, verify_password
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.security import (
+    get_password_hash,
+    get_password_hash_async,
+    verify_password,
+    verify_password_async,
+)
 from app.models.user import User as UserModel
 from app.schemas.user import UserCreate, UserUpdate
 
+# Users looked up by authenticated requests, keyed by ID (the token subject).
+# The cached instances are detached and never modified; each request merges a
+# copy into its own session.
+user_cache: TTLCache[str, UserModel] = TTLCache(
+    maxsize=settings.USER_CACHE_MAX_SIZE if settings.USER_CACHE_TTL > 0 else 0,
+    ttl=settings.USER_CACHE_TTL,
+)
+
+
+def _detached_copy(user: UserModel) -> UserModel:
+    """Copy a user's column values into a new detached instance.
+
+    Args:
+        user: The user to copy.
+
+    Returns:
+        A detached user with the same identity and loaded columns.
+    """
+    columns = inspect(UserModel).column_attrs
+    copy = UserModel(**{attr.key: getattr(user, attr.key) for attr in columns})
+    make_transient_to_detached(copy)
+    return copy
+
 
 class UserService:
     """Service for user operations.
@@ -59,11 +91,14 @@ class UserService:
         """
         return self.db.query(UserModel).offset(skip).limit(limit).all()
 
-    def create(self, obj_in: UserCreate) -> UserModel:
+    def create(
+        self, obj_in: UserCreate, hashed_password: str | None = None
+    ) -> UserModel:
         """Create a new user.
 
         Args:
             obj_in: User creation data.
+            hashed_password: Hash of obj_in.password, if already computed.
 
         Returns:
             The created user.
@@ -71,7 +106,7 @@ class UserService:
         db_obj = UserModel(
             id=str(uuid.uuid4()),
             email=obj_in.email,
-            hashed_password=get_password_hash(obj_in.password),
+            hashed_password=hashed_password or get_password_hash(obj_in.password),
             full_name=obj_in.full_name,
             is_superuser=obj_in.is_superuser,
         )
@@ -107,6 +142,7 @@ class UserService:
         self.db.add(db_obj)
         self.db.commit()
         self.db.refresh(db_obj)
+        user_cache.invalidate(str(db_obj.id))
         return db_obj
 
     def remove(self, id: str) -> UserModel | None:
@@ -123,6 +159,7 @@ class UserService:
             return None
         self.db.delete(user)
         self.db.commit()
+        user_cache.invalidate(str(user.id))
         return user
 
     def authenticate(self, email: str, password: str) -> UserModel | None:
@@ -163,3 +200,177 @@ class UserService:
             True if the user is a superuser, False otherwise.
         """
         return bool(user.is_superuser)
+
+
+class AsyncUserService:
+    """Service for user operations on an asyncio database session.
+
+    Database work is delegated to UserService running on the session's sync
+    facade through AsyncSession.run_sync. Password hashing and verification are
+    CPU bound, so they run in the dedicated password hashing pool.
+
+    Attributes:
+        db: Asyncio database session.
+        users: The sync user service the database work is delegated to.
+    """
+
+    def __init__(self, db: AsyncSession):
+        """Initialize the user service.
+
+        Args:
+            db: Asyncio database session.
+        """
+        self.db = db
+        self.users = UserService(db.sync_session)
+
+    async def get(self, id: str) -> UserModel | None:
+        """Get a user by ID.
+
+        Args:
+            id: User ID.
+
+        Returns:
+            The user with the given ID or None if not found.
+        """
+        return await self.db.run_sync(lambda _: self.users.get(id))
+
+    async def get_cached(self, id: str) -> UserModel | None:
+        """Get a user by ID, from the user cache when possible.
+
+        On a hit the cached user is merged into this session without a query, so
+        the returned instance can be used and modified like a loaded one.
+
+        Args:
+            id: User ID.
+
+        Returns:
+            The user with the given ID or None if not found.
+        """
+        cached = user_cache.get(id)
+        if cached is not None:
+            return await self.db.merge(cached, load=False)
+
+        user = await self.get(id)
+        if user:
+            user_cache.set(id, _detached_copy(user))
+        return user
+
+    async def get_by_email(self, email: str) -> UserModel | None:
+        """Get a user by email.
+
+        Args:
+            email: User email.
+
+        Returns:
+            The user with the given email or None if not found.
+        """
+        return await self.db.run_sync(lambda _: self.users.get_by_email(email))
+
+    async def get_multi(self, skip: int = 0, limit: int = 100) -> list[UserModel]:
+        """Get multiple users.
+
+        Args:
+            skip: Number of records to skip.
+            limit: Maximum number of records to return.
+
+        Returns:
+            A list of users.
+        """
+        return await self.db.run_sync(lambda _: self.users.get_multi(skip, limit))
+
+    async def create(self, obj_in: UserCreate) -> UserModel:
+        """Create a new user.
+
+        Args:
+            obj_in: User creation data.
+
+        Returns:
+            The created user.
+
+        Raises:
+            PasswordHashingBusyError: If the password hashing pool is full.
+        """
+        hashed_password = await get_password_hash_async(obj_in.password)
+        return await self.db.run_sync(
+            lambda _: self.users.create(obj_in, hashed_password=hashed_password)
+        )
+
+    async def update(
+        self, db_obj: UserModel, obj_in: UserUpdate | dict[str, Any]
+    ) -> UserModel:
+        """Update a user.
+
+        Args:
+            db_obj: Existing user object from the database.
+            obj_in: User update data or dictionary with fields to update.
+
+        Returns:
+            The updated user.
+
+        Raises:
+            PasswordHashingBusyError: If the password hashing pool is full.
+        """
+        if isinstance(obj_in, dict):
+            update_data = dict(obj_in)
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+
+        if update_data.get("password"):
+            update_data["hashed_password"] = await get_password_hash_async(
+                update_data.pop("password")
+            )
+
+        return await self.db.run_sync(lambda _: self.users.update(db_obj, update_data))
+
+    async def remove(self, id: str) -> UserModel | None:
+        """Remove a user.
+
+        Args:
+            id: ID of the user to remove.
+
+        Returns:
+            The removed user or None if not found.
+        """
+        return await self.db.run_sync(lambda _: self.users.remove(id))
+
+    async def authenticate(self, email: str, password: str) -> UserModel | None:
+        """Authenticate a user.
+
+        Args:
+            email: User email.
+            password: User password.
+
+        Returns:
+            The authenticated user or None if authentication fails.
+
+        Raises:
+            PasswordHashingBusyError: If the password hashing pool is full.
+        """
+        user = await self.get_by_email(email=email)
+        if not user:
+            return None
+        if not await verify_password_async(password, str(user.hashed_password)):
+            return None
+        return user
+
+    def is_active(self, user: UserModel) -> bool:
+        """Check if a user is active.
+
+        Args:
+            user: User to check.
+
+        Returns:
+            True if the user is active, False otherwise.
+        """
+        return self.users.is_active(user)
+
+    def is_superuser(self, user: UserModel) -> bool:
+        """Check if a user is a superuser.
+
+        Args:
+            user: User to check.
+
+        Returns:
+            True if the user is a superuser, False otherwise.
+        """
+        return self.users.is_superuser(user)
@@ -0,0 +1,198 @@
+"""Benchmark the file listing endpoint with sync and asyncio database sessions.
+
+Serves the same listing query from a sync route (run in Starlette's threadpool
+with a sync session, as the API used to) and from an async route using the
+asyncio engine, then fires concurrent requests at each and reports requests per
+second and latency percentiles. Requests go through an in-process ASGI
+transport, so only the application and the database are measured.
+
+Run it against a migrated database, ideally the Postgres instance from
+docker-compose, since the difference shows when queries wait on the network:
+
+    python scripts/benchmark_db.py --concurrency 200 --requests 5000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Allow running the script from the repository root without installing the package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# The file service needs an S3 client, which is never called here
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "benchmark")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.db.relations import setup_relationships
+from app.db.session import get_async_database_uri
+from app.models.user import User as UserModel
+from app.schemas.file import File, FileCreate
+from app.services.file_service import AsyncFileService, FileService
+
+BENCHMARK_EMAIL = "db-benchmark@example.com"
+
+
+def seed(db: Session, files: int) -> str:
+    """Create the benchmark user and their files, if not done already.
+
+    Args:
+        db: Database session.
+        files: Number of files the user should own.
+
+    Returns:
+        The benchmark user's ID.
+    """
+    user = db.query(UserModel).filter(UserModel.email == BENCHMARK_EMAIL).first()
+    if not user:
+        user = UserModel(
+            id=str(uuid.uuid4()),
+            email=BENCHMARK_EMAIL,
+            hashed_password="not-a-real-hash",  # noqa: S106
+            full_name="Benchmark User",
+        )
+        db.add(user)
+        db.commit()
+
+    file_service = FileService(db)
+    missing = files - len(file_service.get_multi_by_owner(user.id, limit=files))
+    file_info = FileCreate(
+        filename="benchmark.bin", content_type="application/octet-stream", size_bytes=1
+    )
+    file_service.create_multi(
+        [
+            file_service._new_file_values(file_info, user.id)  # noqa: SLF001
+            for _ in range(missing)
+        ]
+    )
+    return str(user.id)
+
+
+def build_app(
+    sync_sessions: sessionmaker, async_sessions: async_sessionmaker
+) -> FastAPI:
+    """Build an app serving the file listing from a sync and an async route.
+
+    Args:
+        sync_sessions: Factory for sync database sessions.
+        async_sessions: Factory for asyncio database sessions.
+
+    Returns:
+        The application.
+    """
+    app = FastAPI()
+
+    @app.get("/sync/files")
+    def list_files_sync(owner_id: str, limit: int = 100) -> list[File]:
+        with sync_sessions() as db:
+            files = FileService(db).get_multi_by_owner(owner_id, limit=limit)
+            return [File.model_validate(file) for file in files]
+
+    @app.get("/async/files")
+    async def list_files_async(owner_id: str, limit: int = 100) -> list[File]:
+        async with async_sessions() as db:
+            files = await AsyncFileService(db).get_multi_by_owner(owner_id, limit=limit)
+            return [File.model_validate(file) for file in files]
+
+    return app
+
+
+async def run_load(
+    client: httpx.AsyncClient, url: str, concurrency: int, requests: int
+) -> tuple[float, list[float]]:
+    """Send requests to a URL from many concurrent workers.
+
+    Args:
+        client: HTTP client bound to the application.
+        url: URL to request.
+        concurrency: Number of requests in flight at once.
+        requests: Total number of requests.
+
+    Returns:
+        Requests per second and the latency of every request in seconds.
+    """
+    latencies: list[float] = []
+    remaining = iter(range(requests))
+
+    async def worker() -> None:
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await client.get(url)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return requests / (time.perf_counter() - start), latencies
+
+
+async def benchmark(args: argparse.Namespace) -> None:
+    """Run the benchmark and print a comparison table.
+
+    Args:
+        args: Command line arguments.
+    """
+    engine = create_engine(args.database_url, pool_size=10, max_overflow=20)
+    async_engine = create_async_engine(
+        get_async_database_uri(args.database_url), pool_size=10, max_overflow=20
+    )
+    sync_sessions = sessionmaker(autoflush=False, bind=engine)
+    async_sessions = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+
+    with sync_sessions() as db:
+        owner_id = seed(db, args.files)
+
+    transport = httpx.ASGITransport(app=build_app(sync_sessions, async_sessions))
+    print(
+        f"{args.requests} requests, {args.concurrency} concurrent, "
+        f"{args.files} files per page\n"
+    )
+    print(f"{'route':<8}{'requests/s':>12}{'p50 ms':>10}{'p99 ms':>10}")
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://benchmark"
+    ) as client:
+        for name in ("sync", "async"):
+            url = f"/{name}/files?owner_id={owner_id}&limit={args.files}"
+            # Warm up the connection pools before timing
+            await run_load(client, url, args.concurrency, args.concurrency)
+            rate, latencies = await run_load(
+                client, url, args.concurrency, args.requests
+            )
+            percentiles = statistics.quantiles(latencies, n=100)
+            print(
+                f"{name:<8}{rate:>12,.0f}"
+                f"{percentiles[49] * 1000:>10.1f}{percentiles[98] * 1000:>10.1f}"
+            )
+
+    await async_engine.dispose()
+    engine.dispose()
+
+
+def main() -> None:
+    """Parse the command line and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=str(settings.SQLALCHEMY_DATABASE_URI))
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--files", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_relationships()
+    asyncio.run(benchmark(args))
+
+
+if __name__ == "__main__":
+    main()
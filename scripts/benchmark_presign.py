@@ -0,0 +1,142 @@
+"""Benchmark presigned upload/download URL throughput.
+
+Compares building a new S3 client for every request (the old FileService
+behaviour), reusing the process-wide shared client, and signing with the
+in-process SigV4 presigner that FileService now uses.
+
+Presigning is done locally, so no AWS account or network access is needed:
+
+    python scripts/benchmark_presign.py --iterations 2000
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+# Allow running the script from the repository root without installing the package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Presigning only needs some credentials to sign with, never a real account
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "benchmark")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+
+from app.core.config import settings
+from app.core.s3 import build_s3_client, get_s3_client, get_s3_presigner
+
+KEY = "00000000-0000-0000-0000-000000000000/11111111-1111-1111-1111-111111111111/report.pdf"
+
+
+def presign_upload(client_factory: Callable) -> str:
+    """Generate one presigned upload URL.
+
+    Args:
+        client_factory: Callable returning the S3 client to sign with.
+
+    Returns:
+        The presigned URL.
+    """
+    return client_factory().generate_presigned_url(
+        "put_object",
+        Params={
+            "Bucket": settings.S3_BUCKET_NAME,
+            "Key": KEY,
+            "ContentType": "application/pdf",
+        },
+        ExpiresIn=settings.PRESIGNED_URL_EXPIRY,
+    )
+
+
+def presign_download(client_factory: Callable) -> str:
+    """Generate one presigned download URL.
+
+    Args:
+        client_factory: Callable returning the S3 client to sign with.
+
+    Returns:
+        The presigned URL.
+    """
+    return client_factory().generate_presigned_url(
+        "get_object",
+        Params={"Bucket": settings.S3_BUCKET_NAME, "Key": KEY},
+        ExpiresIn=settings.PRESIGNED_URL_EXPIRY,
+    )
+
+
+def measure(func: Callable[[], str], iterations: int) -> float:
+    """Measure how many calls per second a function sustains.
+
+    Args:
+        func: The function to call.
+        iterations: Number of calls to time.
+
+    Returns:
+        Calls per second.
+    """
+    # Warm up once so one-off imports don't skew the numbers
+    func()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return iterations / (time.perf_counter() - start)
+
+
+def presigner_upload() -> str:
+    """Generate one presigned upload URL with the shared presigner.
+
+    Returns:
+        The presigned URL.
+    """
+    return get_s3_presigner().generate_presigned_url(
+        "PUT",
+        KEY,
+        expires_in=settings.PRESIGNED_URL_EXPIRY,
+        headers={"Content-Type": "application/pdf"},
+    )
+
+
+def presigner_download() -> str:
+    """Generate one presigned download URL with the shared presigner.
+
+    Returns:
+        The presigned URL.
+    """
+    return get_s3_presigner().generate_presigned_url(
+        "GET", KEY, expires_in=settings.PRESIGNED_URL_EXPIRY
+    )
+
+
+def main() -> None:
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=1000)
+    args = parser.parse_args()
+
+    # Building clients is slow, so time fewer iterations for that strategy
+    per_request_iterations = max(args.iterations // 10, 1)
+
+    strategies: dict[str, tuple[Callable[[], str], Callable[[], str], int]] = {
+        "client per request": (
+            lambda: presign_upload(build_s3_client),
+            lambda: presign_download(build_s3_client),
+            per_request_iterations,
+        ),
+        "shared client": (
+            lambda: presign_upload(get_s3_client),
+            lambda: presign_download(get_s3_client),
+            args.iterations,
+        ),
+        "shared presigner": (presigner_upload, presigner_download, args.iterations),
+    }
+
+    print(f"{'strategy':<24}{'upload URLs/s':>16}{'download URLs/s':>18}")
+    for name, (upload, download, iterations) in strategies.items():
+        upload_rate = measure(upload, iterations)
+        download_rate = measure(download, iterations)
+        print(f"{name:<24}{upload_rate:>16,.0f}{download_rate:>18,.0f}")
+
+
+if __name__ == "__main__":
+    main()
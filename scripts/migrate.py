@@ -0,0 +1,30 @@
+"""Apply pending database migrations, as a deploy step before the API restarts.
+
+Migrations that rewrite large tables can take a while, so deployments with
+RUN_MIGRATIONS_ON_STARTUP=false run this once instead of having every API
+process migrate as it starts:
+
+    python scripts/migrate.py
+
+It holds the same lock as migrations run on startup, so it is safe to run
+while API processes are starting.
+"""
+
+import logging
+import sys
+from pathlib import Path
+
+# Allow running the script from the repository root without installing the package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.db.init_db import run_migrations
+
+
+def main() -> None:
+    """Apply the pending migrations."""
+    logging.basicConfig(level=logging.INFO)
+    run_migrations()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Rebuild every user's storage usage counters from their files.
+
+The counters are kept up to date as files change, so this is only needed to
+repair them, e.g. after restoring or editing the file table by hand. Files
+changed while it runs can be miscounted, so run it when the API is quiet:
+
+    python scripts/recompute_usage.py --database-url postgresql://...
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Allow running the script from the repository root without installing the package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.relations import setup_relationships
+from app.services.usage_service import UsageService
+
+
+def main() -> None:
+    """Parse the command line and rebuild the counters."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=str(settings.SQLALCHEMY_DATABASE_URI))
+    args = parser.parse_args()
+
+    setup_relationships()
+    engine = create_engine(args.database_url)
+    with sessionmaker(bind=engine)() as db:
+        users = UsageService(db).recompute()
+    engine.dispose()
+    print(f"Rebuilt the storage usage of {users} users")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,180 @@
-"""Pytest configuration for integration tests.
+"""Pytest configuration for unit and integration tests.
 
-This file contains fixtures used by the integration tests.
+This file contains fixtures used by the unit tests (a temporary SQLite database,
+a test user and an API client) and by the integration tests (Docker Compose).
 """
 # ruff: noqa: PT004, PTH100, PTH120, RUF005, S603, S607, S608, S609, UP022
 import os
 import subprocess
 import time
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
+from pathlib import Path
 
 import pytest
 import requests
+from botocore.client import BaseClient
+from fastapi.testclient import TestClient
+from moto import mock_aws
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.core.s3 import get_s3_client, reset_s3_client
+from app.db.base import Base
+from app.db.relations import setup_relationships
+from app.db.session import get_async_database_uri
+from app.models.user import User as UserModel
+
+# Fake AWS credentials so presigning works and no test can reach a real account
+os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"  # noqa: S105
+os.environ.pop("AWS_SESSION_TOKEN", None)
+
+# Relationships are normally set up at application startup
+setup_relationships()
+
+
+@pytest.fixture
+def engine(tmp_path: Path) -> Generator[Engine, None, None]:
+    """Create a temporary SQLite database with all tables.
+
+    The database is a file so the sync and asyncio engines can share it.
+
+    Args:
+        tmp_path: Temporary directory for the database file.
+
+    Yields:
+        The database engine.
+    """
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def async_engine(engine: Engine) -> AsyncEngine:
+    """Create an asyncio engine for the temporary SQLite database.
+
+    Connections aren't pooled: each request of the test client runs in its own
+    event loop, and aiosqlite connections can't move between loops.
+
+    Args:
+        engine: The sync database engine.
+
+    Returns:
+        The asyncio database engine.
+    """
+    return create_async_engine(
+        get_async_database_uri(str(engine.url)), poolclass=NullPool
+    )
+
+
+@pytest.fixture
+def db(engine: Engine) -> Generator[Session, None, None]:
+    """Create a session bound to the in-memory database.
+
+    Args:
+        engine: The database engine.
+
+    Yields:
+        A SQLAlchemy session.
+    """
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def user(db: Session) -> UserModel:
+    """Create a regular user.
+
+    Args:
+        db: Database session.
+
+    Returns:
+        The created user.
+    """
+    user = UserModel(
+        id="00000000-0000-4000-8000-000000000001",
+        email="user@example.com",
+        hashed_password="not-a-real-hash",  # noqa: S106
+        full_name="Test User",
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+@pytest.fixture
+def s3() -> Generator[BaseClient, None, None]:
+    """Mock S3 with moto and create the configured bucket.
+
+    The shared S3 client and presigner are rebuilt inside the mock.
+
+    Yields:
+        The shared S3 client.
+    """
+    with mock_aws():
+        reset_s3_client()
+        s3_client = get_s3_client()
+        s3_client.create_bucket(
+            Bucket=settings.S3_BUCKET_NAME,
+            CreateBucketConfiguration={"LocationConstraint": settings.AWS_REGION},
+        )
+        try:
+            yield s3_client
+        finally:
+            reset_s3_client()
+
+
+@pytest.fixture
+def client(
+    db: Session, async_engine: AsyncEngine, user: UserModel
+) -> Generator[TestClient, None, None]:
+    """Create an API client authenticated as the test user.
+
+    Args:
+        db: Database session used by sync routes.
+        async_engine: Asyncio engine the async routes get their sessions from.
+        user: The user every request is authenticated as.
+
+    Yields:
+        A FastAPI test client.
+    """
+    from app.db.session import get_async_db, get_db
+    from app.dependencies.auth import get_current_user
+    from app.main import app
+
+    session_factory = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+
+    async def get_test_async_db() -> AsyncGenerator[AsyncSession, None]:
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_async_db] = get_test_async_db
+    app.dependency_overrides[get_current_user] = lambda: user
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
 
 
 def wait_for_api(
@@ -0,0 +1,99 @@
+"""Tests for downloading files as a streamed ZIP archive."""
+
+import io
+import uuid
+import zipfile
+
+from botocore.client import BaseClient
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.file import File as FileModel
+from app.services.archive import archive_names
+
+
+def create_uploaded_file(
+    client: TestClient,
+    s3: BaseClient,
+    db: Session,
+    *,
+    filename: str,
+    content_type: str,
+    content: bytes,
+) -> str:
+    """Create a file and complete its upload.
+
+    Args:
+        client: The API client.
+        s3: Mocked S3 client.
+        db: Database session.
+        filename: Name of the file.
+        content_type: MIME type of the file.
+        content: The file's content.
+
+    Returns:
+        The file's ID.
+    """
+    response = client.post(
+        "/api/v1/files/upload",
+        json={
+            "filename": filename,
+            "content_type": content_type,
+            "size_bytes": len(content),
+        },
+    )
+    file_id = response.json()["file_id"]
+    s3_key = db.get(FileModel, file_id).s3_key
+    s3.put_object(Bucket=settings.S3_BUCKET_NAME, Key=s3_key, Body=content)
+    client.post(f"/api/v1/files/{file_id}/complete")
+    return file_id
+
+
+def test_archive_streams_selected_files(
+    client: TestClient, s3: BaseClient, db: Session
+) -> None:
+    """Files are archived in order, compressing only what isn't compressed yet."""
+    text = b"some text " * 1000
+    image = bytes(range(256)) * 10
+    first = create_uploaded_file(
+        client, s3, db, filename="notes.txt", content_type="text/plain", content=text
+    )
+    second = create_uploaded_file(
+        client, s3, db, filename="pic.png", content_type="image/png", content=image
+    )
+    third = create_uploaded_file(
+        client, s3, db, filename="notes.txt", content_type="text/plain", content=b"more"
+    )
+
+    response = client.get(
+        "/api/v1/files/archive", params={"ids": [third, second, first]}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        entries = {info.filename: info for info in archive.infolist()}
+        assert list(entries) == ["notes.txt", "pic.png", "notes (1).txt"]
+        assert archive.read("notes (1).txt") == text
+        assert archive.read("pic.png") == image
+        assert entries["pic.png"].compress_type == zipfile.ZIP_STORED
+        assert entries["notes (1).txt"].compress_type == zipfile.ZIP_DEFLATED
+
+    # Without IDs, all of the user's uploaded files are archived
+    response = client.get("/api/v1/files/archive")
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        assert len(archive.namelist()) == 3
+
+    missing = client.get("/api/v1/files/archive", params={"ids": [str(uuid.uuid4())]})
+    assert missing.status_code == 404
+
+
+def test_archive_names_stay_inside_the_archive() -> None:
+    """Paths in filenames are dropped and repeated names are numbered."""
+    assert archive_names(["../../etc/passwd", "a.txt", "dir\\a.txt", ""]) == [
+        "passwd",
+        "a.txt",
+        "a (1).txt",
+        "file",
+    ]
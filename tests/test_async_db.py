@@ -0,0 +1,46 @@
+"""Tests for the asyncio database layer."""
+
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.db.session import get_async_database_uri
+from app.schemas.user import UserCreate, UserUpdate
+from app.services.user_service import AsyncUserService
+
+
+@pytest.mark.parametrize(
+    ("uri", "expected"),
+    [
+        ("postgresql://u:p@db:5432/app", "postgresql+asyncpg://u:p@db:5432/app"),
+        (
+            "postgresql+psycopg2://u:p@db:5432/app",
+            "postgresql+asyncpg://u:p@db:5432/app",
+        ),
+        ("sqlite:///./app.db", "sqlite+aiosqlite:///./app.db"),
+        ("postgresql+asyncpg://db/app", "postgresql+asyncpg://db/app"),
+    ],
+)
+def test_async_database_uri(uri: str, expected: str) -> None:
+    """Sync driver URLs are switched to the matching asyncio driver."""
+    assert get_async_database_uri(uri) == expected
+
+
+def test_async_user_service_round_trip(async_engine: AsyncEngine) -> None:
+    """Users can be created, updated and authenticated on an asyncio session."""
+    email, old_password, new_password = "async@example.com", "first-pw", "second-pw"
+
+    async def scenario() -> None:
+        async with AsyncSession(async_engine, expire_on_commit=False) as db:
+            user_service = AsyncUserService(db)
+            user = await user_service.create(
+                UserCreate(email=email, password=old_password)
+            )
+            await user_service.update(user, UserUpdate(password=new_password))
+
+            assert await user_service.get(user.id) is user
+            assert await user_service.authenticate(email, old_password) is None
+            assert await user_service.authenticate(email, new_password) is user
+
+    asyncio.run(scenario())
@@ -0,0 +1,162 @@
+"""Tests for the TTL cache and the authenticated user cache."""
+
+import time
+from collections.abc import Callable, Generator
+from datetime import timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from jose.exceptions import ExpiredSignatureError
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.security import (
+    TokenRevokedError,
+    create_access_token,
+    decode_access_token,
+    revoke_access_token,
+    token_cache,
+)
+from app.dependencies.auth import get_current_user
+from app.models.user import User as UserModel
+from app.services.user_service import UserService, user_cache
+
+
+class FakeClock:
+    """A clock that only moves when told to."""
+
+    def __init__(self) -> None:
+        """Start the clock at zero."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Get the current time.
+
+        Returns:
+            The current time in seconds.
+        """
+        return self.now
+
+
+def test_entries_expire_after_ttl() -> None:
+    """Entries are returned until their TTL passes."""
+    clock = FakeClock()
+    cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl=30, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=5)
+
+    clock.now = 10
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+
+    clock.now = 30
+    assert cache.get("a") is None
+    assert cache.stats() == {"hits": 1, "misses": 2, "size": 0, "maxsize": 10}
+
+
+def test_least_recently_used_entry_is_evicted() -> None:
+    """A full cache evicts the entry that was used longest ago."""
+    cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=30)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+@pytest.fixture
+def auth_client(client: TestClient) -> Generator[TestClient, None, None]:
+    """Create an API client that authenticates with real tokens.
+
+    Args:
+        client: API client with authentication overridden.
+
+    Yields:
+        The API client, with empty user and token caches.
+    """
+    client.app.dependency_overrides.pop(get_current_user)
+    user_cache.clear()
+    token_cache.clear()
+    yield client
+    user_cache.clear()
+    token_cache.clear()
+
+
+def test_authenticated_requests_use_the_user_cache(
+    auth_client: TestClient, db: Session, user: UserModel
+) -> None:
+    """The user is loaded once, then served from the cache until it changes."""
+    headers = {"Authorization": f"Bearer {create_access_token(subject=user.id)}"}
+    url = f"{settings.API_V1_STR}/users/me"
+
+    assert auth_client.get(url, headers=headers).json()["full_name"] == "Test User"
+    assert auth_client.get(url, headers=headers).status_code == 200
+    assert user_cache.stats()["misses"] == 1
+    assert user_cache.stats()["hits"] == 1
+
+    UserService(db).update(user, {"full_name": "Renamed"})
+
+    assert auth_client.get(url, headers=headers).json()["full_name"] == "Renamed"
+    assert user_cache.stats()["misses"] == 2
+    assert auth_client.get("/health/metrics").json()["user_cache"]["hits"] == 1
+
+
+def test_verified_tokens_are_cached_until_revoked(
+    auth_client: TestClient, user: UserModel
+) -> None:
+    """A token is verified once, then served from the cache until revoked."""
+    token = create_access_token(subject=user.id)
+    headers = {"Authorization": f"Bearer {token}"}
+    url = f"{settings.API_V1_STR}/users/me"
+
+    assert auth_client.get(url, headers=headers).status_code == 200
+    assert auth_client.get(url, headers=headers).status_code == 200
+    assert token_cache.stats()["misses"] == 1
+    assert token_cache.stats()["hits"] == 1
+
+    revoke_access_token(token)
+    assert auth_client.get(url, headers=headers).status_code == 401
+    with pytest.raises(TokenRevokedError):
+        decode_access_token(token)
+    assert token_cache.stats()["size"] == 0
+
+
+def test_expired_tokens_are_not_cached() -> None:
+    """Expired tokens are rejected and leave no cache entry."""
+    token_cache.clear()
+    token = create_access_token(subject="someone", expires_delta=timedelta(-1))
+
+    with pytest.raises(ExpiredSignatureError):
+        decode_access_token(token)
+    assert token_cache.stats()["size"] == 0
+
+
+@pytest.mark.benchmark
+def test_token_verification_cost_per_request(
+    record_property: Callable[[str, object], None],
+) -> None:
+    """Cached tokens skip most of the per-request cost of verifying them."""
+    token = create_access_token(subject="someone")
+    requests = 1000
+
+    def per_request(*, cached: bool) -> float:
+        token_cache.clear()
+        decode_access_token(token)
+        start = time.perf_counter()
+        for _ in range(requests):
+            if not cached:
+                token_cache.clear()
+            decode_access_token(token)
+        return (time.perf_counter() - start) / requests
+
+    uncached = per_request(cached=False)
+    cached = per_request(cached=True)
+    token_cache.clear()
+    record_property("uncached_us", round(uncached * 1e6, 1))
+    record_property("cached_us", round(cached * 1e6, 1))
+    # Usually 30-50 times cheaper; the margin keeps busy CI runners green
+    assert cached * 5 < uncached
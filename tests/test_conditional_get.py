@@ -0,0 +1,90 @@
+"""Tests for ETags and conditional GETs of file metadata and listings."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.etag import etag_matches
+from app.models.file import File as FileModel
+from app.services.file_service import FileService
+
+FILES_URL = "/api/v1/files"
+
+
+def create_file(client: TestClient, filename: str = "a.txt") -> str:
+    """Create a file for the test user.
+
+    Args:
+        client: The API client.
+        filename: The file's name.
+
+    Returns:
+        The file's ID.
+    """
+    response = client.post(
+        f"{FILES_URL}/upload",
+        json={"filename": filename, "content_type": "text/plain", "size_bytes": 1},
+    )
+    assert response.status_code == 200
+    return response.json()["file_id"]
+
+
+def test_etag_matching_is_weak() -> None:
+    """Weak and strong forms of the same ETag match, as does a wildcard."""
+    assert etag_matches('"abc"', 'W/"abc"')
+    assert etag_matches('W/"x", W/"abc"', 'W/"abc"')
+    assert etag_matches("*", 'W/"abc"')
+    assert not etag_matches('W/"x"', 'W/"abc"')
+    assert not etag_matches(None, 'W/"abc"')
+
+
+def test_file_is_not_modified_until_updated(client: TestClient, db: Session) -> None:
+    """A file's ETag holds until it changes."""
+    file_id = create_file(client)
+    response = client.get(f"{FILES_URL}/{file_id}")
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    response = client.get(f"{FILES_URL}/{file_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+    # SQLite stores whole seconds, so make sure the update moves updated_at
+    db.get(FileModel, file_id).updated_at = datetime.utcnow() - timedelta(hours=1)
+    db.commit()
+    client.put(f"{FILES_URL}/{file_id}", json={"description": "changed"})
+    response = client.get(f"{FILES_URL}/{file_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_listing_is_not_modified_until_a_file_changes(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A listing's ETag changes with any file change, and with the query."""
+    file_id = create_file(client)
+    etag = client.get(FILES_URL).headers["ETag"]
+    assert client.get(FILES_URL, params={"limit": 5}).headers["ETag"] != etag
+
+    def fail(*args: object, **kwargs: object) -> None:
+        raise AssertionError("Files were listed")
+
+    with monkeypatch.context() as patch:
+        # Answered from the version alone
+        patch.setattr(FileService, "get_multi_by_owner", fail)
+        response = client.get(FILES_URL, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    client.put(f"{FILES_URL}/{file_id}", json={"is_public": True})
+    response = client.get(FILES_URL, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    renamed = response.headers["ETag"]
+    assert renamed != etag
+
+    create_file(client, "b.txt")
+    response = client.get(FILES_URL, headers={"If-None-Match": renamed})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
@@ -0,0 +1,71 @@
+"""Tests for streaming file content through the API with byte ranges."""
+
+from botocore.client import BaseClient
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.file import File as FileModel
+
+CONTENT = bytes(range(100))
+
+
+def create_uploaded_file(client: TestClient, s3: BaseClient, db: Session) -> dict:
+    """Create a file and complete its upload with CONTENT.
+
+    Args:
+        client: The API client.
+        s3: Mocked S3 client.
+        db: Database session.
+
+    Returns:
+        The file.
+    """
+    response = client.post(
+        "/api/v1/files/upload",
+        json={
+            "filename": "data file.bin",
+            "content_type": "application/octet-stream",
+            "size_bytes": len(CONTENT),
+        },
+    )
+    file_id = response.json()["file_id"]
+    s3_key = db.get(FileModel, file_id).s3_key
+    s3.put_object(Bucket=settings.S3_BUCKET_NAME, Key=s3_key, Body=CONTENT)
+    return client.post(f"/api/v1/files/{file_id}/complete").json()
+
+
+def test_download_whole_content(
+    client: TestClient, s3: BaseClient, db: Session
+) -> None:
+    """The whole content is streamed with its ETag."""
+    file = create_uploaded_file(client, s3, db)
+
+    response = client.get(f"/api/v1/files/{file['id']}/content")
+
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["ETag"] == f'"{file["etag"]}"'
+    assert response.headers["Accept-Ranges"] == "bytes"
+    assert "data%20file.bin" in response.headers["Content-Disposition"]
+
+
+def test_download_byte_ranges(client: TestClient, s3: BaseClient, db: Session) -> None:
+    """A single range is served as partial content while the ETag matches."""
+    file = create_uploaded_file(client, s3, db)
+    url = f"/api/v1/files/{file['id']}/content"
+    etag = f'"{file["etag"]}"'
+
+    response = client.get(url, headers={"Range": "bytes=10-19", "If-Range": etag})
+    assert response.status_code == 206
+    assert response.content == CONTENT[10:20]
+    assert response.headers["Content-Range"] == "bytes 10-19/100"
+
+    # A stale validator gets the whole current content
+    response = client.get(url, headers={"Range": "bytes=10-19", "If-Range": '"old"'})
+    assert response.status_code == 200
+    assert response.content == CONTENT
+
+    response = client.get(url, headers={"Range": "bytes=200-"})
+    assert response.status_code == 416
+    assert response.headers["Content-Range"] == "bytes */100"
@@ -0,0 +1,159 @@
+"""Tests for streaming file content through the API."""
+
+import hashlib
+from collections.abc import AsyncIterable, Iterator
+from datetime import datetime, timedelta
+
+import pytest
+from botocore.client import BaseClient
+from fastapi.testclient import TestClient
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.models.file import File as FileModel
+from app.services.file_service import AsyncFileService, content_upload_max_size
+from app.services.upload_reconciler import UploadReconciler
+
+MIB = 1024 * 1024
+
+
+def create_file(client: TestClient, size_bytes: int, sha256: str | None = None) -> str:
+    """Request an upload of a file.
+
+    Args:
+        client: The API client.
+        size_bytes: The declared size of the file.
+        sha256: The declared SHA-256 of the file.
+
+    Returns:
+        The file's ID.
+    """
+    response = client.post(
+        "/api/v1/files/upload",
+        json={
+            "filename": "a.bin",
+            "content_type": "application/octet-stream",
+            "size_bytes": size_bytes,
+            "sha256": sha256,
+        },
+    )
+    assert response.status_code == 200
+    return response.json()["file_id"]
+
+
+def chunks(content: bytes, chunk_size: int = MIB) -> Iterator[bytes]:
+    """Split content into chunks, to send it as a streamed request body.
+
+    Args:
+        content: The content.
+        chunk_size: Size of each chunk.
+
+    Yields:
+        The chunks.
+    """
+    for start in range(0, len(content), chunk_size):
+        yield content[start : start + chunk_size]
+
+
+def test_large_content_is_streamed_in_parts(client: TestClient, s3: BaseClient) -> None:
+    """Content over one part size is sent as a multipart upload."""
+    content = bytes(range(256)) * (12 * MIB // 256)
+    file_id = create_file(client, size_bytes=len(content))
+
+    response = client.put(f"/api/v1/files/{file_id}/content", content=chunks(content))
+
+    assert response.status_code == 200
+    file = response.json()
+    assert file["status"] == "complete"
+    assert file["size_bytes"] == len(content)
+    assert file["sha256"] == hashlib.sha256(content).hexdigest()
+    # Multipart ETags end with the number of parts
+    assert file["etag"].endswith("-2")
+    body = s3.get_object(Bucket=settings.S3_BUCKET_NAME, Key=file["s3_key"])["Body"]
+    assert body.read() == content
+    # The content can't be uploaded twice
+    response = client.put(f"/api/v1/files/{file_id}/content", content=b"again")
+    assert response.status_code == 400
+
+
+def test_small_content_is_checked_against_the_declared_hash(
+    client: TestClient, s3: BaseClient
+) -> None:
+    """Content that doesn't match the declared SHA-256 is rejected."""
+    content = b"hello"
+    sha256 = hashlib.sha256(content).hexdigest()
+    file_id = create_file(client, size_bytes=len(content), sha256=sha256)
+
+    response = client.put(f"/api/v1/files/{file_id}/content", content=b"HELLO")
+    assert response.status_code == 400
+    assert client.get(f"/api/v1/files/{file_id}").json()["status"] == "pending"
+
+    response = client.put(f"/api/v1/files/{file_id}/content", content=content)
+    assert response.status_code == 200
+    assert response.json()["etag"] == hashlib.md5(content).hexdigest()  # noqa: S324
+
+
+def test_uploads_too_large_for_the_api_are_rejected(
+    client: TestClient, s3: BaseClient
+) -> None:
+    """Files declared larger than the API streams are sent to presigned URLs."""
+    file_id = create_file(client, size_bytes=content_upload_max_size() + 1)
+
+    response = client.put(f"/api/v1/files/{file_id}/content", content=b"x")
+    assert response.status_code == 413
+    assert client.get(f"/api/v1/files/{file_id}").json()["status"] == "pending"
+
+
+def test_body_is_read_outside_a_transaction(
+    client: TestClient, s3: BaseClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """No database connection is held while the client sends the content."""
+    upload_content = AsyncFileService.upload_content
+    in_transaction: list[bool] = []
+
+    async def check(
+        self: AsyncFileService, file_obj: FileModel, chunks: AsyncIterable[bytes]
+    ) -> FileModel:
+        in_transaction.append(self.db.in_transaction())
+        return await upload_content(self, file_obj, chunks)
+
+    monkeypatch.setattr(AsyncFileService, "upload_content", check)
+    file_id = create_file(client, size_bytes=5)
+
+    response = client.put(f"/api/v1/files/{file_id}/content", content=b"hello")
+    assert response.status_code == 200
+    assert in_transaction == [False]
+
+
+def test_reconciler_leaves_streaming_content_alone(
+    client: TestClient, s3: BaseClient, db: Session, engine: Engine
+) -> None:
+    """Files are only settled by the reconciler once their stream is stale."""
+    file_id, abandoned = create_file(client, size_bytes=5), create_file(client, 5)
+    long_ago = datetime.utcnow() - timedelta(days=1)
+    db.get(FileModel, file_id).created_at = long_ago
+    # As left by a process that died while streaming the content
+    db.get(FileModel, abandoned).status = "uploading"
+    db.get(FileModel, abandoned).created_at = long_ago
+    db.get(FileModel, abandoned).updated_at = long_ago
+    db.commit()
+    reconciler = UploadReconciler(
+        session_factory=sessionmaker(bind=engine), s3_client=s3
+    )
+    statuses: list[str] = []
+
+    def body() -> Iterator[bytes]:
+        yield b"hel"
+        # The object isn't in S3 yet, which would fail a pending file
+        assert reconciler.run_once() == {"checked": 1, "complete": 0, "failed": 1}
+        statuses.append(client.get(f"/api/v1/files/{file_id}").json()["status"])
+        yield b"lo"
+
+    response = client.put(f"/api/v1/files/{file_id}/content", content=body())
+
+    assert response.status_code == 200
+    assert statuses == ["uploading"]
+    assert client.get(f"/api/v1/files/{abandoned}").json()["status"] == "failed"
+    usage = client.get("/api/v1/users/me/usage").json()
+    assert (usage["file_count"], usage["total_bytes"]) == (1, 5)
@@ -0,0 +1,80 @@
+"""Tests for deduplicating uploads by SHA-256."""
+
+import hashlib
+from urllib.parse import parse_qs, urlsplit
+
+from botocore.client import BaseClient
+from fastapi.testclient import TestClient
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.models.blob import Blob
+from app.models.file import File as FileModel
+from app.models.s3_deletion import S3Deletion
+from app.services.s3_deletion_worker import S3DeletionWorker
+
+CONTENT = b"the same artifact"
+SHA256 = hashlib.sha256(CONTENT).hexdigest()
+
+
+def request_upload(client: TestClient) -> dict:
+    """Request an upload of CONTENT with its SHA-256.
+
+    Args:
+        client: The API client.
+
+    Returns:
+        The upload response.
+    """
+    response = client.post(
+        "/api/v1/files/upload",
+        json={
+            "filename": "artifact.bin",
+            "content_type": "application/octet-stream",
+            "size_bytes": len(CONTENT),
+            "sha256": SHA256,
+        },
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_duplicate_upload_shares_the_object(
+    client: TestClient, s3: BaseClient, db: Session, engine: Engine
+) -> None:
+    """Known content isn't uploaded again, and is deleted with its last file."""
+    first = request_upload(client)
+    # S3 checks the uploaded content against the hash
+    query = parse_qs(urlsplit(first["upload_url"]).query)
+    assert "x-amz-checksum-sha256" in query["X-Amz-SignedHeaders"][0]
+    s3_key = db.get(FileModel, first["file_id"]).s3_key
+    s3.put_object(Bucket=settings.S3_BUCKET_NAME, Key=s3_key, Body=CONTENT)
+
+    # Not deduplicated until the first upload is complete
+    pending = request_upload(client)
+    assert pending["upload_url"] is not None
+    client.delete(f"/api/v1/files/{pending['file_id']}")
+    client.post(f"/api/v1/files/{first['file_id']}/complete")
+
+    second, third = request_upload(client), request_upload(client)
+    assert second["upload_url"] is None
+    file = client.get(f"/api/v1/files/{second['file_id']}").json()
+    assert file["status"] == "complete"
+    assert file["s3_key"] == s3_key
+    assert db.get(Blob, s3_key).ref_count == 3
+
+    # The object is only queued for deletion once no file references it
+    worker = S3DeletionWorker(session_factory=sessionmaker(bind=engine), s3_client=s3)
+    client.delete(f"/api/v1/files/{first['file_id']}")
+    client.post("/api/v1/files/delete-batch", json=[second["file_id"]])
+    worker.run_once()
+    assert s3.head_object(Bucket=settings.S3_BUCKET_NAME, Key=s3_key)
+    db.expire_all()
+    assert db.get(Blob, s3_key).ref_count == 1
+
+    client.delete(f"/api/v1/files/{third['file_id']}")
+    assert db.query(S3Deletion).filter(S3Deletion.s3_key == s3_key).count() == 1
+    assert db.get(Blob, s3_key) is None
+    worker.run_once()
+    assert "Contents" not in s3.list_objects_v2(Bucket=settings.S3_BUCKET_NAME)
@@ -0,0 +1,91 @@
+"""Tests for cached, window-aligned presigned download URLs."""
+
+from collections.abc import Generator
+from datetime import datetime, timezone
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from botocore.client import BaseClient
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.services.file_service import download_url_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(s3: BaseClient) -> Generator[None, None, None]:
+    """Start and end every test with an empty download URL cache.
+
+    Args:
+        s3: Mocked S3, which deleting a file talks to.
+
+    Yields:
+        None
+    """
+    download_url_cache.clear()
+    yield
+    download_url_cache.clear()
+
+
+def create_file(client: TestClient) -> str:
+    """Create a file for the test user.
+
+    Args:
+        client: The API client.
+
+    Returns:
+        The file's ID.
+    """
+    response = client.post(
+        "/api/v1/files/upload",
+        json={"filename": "a.txt", "content_type": "text/plain", "size_bytes": 1},
+    )
+    assert response.status_code == 200
+    return response.json()["file_id"]
+
+
+def download_url(client: TestClient, file_id: str) -> str:
+    """Get a download URL for a file.
+
+    Args:
+        client: The API client.
+        file_id: The file's ID.
+
+    Returns:
+        The presigned download URL.
+    """
+    response = client.get(f"/api/v1/files/download/{file_id}")
+    assert response.status_code == 200
+    return response.json()["download_url"]
+
+
+def test_repeated_downloads_share_one_url(client: TestClient) -> None:
+    """The same URL is returned until its window ends, signed at the window start."""
+    file_id = create_file(client)
+
+    url = download_url(client, file_id)
+    assert download_url(client, file_id) == url
+    assert download_url_cache.stats()["hits"] == 1
+
+    query = parse_qs(urlsplit(url).query)
+    signed_at = datetime.strptime(query["X-Amz-Date"][0], "%Y%m%dT%H%M%SZ")
+    timestamp = signed_at.replace(tzinfo=timezone.utc).timestamp()
+    window = settings.PRESIGNED_URL_EXPIRY - settings.DOWNLOAD_URL_MIN_VALIDITY
+    assert timestamp % window == 0
+    expires_at = timestamp + int(query["X-Amz-Expires"][0])
+    remaining = expires_at - datetime.now(timezone.utc).timestamp()
+    assert remaining >= settings.DOWNLOAD_URL_MIN_VALIDITY
+
+
+def test_update_and_delete_evict_the_url(client: TestClient) -> None:
+    """Changing or deleting a file removes its cached URL."""
+    file_id = create_file(client)
+    download_url(client, file_id)
+    assert download_url_cache.stats()["size"] == 1
+
+    client.put(f"/api/v1/files/{file_id}", json={"description": "changed"})
+    assert download_url_cache.stats()["size"] == 0
+
+    download_url(client, file_id)
+    client.delete(f"/api/v1/files/{file_id}")
+    assert download_url_cache.stats()["size"] == 0
@@ -0,0 +1,108 @@
+"""Tests for batch upload URL creation."""
+
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.models.file import File as FileModel
+from app.models.user import User as UserModel
+from app.services.file_service import FileService
+
+
+def make_file_values(index: int, user: UserModel) -> dict:
+    """Build the column values of one new file record.
+
+    Args:
+        index: Number used to make the filename unique.
+        user: Owner of the file.
+
+    Returns:
+        The column values, as create_multi takes them.
+    """
+    file_id = str(uuid.uuid4())
+    filename = f"file-{index}.txt"
+    return {
+        "id": file_id,
+        "filename": filename,
+        "s3_key": f"{user.id}/{file_id}/{filename}",
+        "content_type": "text/plain",
+        "size_bytes": 100 + index,
+        "owner_id": str(user.id),
+    }
+
+
+def make_file_info(index: int, **overrides: object) -> dict:
+    """Build the JSON for one file in a batch request.
+
+    Args:
+        index: Number used to make the filename unique.
+        **overrides: Fields to override.
+
+    Returns:
+        The file information.
+    """
+    return {
+        "filename": f"file-{index}.txt",
+        "content_type": "text/plain",
+        "size_bytes": 100 + index,
+        **overrides,
+    }
+
+
+def test_batch_upload_creates_all_files(
+    client: TestClient, db: Session, user: UserModel
+) -> None:
+    """Every valid item gets a file record and an upload URL."""
+    response = client.post(
+        "/api/v1/files/upload/batch", json=[make_file_info(i) for i in range(50)]
+    )
+
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [item["index"] for item in items] == list(range(50))
+    assert all(item["error"] is None and item["upload_url"] for item in items)
+    assert db.query(FileModel).filter(FileModel.owner_id == user.id).count() == 50
+
+
+def test_batch_upload_reports_item_errors(
+    client: TestClient, db: Session, user: UserModel
+) -> None:
+    """A bad item is reported on its own and the others are still stored."""
+    file_infos = [
+        make_file_info(0),
+        make_file_info(1, filename="x" * 300),
+        make_file_info(2),
+    ]
+
+    response = client.post("/api/v1/files/upload/batch", json=file_infos)
+
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert items[1]["error"] == "filename must be at most 255 characters"
+    assert items[1]["file_id"] is None
+    assert items[0]["file_id"]
+    assert items[2]["file_id"]
+    stored = {f.filename for f in db.query(FileModel).all()}
+    assert stored == {"file-0.txt", "file-2.txt"}
+
+
+def test_create_multi_isolates_failing_rows(db: Session, user: UserModel) -> None:
+    """If the bulk insert fails, only the offending row is rejected."""
+    first = make_file_values(0, user)
+    duplicate = {**make_file_values(1, user), "id": first["id"]}
+    last = make_file_values(2, user)
+
+    errors = FileService(db).create_multi([first, duplicate, last])
+
+    assert errors[0] is None
+    assert errors[1] is not None
+    assert errors[2] is None
+    assert db.query(FileModel).count() == 2
+
+
+def test_batch_upload_rejects_empty_batch(client: TestClient) -> None:
+    """An empty batch is a validation error."""
+    response = client.post("/api/v1/files/upload/batch", json=[])
+
+    assert response.status_code == 422
@@ -0,0 +1,81 @@
+"""Tests for deleting many files in one request."""
+
+import uuid
+
+from botocore.client import BaseClient
+from fastapi.testclient import TestClient
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.models.file import File as FileModel
+from app.models.user import User as UserModel
+from app.services.s3_deletion_worker import S3DeletionWorker
+
+
+def create_file(client: TestClient, s3: BaseClient, db: Session) -> str:
+    """Create a file for the test user and upload its object.
+
+    Args:
+        client: The API client.
+        s3: Mocked S3 client.
+        db: Database session.
+
+    Returns:
+        The file's ID.
+    """
+    response = client.post(
+        "/api/v1/files/upload",
+        json={"filename": "a.txt", "content_type": "text/plain", "size_bytes": 1},
+    )
+    assert response.status_code == 200
+    file_id = response.json()["file_id"]
+    s3_key = db.get(FileModel, file_id).s3_key
+    s3.put_object(Bucket=settings.S3_BUCKET_NAME, Key=s3_key, Body=b"a")
+    return file_id
+
+
+def test_delete_batch_reports_each_file(
+    client: TestClient, s3: BaseClient, db: Session, engine: Engine, user: UserModel
+) -> None:
+    """Owned files are deleted; missing and foreign ones are reported."""
+    first, second, foreign = (create_file(client, s3, db) for _ in range(3))
+    other = UserModel(
+        id=str(uuid.uuid4()),
+        email="other@example.com",
+        hashed_password="not-a-real-hash",  # noqa: S106
+    )
+    db.add(other)
+    db.get(FileModel, foreign).owner_id = other.id
+    db.commit()
+    missing = str(uuid.uuid4())
+
+    response = client.post(
+        "/api/v1/files/delete-batch", json=[first, missing, foreign, second, first]
+    )
+
+    assert response.status_code == 200
+    outcomes = [
+        (item["file_id"], item["deleted"], item["error"])
+        for item in response.json()["items"]
+    ]
+    assert outcomes == [
+        (first, True, None),
+        (missing, False, "File not found"),
+        (foreign, False, "Not enough permissions to delete this file"),
+        (second, True, None),
+        (first, True, None),
+    ]
+    assert client.get(f"/api/v1/files/{first}").status_code == 404
+
+    # The objects are deleted from S3 by the deletion worker
+    worker = S3DeletionWorker(session_factory=sessionmaker(bind=engine), s3_client=s3)
+    assert worker.run_once() == {"deleted": 2, "failed": 0}
+    listed = s3.list_objects_v2(Bucket=settings.S3_BUCKET_NAME)["Contents"]
+    assert [obj["Key"] for obj in listed] == [db.get(FileModel, foreign).s3_key]
+
+
+def test_delete_batch_rejects_empty_request(client: TestClient) -> None:
+    """At least one file ID is required."""
+    response = client.post("/api/v1/files/delete-batch", json=[])
+    assert response.status_code == 422
@@ -0,0 +1,196 @@
+"""Tests for filtering and sorting file listings, and the indexes behind them."""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import Select, event, inspect
+from sqlalchemy.orm import Session
+
+from app.models.user import User as UserModel
+from app.schemas.file import FileListFilter, FileSort
+from app.services.file_service import FileService
+
+FILES_URL = "/api/v1/files"
+
+
+def create_file(client: TestClient, filename: str, content_type: str, size: int) -> str:
+    """Create a file for the test user.
+
+    Args:
+        client: The API client.
+        filename: The file's name.
+        content_type: The file's MIME type.
+        size: The file's size in bytes.
+
+    Returns:
+        The file's ID.
+    """
+    response = client.post(
+        "/api/v1/files/upload",
+        json={"filename": filename, "content_type": content_type, "size_bytes": size},
+    )
+    assert response.status_code == 200
+    return response.json()["file_id"]
+
+
+def list_names(client: TestClient, **params: Any) -> list[str]:
+    """List the test user's files.
+
+    Args:
+        client: The API client.
+        **params: Query string parameters.
+
+    Returns:
+        The names of the listed files, in order.
+    """
+    response = client.get(FILES_URL, params=params)
+    assert response.status_code == 200
+    return [file["filename"] for file in response.json()]
+
+
+def test_filters_and_sort_orders(client: TestClient) -> None:
+    """Filters narrow the listing and every sort order is honored."""
+    photo = create_file(client, "b.png", "image/png", 300)
+    create_file(client, "c.jpg", "image/jpeg", 100)
+    create_file(client, "a.csv", "text/csv", 200)
+    client.put(f"{FILES_URL}/{photo}", json={"is_public": True})
+
+    assert list_names(client, sort="filename") == ["a.csv", "b.png", "c.jpg"]
+    assert list_names(client, sort="-size_bytes") == ["b.png", "a.csv", "c.jpg"]
+    assert list_names(client, sort="-created_at") == ["a.csv", "c.jpg", "b.png"]
+    assert list_names(client, content_type="image/", sort="size_bytes") == [
+        "c.jpg",
+        "b.png",
+    ]
+    assert list_names(client, min_size=150, max_size=250) == ["a.csv"]
+    assert list_names(client, is_public=True) == ["b.png"]
+    later = (datetime.utcnow() + timedelta(minutes=1)).isoformat()
+    assert list_names(client, created_after=later) == []
+    assert list_names(client, updated_before=later, content_type="text/") == ["a.csv"]
+
+    # "_" is a LIKE wildcard, but only matches itself here
+    assert list_names(client, content_type="image_") == []
+    assert client.get(FILES_URL, params={"content_type": "image/%"}).status_code == 422
+
+
+def test_cursor_follows_the_sort_order(client: TestClient) -> None:
+    """Cursors page through any order and only work with the order they're for."""
+    for size in (5, 3, 4, 1, 2):
+        create_file(client, f"f{size}.txt", "text/plain", size)
+
+    names: list[str] = []
+    params: dict[str, Any] = {"sort": "-size_bytes", "limit": 2}
+    while True:
+        response = client.get(FILES_URL, params=params)
+        names += [file["filename"] for file in response.json()]
+        if "X-Next-Cursor" not in response.headers:
+            break
+        params["cursor"] = response.headers["X-Next-Cursor"]
+    assert names == ["f5.txt", "f4.txt", "f3.txt", "f2.txt", "f1.txt"]
+
+    response = client.get(
+        FILES_URL, params={"sort": "filename", "limit": 2, "cursor": params["cursor"]}
+    )
+    assert response.status_code == 400
+
+
+def test_sparse_fieldsets(client: TestClient, db: Session, user: UserModel) -> None:
+    """Only the requested fields are read and returned."""
+    file_id = create_file(client, "a.txt", "text/plain", 1)
+    client.put(f"{FILES_URL}/{file_id}", json={"description": "x" * 1000})
+
+    response = client.get(FILES_URL, params={"fields": "id, filename,id"})
+    assert response.status_code == 200
+    assert response.json() == [{"filename": "a.txt", "id": file_id}]
+
+    response = client.get(f"{FILES_URL}/{file_id}", params={"fields": "size_bytes"})
+    assert response.json() == {"size_bytes": 1}
+    full = client.get(f"{FILES_URL}/{file_id}")
+    assert response.headers["ETag"] != full.headers["ETag"]
+    assert full.json()["description"] == "x" * 1000
+
+    for url in (FILES_URL, f"{FILES_URL}/{file_id}"):
+        assert client.get(url, params={"fields": "id,secret"}).status_code == 422
+        assert client.get(url, params={"fields": ","}).status_code == 422
+
+    db.expunge_all()
+    files = FileService(db).get_multi_by_owner(
+        user.id, sort=FileSort.SIZE_BYTES_DESC, fields=("filename",)
+    )
+    # The sort key is loaded for the cursor; the description never is
+    unloaded = inspect(files[0]).unloaded
+    assert unloaded.isdisjoint({"id", "filename", "size_bytes"})
+    assert {"description", "s3_key", "created_at"} <= unloaded
+
+
+def query_plan(db: Session, statement: Select) -> list[str]:
+    """Get SQLite's query plan for a statement.
+
+    Args:
+        db: Database session.
+        statement: The query.
+
+    Returns:
+        The plan's detail lines.
+    """
+    executed: list[tuple[str, Any]] = []
+
+    def record(conn: Any, cursor: Any, sql: str, parameters: Any, *args: Any) -> None:
+        executed.append((sql, parameters))
+
+    connection = db.connection()
+    event.listen(connection, "before_cursor_execute", record)
+    try:
+        db.execute(statement).all()
+    finally:
+        event.remove(connection, "before_cursor_execute", record)
+    sql, parameters = executed[-1]
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", parameters)
+    return [row.detail for row in rows]
+
+
+LISTING_FILTERS = {
+    "none": FileListFilter(),
+    "status": FileListFilter(status="complete"),
+    "content_type": FileListFilter(content_type="image/"),
+    "size": FileListFilter(min_size=10, max_size=1000),
+    "created": FileListFilter(
+        created_after=datetime(2025, 1, 1, tzinfo=timezone.utc),
+        created_before=datetime(2026, 1, 1, tzinfo=timezone.utc),
+    ),
+    "updated": FileListFilter(
+        updated_after=datetime(2025, 1, 1, tzinfo=timezone.utc),
+        updated_before=datetime(2026, 1, 1, tzinfo=timezone.utc),
+    ),
+    "is_public": FileListFilter(is_public=True),
+    "all": FileListFilter(
+        status="complete",
+        content_type="image/",
+        min_size=10,
+        max_size=1000,
+        created_after=datetime(2025, 1, 1, tzinfo=timezone.utc),
+        updated_before=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        is_public=False,
+    ),
+}
+
+
+@pytest.mark.parametrize("sort", list(FileSort))
+@pytest.mark.parametrize("filter_name", list(LISTING_FILTERS))
+def test_every_listing_searches_an_index(
+    db: Session, user: UserModel, sort: FileSort, filter_name: str
+) -> None:
+    """No combination of filters and sort order scans the file table."""
+    file_service = FileService(db)
+    statement = file_service.owner_files_statement(
+        user.id, LISTING_FILTERS[filter_name], sort
+    )
+    plan = query_plan(db, statement.limit(100))
+
+    assert any(line.startswith("SEARCH file USING") for line in plan), plan
+    assert not any(line.startswith("SCAN file") for line in plan), plan
+    if filter_name == "none":
+        # Pages are read in index order rather than sorted
+        assert not any("TEMP B-TREE" in line for line in plan), plan
@@ -0,0 +1,69 @@
+"""Tests for keyset (cursor) pagination of file listings."""
+
+from fastapi.testclient import TestClient
+
+
+def create_files(client: TestClient, count: int) -> None:
+    """Create files for the test user through the batch endpoint.
+
+    Args:
+        client: The API client.
+        count: Number of files to create.
+    """
+    response = client.post(
+        "/api/v1/files/upload/batch",
+        json=[
+            {"filename": f"f{i}.txt", "content_type": "text/plain", "size_bytes": i}
+            for i in range(count)
+        ],
+    )
+    assert response.status_code == 200
+
+
+def test_cursor_pagination_visits_every_file_once(client: TestClient) -> None:
+    """Following X-Next-Cursor returns every file exactly once, in order."""
+    create_files(client, 25)
+
+    seen: list[dict] = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"limit": 10} if cursor is None else {"limit": 10, "cursor": cursor}
+        response = client.get("/api/v1/files", params=params)
+        assert response.status_code == 200
+        seen.extend(response.json())
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert len({f["id"] for f in seen}) == 25
+    keys = [(f["created_at"], f["id"]) for f in seen]
+    assert keys == sorted(keys)
+
+
+def test_skip_still_works(client: TestClient) -> None:
+    """Offset pagination with skip keeps working for existing clients."""
+    create_files(client, 5)
+
+    everything = client.get("/api/v1/files").json()
+    page = client.get("/api/v1/files", params={"skip": 2, "limit": 2}).json()
+
+    assert [f["id"] for f in page] == [f["id"] for f in everything[2:4]]
+
+
+def test_last_page_has_no_cursor(client: TestClient) -> None:
+    """No cursor is returned once there are no more files."""
+    create_files(client, 3)
+
+    response = client.get("/api/v1/files", params={"limit": 5})
+
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_invalid_cursor_is_rejected(client: TestClient) -> None:
+    """A malformed cursor is a client error."""
+    response = client.get("/api/v1/files", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
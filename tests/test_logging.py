@@ -0,0 +1,77 @@
+"""Tests for queued logging."""
+
+import json
+import logging
+import queue
+from collections.abc import Generator
+
+import pytest
+
+from app.core.config import settings
+from app.core.logging import BoundedQueueHandler, setup_logging, shutdown_logging
+
+
+def make_record(message: str) -> logging.LogRecord:
+    """Build a log record.
+
+    Args:
+        message: The record's message.
+
+    Returns:
+        The record.
+    """
+    return logging.LogRecord("test", logging.INFO, __file__, 1, message, None, None)
+
+
+@pytest.mark.parametrize(
+    ("policy", "kept"), [("drop_new", ["a", "b"]), ("drop_old", ["b", "c"])]
+)
+def test_full_queue_applies_the_drop_policy(policy: str, kept: list[str]) -> None:
+    """A full queue drops the new record or the oldest one, and counts it."""
+    log_queue: queue.Queue = queue.Queue(maxsize=2)
+    handler = BoundedQueueHandler(log_queue, policy)
+    for message in ("a", "b", "c"):
+        handler.handle(make_record(message))
+
+    assert [log_queue.get_nowait().msg for _ in range(2)] == kept
+    assert handler.dropped == 1
+
+
+@pytest.fixture
+def root_logger() -> Generator[logging.Logger, None, None]:
+    """Restore the root logger's handlers and level after a test.
+
+    Yields:
+        The root logger.
+    """
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield root
+    shutdown_logging()
+    root.handlers, root.level = handlers, level
+
+
+def test_queued_records_are_written_by_shutdown(
+    root_logger: logging.Logger,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Records are queued, then written in full by shutdown_logging."""
+    monkeypatch.setattr(settings, "LOG_QUEUE_SIZE", 100)
+    monkeypatch.setattr(settings, "DEBUG", False)
+    setup_logging()
+    assert [type(handler) for handler in root_logger.handlers] == [BoundedQueueHandler]
+
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logging.getLogger("test").exception("Failed for %s", "someone")
+    shutdown_logging()
+
+    assert not any(
+        isinstance(handler, BoundedQueueHandler) for handler in root_logger.handlers
+    )
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    record = next(line for line in lines if line["level"] == "ERROR")
+    assert record["message"] == "Failed for someone"
+    assert "ValueError: boom" in record["exception"]
@@ -0,0 +1,123 @@
+"""Tests for multipart uploads against a moto-mocked S3."""
+
+import pytest
+import requests
+from botocore.client import BaseClient
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.file import File as FileModel
+from app.services.file_service import MIB, choose_part_size, count_parts
+
+
+@pytest.mark.parametrize(
+    ("size_bytes", "part_size", "part_count"),
+    [
+        (0, 8 * MIB, 1),
+        (1, 8 * MIB, 1),
+        (8 * MIB, 8 * MIB, 1),
+        (8 * MIB + 1, 8 * MIB, 2),
+        (100 * 1024 * MIB, 11 * MIB, 9310),
+        (5 * 1024 * 1024 * MIB, 525 * MIB, 9987),
+    ],
+)
+def test_part_size_fits_s3_limits(
+    size_bytes: int, part_size: int, part_count: int
+) -> None:
+    """Parts are at least the minimum size and never more than 10,000."""
+    assert choose_part_size(size_bytes) == part_size
+    assert count_parts(size_bytes) == part_count
+
+
+def test_multipart_upload_lifecycle(
+    client: TestClient, s3: BaseClient, db: Session
+) -> None:
+    """A file uploaded in parallel parts through presigned URLs is assembled in S3."""
+    size_bytes = 9 * MIB
+    content = bytes(range(256)) * (size_bytes // 256)
+
+    initiate = client.post(
+        "/api/v1/files/multipart",
+        json={
+            "filename": "big.bin",
+            "content_type": "application/octet-stream",
+            "size_bytes": size_bytes,
+        },
+    )
+    assert initiate.status_code == 200
+    upload = initiate.json()
+    assert upload["part_size"] == 8 * MIB
+    assert upload["part_count"] == 2
+    file_id = upload["file_id"]
+    file_obj = db.get(FileModel, file_id)
+    assert file_obj is not None
+    assert file_obj.upload_id == upload["upload_id"]
+
+    urls = client.post(
+        f"/api/v1/files/{file_id}/multipart/parts", json={"part_numbers": [1, 2]}
+    )
+    assert urls.status_code == 200
+
+    parts = []
+    for part in urls.json()["parts"]:
+        start = (part["part_number"] - 1) * upload["part_size"]
+        chunk = content[start : start + upload["part_size"]]
+        response = requests.put(part["upload_url"], data=chunk, timeout=10)
+        assert response.status_code == 200
+        parts.append(
+            {"part_number": part["part_number"], "etag": response.headers["ETag"]}
+        )
+
+    complete = client.post(
+        f"/api/v1/files/{file_id}/multipart/complete", json={"parts": parts}
+    )
+    assert complete.status_code == 200
+
+    stored = s3.get_object(Bucket=settings.S3_BUCKET_NAME, Key=file_obj.s3_key)
+    assert stored["Body"].read() == content
+    db.refresh(file_obj)
+    assert file_obj.upload_id is None
+
+
+def test_part_numbers_out_of_range_are_rejected(
+    client: TestClient, s3: BaseClient
+) -> None:
+    """Only parts that belong to the file can be signed."""
+    initiate = client.post(
+        "/api/v1/files/multipart",
+        json={
+            "filename": "a.bin",
+            "content_type": "application/octet-stream",
+            "size_bytes": 10,
+        },
+    )
+    file_id = initiate.json()["file_id"]
+
+    response = client.post(
+        f"/api/v1/files/{file_id}/multipart/parts", json={"part_numbers": [2]}
+    )
+
+    assert response.status_code == 409
+
+
+def test_abort_multipart_upload(
+    client: TestClient, s3: BaseClient, db: Session
+) -> None:
+    """Aborting discards the upload in S3 and deletes the file."""
+    initiate = client.post(
+        "/api/v1/files/multipart",
+        json={
+            "filename": "a.bin",
+            "content_type": "application/octet-stream",
+            "size_bytes": 10,
+        },
+    )
+    file_id = initiate.json()["file_id"]
+
+    response = client.delete(f"/api/v1/files/{file_id}/multipart")
+
+    assert response.status_code == 200
+    assert db.get(FileModel, file_id) is None
+    uploads = s3.list_multipart_uploads(Bucket=settings.S3_BUCKET_NAME)
+    assert not uploads.get("Uploads")
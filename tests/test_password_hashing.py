@@ -0,0 +1,59 @@
+"""Tests for the dedicated password hashing pool and the async login."""
+
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.security import (
+    PasswordHashExecutor,
+    PasswordHashingBusyError,
+    get_password_hash,
+)
+from app.models.user import User as UserModel
+
+
+def test_executor_rejects_jobs_beyond_max_pending() -> None:
+    """Jobs queue up to max_pending, after which new ones are rejected."""
+    executor = PasswordHashExecutor(workers=1, max_pending=2)
+    release = threading.Event()
+
+    async def scenario() -> None:
+        jobs = [asyncio.ensure_future(executor.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        assert executor.stats()["pending"] == 2
+        assert executor.stats()["queued"] == 1
+        with pytest.raises(PasswordHashingBusyError):
+            await executor.run(release.wait)
+
+        release.set()
+        await asyncio.gather(*jobs)
+
+    asyncio.run(scenario())
+    assert executor.stats() == {
+        "workers": 1,
+        "pending": 0,
+        "queued": 0,
+        "max_pending": 2,
+        "rejected": 1,
+    }
+
+
+def test_login_checks_password(
+    client: TestClient, db: Session, user: UserModel
+) -> None:
+    """Logging in returns a token for the right password only."""
+    user.hashed_password = get_password_hash("correct-password")
+    db.commit()
+
+    def login(password: str) -> int:
+        return client.post(
+            "/login/access-token",
+            data={"username": user.email, "password": password},
+        ).status_code
+
+    assert login("correct-password") == 200
+    assert login("wrong-password") == 401
@@ -0,0 +1,175 @@
+"""Tests for the SigV4 presigner, checked against botocore's presigned URLs."""
+
+from datetime import datetime, timezone
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+import boto3
+import pytest
+from botocore.client import BaseClient
+from botocore.config import Config
+
+from app.core.presign import PresignError, S3Presigner, derive_signing_key
+
+REGION = "ap-south-1"
+BUCKET = "we-upload-test"
+MINIO_URL = "http://minio:9000"
+
+
+def make_session(token: str | None = None) -> boto3.session.Session:
+    """Create a session with static test credentials.
+
+    Args:
+        token: Optional session token, as issued for temporary credentials.
+
+    Returns:
+        A boto3 session.
+    """
+    return boto3.session.Session(
+        aws_access_key_id="AKIDEXAMPLE",
+        aws_secret_access_key="wJalrXUtnFEMI/K7MDENG+bPxRfiCYEXAMPLEKEY",  # noqa: S106
+        aws_session_token=token,
+        region_name=REGION,
+    )
+
+
+def signed_at(url: str) -> datetime:
+    """Extract the signing time from a presigned URL.
+
+    Args:
+        url: A presigned URL.
+
+    Returns:
+        The time the URL was signed.
+    """
+    amz_date = parse_qs(urlsplit(url).query)["X-Amz-Date"][0]
+    return datetime.strptime(amz_date, "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def aws_pair() -> tuple[BaseClient, S3Presigner]:
+    """Create a botocore client and presigner for AWS with the same credentials.
+
+    Returns:
+        The client and the presigner.
+    """
+    session = make_session()
+    client = session.client("s3", config=Config(signature_version="s3v4"))
+    return client, S3Presigner(session.get_credentials(), REGION, BUCKET)
+
+
+@pytest.mark.parametrize(
+    ("operation", "method", "params", "headers", "query"),
+    [
+        ("get_object", "GET", {}, {}, {}),
+        (
+            "put_object",
+            "PUT",
+            {"ContentType": "text/plain"},
+            {"Content-Type": "text/plain"},
+            {},
+        ),
+        (
+            "upload_part",
+            "PUT",
+            {"UploadId": "abc~123.xyz", "PartNumber": 7},
+            {},
+            {"uploadId": "abc~123.xyz", "partNumber": 7},
+        ),
+    ],
+)
+@pytest.mark.parametrize(
+    "key",
+    [
+        "owner/file/report.pdf",
+        "owner/file/with spaces & symbols+=?.txt",
+        "owner/file/ünïcødé ☃.bin",
+    ],
+)
+def test_matches_botocore_virtual_host(
+    aws_pair: tuple[BaseClient, S3Presigner],
+    operation: str,
+    method: str,
+    params: dict[str, Any],
+    headers: dict[str, str],
+    query: dict[str, Any],
+    key: str,
+) -> None:
+    """URLs for AWS are byte-for-byte identical to botocore's."""
+    client, presigner = aws_pair
+    expected = client.generate_presigned_url(
+        operation, Params={"Bucket": BUCKET, "Key": key, **params}, ExpiresIn=3600
+    )
+
+    actual = presigner.generate_presigned_url(
+        method,
+        key,
+        expires_in=3600,
+        headers=headers,
+        params=query,
+        signed_at=signed_at(expected),
+    )
+
+    assert actual == expected
+
+
+def test_matches_botocore_path_style_with_session_token() -> None:
+    """URLs for MinIO with temporary credentials match botocore's."""
+    session = make_session(token="session/token+value==")  # noqa: S106
+    client = session.client(
+        "s3", endpoint_url=MINIO_URL, config=Config(s3={"addressing_style": "path"})
+    )
+    presigner = S3Presigner(
+        session.get_credentials(),
+        REGION,
+        BUCKET,
+        endpoint_url=MINIO_URL,
+        addressing_style="path",
+    )
+    expected = client.generate_presigned_url(
+        "put_object",
+        Params={"Bucket": BUCKET, "Key": "a/b c.txt", "ContentType": "image/png"},
+        ExpiresIn=600,
+    )
+
+    actual = presigner.generate_presigned_url(
+        "PUT",
+        "a/b c.txt",
+        expires_in=600,
+        headers={"Content-Type": "image/png"},
+        signed_at=signed_at(expected),
+    )
+
+    assert actual == expected
+
+
+def test_signing_key_is_cached_per_day() -> None:
+    """The derived signing key is only computed once per day and region."""
+    derive_signing_key.cache_clear()
+    presigner = S3Presigner(make_session().get_credentials(), REGION, BUCKET)
+    day = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    for hour in range(10):
+        presigner.generate_presigned_url(
+            "GET", "key", expires_in=60, signed_at=day.replace(hour=hour)
+        )
+
+    info = derive_signing_key.cache_info()
+    assert info.misses == 1
+    assert info.hits == 9
+
+
+def test_missing_credentials_raise() -> None:
+    """Signing without credentials fails with a PresignError."""
+    presigner = S3Presigner(None, REGION, BUCKET)
+
+    with pytest.raises(PresignError):
+        presigner.generate_presigned_url("GET", "key", expires_in=60)
+
+
+def test_expiry_out_of_range_raises() -> None:
+    """S3 doesn't accept URLs valid for more than 7 days."""
+    presigner = S3Presigner(make_session().get_credentials(), REGION, BUCKET)
+
+    with pytest.raises(PresignError):
+        presigner.generate_presigned_url("GET", "key", expires_in=8 * 24 * 60 * 60)
@@ -0,0 +1,50 @@
+"""Tests for the shared S3 client."""
+
+from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core.config import settings
+from app.core.s3 import get_s3_client, reset_s3_client
+from app.services.file_service import FileService
+
+
+@pytest.fixture(autouse=True)
+def fresh_s3_client() -> Generator[None, None, None]:
+    """Make every test start without a cached S3 client.
+
+    Yields:
+        None
+    """
+    reset_s3_client()
+    yield
+    reset_s3_client()
+
+
+def test_get_s3_client_returns_shared_instance() -> None:
+    """The client is built once and reused on every call."""
+    assert get_s3_client() is get_s3_client()
+
+
+def test_get_s3_client_is_thread_safe() -> None:
+    """Concurrent first calls still build a single client."""
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        clients = list(executor.map(lambda _: get_s3_client(), range(64)))
+
+    assert len({id(client) for client in clients}) == 1
+
+
+def test_s3_client_pool_size_comes_from_settings() -> None:
+    """The HTTP connection pool is sized from the settings."""
+    client = get_s3_client()
+
+    assert client.meta.config.max_pool_connections == settings.S3_MAX_POOL_CONNECTIONS
+
+
+def test_file_service_uses_shared_client() -> None:
+    """FileService instances don't build their own client."""
+    first = FileService(db=None)  # type: ignore
+    second = FileService(db=None)  # type: ignore
+
+    assert first.s3_client is second.s3_client is get_s3_client()
@@ -0,0 +1,66 @@
+"""Tests for the outbox of S3 objects waiting to be deleted."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from botocore.client import BaseClient
+from fastapi.testclient import TestClient
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.models.s3_deletion import S3Deletion
+from app.services.s3_deletion_worker import S3DeletionWorker
+
+
+def test_failed_deletes_are_retried_with_backoff(
+    client: TestClient,
+    s3: BaseClient,
+    db: Session,
+    engine: Engine,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Deleting a file queues its object, which is retried until S3 deletes it."""
+    response = client.post(
+        "/api/v1/files/upload",
+        json={"filename": "a.txt", "content_type": "text/plain", "size_bytes": 1},
+    )
+    file_id = response.json()["file_id"]
+    s3_key = client.get(f"/api/v1/files/{file_id}").json()["s3_key"]
+    s3.put_object(Bucket=settings.S3_BUCKET_NAME, Key=s3_key, Body=b"a")
+
+    assert client.delete(f"/api/v1/files/{file_id}").status_code == 200
+    tombstone = db.query(S3Deletion).one()
+    assert tombstone.s3_key == s3_key
+
+    worker = S3DeletionWorker(
+        session_factory=sessionmaker(bind=engine),
+        s3_client=s3,
+        retry_backoff=60,
+        max_retry_backoff=90,
+    )
+    # S3 rejects the delete, since the bucket doesn't exist
+    with monkeypatch.context() as m:
+        m.setattr(settings, "S3_BUCKET_NAME", "missing-bucket")
+        assert worker.run_once() == {"deleted": 0, "failed": 1}
+        db.refresh(tombstone)
+        assert tombstone.attempts == 1
+        assert "NoSuchBucket" in tombstone.last_error
+        assert tombstone.next_attempt_at > datetime.utcnow() + timedelta(seconds=50)
+        # Not due again until the backoff passes
+        assert worker.run_once() == {"deleted": 0, "failed": 0}
+
+        # The doubled backoff is capped at max_retry_backoff
+        tombstone.next_attempt_at = datetime.utcnow()
+        db.commit()
+        assert worker.run_once() == {"deleted": 0, "failed": 1}
+        db.refresh(tombstone)
+        assert tombstone.attempts == 2
+        assert tombstone.next_attempt_at > datetime.utcnow() + timedelta(seconds=80)
+        assert tombstone.next_attempt_at <= datetime.utcnow() + timedelta(seconds=90)
+
+    tombstone.next_attempt_at = datetime.utcnow()
+    db.commit()
+    assert worker.run_once() == {"deleted": 1, "failed": 0}
+    assert db.query(S3Deletion).count() == 0
+    assert "Contents" not in s3.list_objects_v2(Bucket=settings.S3_BUCKET_NAME)
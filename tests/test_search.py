@@ -0,0 +1,96 @@
+"""Tests for full-text search over file names and descriptions."""
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.db.file_search import search_terms
+from app.models.file import File as FileModel
+from app.models.user import User as UserModel
+
+SEARCH_URL = "/api/v1/files/search"
+
+
+def create_file(client: TestClient, filename: str, description: str = "") -> str:
+    """Create a file for the test user.
+
+    Args:
+        client: The API client.
+        filename: The file's name.
+        description: The file's description.
+
+    Returns:
+        The file's ID.
+    """
+    response = client.post(
+        "/api/v1/files/upload",
+        json={
+            "filename": filename,
+            "content_type": "text/plain",
+            "size_bytes": 1,
+            "description": description,
+        },
+    )
+    assert response.status_code == 200
+    return response.json()["file_id"]
+
+
+def test_search_terms_drop_query_syntax() -> None:
+    """Queries are split into plain words, whatever the user typed."""
+    assert search_terms('Q3_Report.pdf "OR" -draft*') == [
+        "q3",
+        "report",
+        "pdf",
+        "or",
+        "draft",
+    ]
+
+
+def test_search_ranks_filename_matches_first(
+    client: TestClient, db: Session, user: UserModel
+) -> None:
+    """Files match on word prefixes, with filename matches ranked higher."""
+    in_name = create_file(client, "quarterly_report.pdf")
+    in_description = create_file(client, "q3.pdf", "the quarterly numbers")
+    create_file(client, "holiday.jpg", "beach")
+    # Other users' files are never found
+    other = FileModel(
+        id="00000000-0000-0000-0000-000000000001",
+        filename="quarterly.txt",
+        s3_key="other/quarterly.txt",
+        content_type="text/plain",
+        size_bytes=1,
+        owner_id="00000000-0000-0000-0000-000000000002",
+    )
+    db.add(other)
+    db.commit()
+
+    found = client.get(SEARCH_URL, params={"q": "quart"}).json()
+    assert [file["id"] for file in found] == [in_name, in_description]
+    assert client.get(SEARCH_URL, params={"q": "quarterly pdf"}).status_code == 200
+    assert client.get(SEARCH_URL, params={"q": "quarterly beach"}).json() == []
+
+    client.put(f"/api/v1/files/{in_description}", json={"description": "beach"})
+    found = client.get(SEARCH_URL, params={"q": "quarterly"}).json()
+    assert [file["id"] for file in found] == [in_name]
+    client.delete(f"/api/v1/files/{in_name}")
+    assert client.get(SEARCH_URL, params={"q": "quarterly"}).json() == []
+
+
+def test_search_pages_follow_the_cursor(client: TestClient) -> None:
+    """Following X-Next-Cursor visits every match once, in rank order."""
+    expected = {create_file(client, f"invoice-{n}.pdf") for n in range(5)}
+
+    seen: list[str] = []
+    params = {"q": "invoice", "limit": 2}
+    while True:
+        response = client.get(SEARCH_URL, params=params)
+        seen += [file["id"] for file in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params["cursor"] = cursor
+    assert len(seen) == len(expected)
+    assert set(seen) == expected
+
+    params["cursor"] = "not-a-cursor"
+    assert client.get(SEARCH_URL, params=params).status_code == 400
@@ -0,0 +1,39 @@
+"""Tests for encoding responses with cached TypeAdapters."""
+
+import json
+import uuid
+from datetime import datetime, timezone
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.serialization import json_response
+from app.models.file import File as FileModel
+from app.schemas.file import FILE_LIST_ADAPTER, File
+
+
+def test_json_response_matches_fastapi_encoding() -> None:
+    """The adapter path encodes files exactly as FastAPI's models did."""
+    owner_id = str(uuid.uuid4())
+    files = [
+        FileModel(
+            id=str(uuid.uuid4()),
+            filename=f"{i}.txt",
+            s3_key=f"{owner_id}/{i}.txt",
+            content_type="text/plain",
+            size_bytes=i,
+            description=None if i else "first",
+            is_public=bool(i),
+            owner_id=owner_id,
+            status="complete",
+            created_at=datetime(2025, 1, 2, 3, 4, 5, 678, tzinfo=timezone.utc),
+            updated_at=datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+        )
+        for i in range(3)
+    ]
+
+    response = json_response(FILE_LIST_ADAPTER, files, {"X-Next-Cursor": "abc"})
+
+    expected = jsonable_encoder([File.model_validate(file) for file in files])
+    assert json.loads(response.body) == expected
+    assert response.media_type == "application/json"
+    assert response.headers["X-Next-Cursor"] == "abc"
@@ -0,0 +1,136 @@
+"""Tests for upload completion tracking and reconciliation."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from botocore.client import BaseClient
+from fastapi.testclient import TestClient
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.models.file import File as FileModel
+from app.models.s3_deletion import S3Deletion
+from app.services.file_service import FileService, UploadIncompleteError
+from app.services.upload_reconciler import UploadReconciler
+
+
+def create_file(client: TestClient, size_bytes: int = 100) -> str:
+    """Request an upload URL for a file.
+
+    Args:
+        client: The API client.
+        size_bytes: The size the client claims.
+
+    Returns:
+        The file's ID.
+    """
+    response = client.post(
+        "/api/v1/files/upload",
+        json={
+            "filename": "a.txt",
+            "content_type": "text/plain",
+            "size_bytes": size_bytes,
+        },
+    )
+    assert response.status_code == 200
+    return response.json()["file_id"]
+
+
+def upload(s3: BaseClient, db: Session, file_id: str, body: bytes) -> None:
+    """Put a file's object in S3, as the client would through its upload URL.
+
+    Args:
+        s3: Mocked S3 client.
+        db: Database session.
+        file_id: The file's ID.
+        body: The file's content.
+    """
+    s3_key = db.get(FileModel, file_id).s3_key
+    s3.put_object(Bucket=settings.S3_BUCKET_NAME, Key=s3_key, Body=body)
+
+
+def test_complete_records_real_size_and_etag(
+    client: TestClient, s3: BaseClient, db: Session
+) -> None:
+    """Completing an upload checks S3 and stores what is actually there."""
+    file_id = create_file(client, size_bytes=100)
+    assert client.get(f"/api/v1/files/{file_id}").json()["status"] == "pending"
+
+    response = client.post(f"/api/v1/files/{file_id}/complete")
+    assert response.status_code == 409
+
+    upload(s3, db, file_id, b"hello")
+    response = client.post(f"/api/v1/files/{file_id}/complete")
+
+    assert response.status_code == 200
+    file = response.json()
+    assert file["status"] == "complete"
+    assert file["size_bytes"] == 5
+    assert file["etag"] == "5d41402abc4b2a76b9719d911017c592"
+
+
+def test_reconciler_settles_pending_uploads(
+    client: TestClient, s3: BaseClient, db: Session, engine: Engine
+) -> None:
+    """Uploaded files become complete and long-missing ones fail."""
+    uploaded, missing, recent = (create_file(client) for _ in range(3))
+    upload(s3, db, uploaded, b"data")
+    # Only the missing file's upload URL has long expired
+    long_ago = datetime.utcnow() - timedelta(days=1)
+    for file_id in (uploaded, missing):
+        db.get(FileModel, file_id).created_at = long_ago
+    db.commit()
+
+    reconciler = UploadReconciler(
+        session_factory=sessionmaker(bind=engine), s3_client=s3, batch_size=1
+    )
+    counts = reconciler.run_once()
+
+    # The recent file is too new to be checked yet
+    assert counts == {"checked": 2, "complete": 1, "failed": 1}
+    statuses = {
+        file_id: client.get(f"/api/v1/files/{file_id}").json()["status"]
+        for file_id in (uploaded, missing, recent)
+    }
+    assert statuses == {uploaded: "complete", missing: "failed", recent: "pending"}
+    listed = {f["id"] for f in client.get("/api/v1/files").json()}
+    assert listed == {uploaded, recent}
+    # The failed upload's declared size no longer counts, even once deleted
+    usage = client.get("/api/v1/users/me/usage").json()
+    assert (usage["file_count"], usage["total_bytes"]) == (2, 104)
+    client.delete(f"/api/v1/files/{missing}")
+    assert client.get("/api/v1/users/me/usage").json()["total_bytes"] == 104
+
+
+def test_uploads_settled_meanwhile_are_counted_once(
+    client: TestClient, s3: BaseClient, db: Session, engine: Engine
+) -> None:
+    """Completing a file the reconciler settled meanwhile leaves usage alone."""
+    uploaded, missing = create_file(client), create_file(client)
+    upload(s3, db, uploaded, b"data")
+    long_ago = datetime.utcnow() - timedelta(days=1)
+    # Loaded before the reconciler runs, as a concurrent request would have
+    stale = {file_id: db.get(FileModel, file_id) for file_id in (uploaded, missing)}
+    for file in stale.values():
+        file.created_at = long_ago
+    db.commit()
+    for file in stale.values():
+        db.refresh(file)
+
+    reconciler = UploadReconciler(
+        session_factory=sessionmaker(bind=engine), s3_client=s3
+    )
+    assert reconciler.run_once() == {"checked": 2, "complete": 1, "failed": 1}
+    # The missing file's object arrives after its upload failed
+    upload(s3, db, missing, b"late")
+
+    file_service = FileService(db, s3_client=s3)
+    assert stale[uploaded].status == "pending"
+    assert file_service.complete_upload(stale[uploaded]).status == "complete"
+    with pytest.raises(UploadIncompleteError):
+        file_service.complete_upload(stale[missing])
+
+    usage = client.get("/api/v1/users/me/usage").json()
+    assert (usage["file_count"], usage["total_bytes"]) == (1, 4)
+    assert db.query(S3Deletion).one().s3_key == stale[missing].s3_key
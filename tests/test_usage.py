@@ -0,0 +1,187 @@
+"""Tests for per-user storage usage counters and the storage quota."""
+
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from botocore.client import BaseClient
+from fastapi.testclient import TestClient
+from httpx import Response
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.models.file import File as FileModel
+from app.models.s3_deletion import S3Deletion
+from app.models.user_usage import UserUsage
+from app.services.file_service import FileService
+from app.services.upload_reconciler import UploadReconciler
+from app.services.usage_service import UsageService
+
+USAGE_URL = f"{settings.API_V1_STR}/users/me/usage"
+
+
+def request_upload(client: TestClient, size_bytes: int) -> Response:
+    """Request an upload URL for a file.
+
+    Args:
+        client: The API client.
+        size_bytes: The size the client claims.
+
+    Returns:
+        The upload response.
+    """
+    return client.post(
+        "/api/v1/files/upload",
+        json={
+            "filename": "a.txt",
+            "content_type": "text/plain",
+            "size_bytes": size_bytes,
+        },
+    )
+
+
+def test_counters_follow_uploads_and_deletes(
+    client: TestClient, s3: BaseClient, db: Session
+) -> None:
+    """Files are counted at their declared size, then at their real size."""
+    assert client.get(USAGE_URL).json() == {
+        "file_count": 0,
+        "total_bytes": 0,
+        "quota_bytes": None,
+    }
+
+    first = request_upload(client, 100).json()["file_id"]
+    request_upload(client, 50)
+    assert client.get(USAGE_URL).json()["total_bytes"] == 150
+
+    s3_key = db.get(FileModel, first).s3_key
+    s3.put_object(Bucket=settings.S3_BUCKET_NAME, Key=s3_key, Body=b"hello")
+    client.post(f"/api/v1/files/{first}/complete")
+    assert client.get(USAGE_URL).json()["total_bytes"] == 55
+
+    client.delete(f"/api/v1/files/{first}")
+    usage = client.get(USAGE_URL).json()
+    assert (usage["file_count"], usage["total_bytes"]) == (1, 50)
+
+
+def test_uploads_beyond_the_quota_are_rejected(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A file that doesn't fit in the remaining quota isn't registered."""
+    monkeypatch.setattr(settings, "USER_QUOTA_BYTES", 100)
+
+    assert request_upload(client, 60).status_code == 200
+    response = request_upload(client, 60)
+    assert response.status_code == 413
+    assert response.json()["detail"] == "Storage quota of 100 bytes exceeded"
+    response = client.post(
+        "/api/v1/files/multipart",
+        json={"filename": "b.bin", "content_type": "text/plain", "size_bytes": 60},
+    )
+    assert response.status_code == 413
+
+    items = client.post(
+        "/api/v1/files/upload/batch",
+        json=[
+            {"filename": "c.txt", "content_type": "text/plain", "size_bytes": 30},
+            {"filename": "d.txt", "content_type": "text/plain", "size_bytes": 30},
+        ],
+    ).json()["items"]
+    assert [item["error"] is None for item in items] == [True, False]
+    assert client.get(USAGE_URL).json() == {
+        "file_count": 2,
+        "total_bytes": 90,
+        "quota_bytes": 100,
+    }
+
+
+def test_uploads_larger_than_declared_cant_exceed_the_quota(
+    client: TestClient, s3: BaseClient, db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Upload URLs sign the declared size, and larger objects fail the upload."""
+    monkeypatch.setattr(settings, "USER_QUOTA_BYTES", 100)
+    response = request_upload(client, 10).json()
+    query = parse_qs(urlsplit(response["upload_url"]).query)
+    assert "content-length" in query["X-Amz-SignedHeaders"][0].split(";")
+
+    # More than declared, as a multipart upload's parts or a proxy could store
+    file_id = response["file_id"]
+    s3_key = db.get(FileModel, file_id).s3_key
+    s3.put_object(Bucket=settings.S3_BUCKET_NAME, Key=s3_key, Body=b"x" * 200)
+    response = client.post(f"/api/v1/files/{file_id}/complete")
+
+    assert response.status_code == 413
+    assert client.get(f"/api/v1/files/{file_id}").json()["status"] == "failed"
+    usage = client.get(USAGE_URL).json()
+    assert (usage["file_count"], usage["total_bytes"]) == (0, 0)
+    assert db.query(S3Deletion).filter(S3Deletion.s3_key == s3_key).count() == 1
+    assert client.post(f"/api/v1/files/{file_id}/complete").status_code == 409
+
+
+def test_reconciler_rejects_uploads_beyond_the_quota(
+    client: TestClient,
+    s3: BaseClient,
+    db: Session,
+    engine: Engine,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Uploads found larger than declared fail if they don't fit in the quota."""
+    monkeypatch.setattr(settings, "USER_QUOTA_BYTES", 100)
+    small, large = (request_upload(client, 10).json()["file_id"] for _ in range(2))
+    # Whichever is checked first, only the small one fits
+    for file_id, body in ((small, b"x" * 30), (large, b"x" * 95)):
+        s3_key = db.get(FileModel, file_id).s3_key
+        s3.put_object(Bucket=settings.S3_BUCKET_NAME, Key=s3_key, Body=body)
+
+    reconciler = UploadReconciler(
+        session_factory=sessionmaker(bind=engine), s3_client=s3, min_age=0
+    )
+    assert reconciler.run_once() == {"checked": 2, "complete": 1, "failed": 1}
+
+    usage = client.get(USAGE_URL).json()
+    assert (usage["file_count"], usage["total_bytes"]) == (1, 30)
+    assert client.get(f"/api/v1/files/{small}").json()["status"] == "complete"
+    assert client.get(f"/api/v1/files/{large}").json()["status"] == "failed"
+
+
+def test_recompute_repairs_the_counters(client: TestClient, db: Session) -> None:
+    """Recomputing rebuilds the counters from the files, except failed uploads."""
+    request_upload(client, 10)
+    request_upload(client, 20)
+    failed = request_upload(client, 40).json()["file_id"]
+    db.get(FileModel, failed).status = "failed"
+    db.query(UserUsage).update({"file_count": 7, "total_bytes": 0})
+    db.commit()
+
+    assert UsageService(db).recompute() == 1
+    usage = client.get(USAGE_URL).json()
+    assert (usage["file_count"], usage["total_bytes"]) == (2, 30)
+
+
+def test_changes_to_files_settled_meanwhile_count_their_current_size(
+    client: TestClient, s3: BaseClient, db: Session, engine: Engine
+) -> None:
+    """Usage changes use the size a file has when it is changed, not when loaded."""
+    updated = request_upload(client, 100).json()["file_id"]
+    deleted = request_upload(client, 100).json()["file_id"]
+    # Loaded before the reconciler runs, as by a concurrent request
+    stale = [db.get(FileModel, file_id) for file_id in (updated, deleted)]
+    for file in stale:
+        file.created_at = datetime.utcnow() - timedelta(days=1)
+        s3.put_object(Bucket=settings.S3_BUCKET_NAME, Key=file.s3_key, Body=b"hello")
+    db.commit()
+    for file in stale:
+        db.refresh(file)
+    reconciler = UploadReconciler(
+        session_factory=sessionmaker(bind=engine), s3_client=s3
+    )
+    assert reconciler.run_once()["complete"] == 2
+
+    file_service = FileService(db, s3_client=s3)
+    assert stale[0].size_bytes == 100
+    file_service.update(stale[0], {"size_bytes": 10})
+    file_service.delete_record(stale[1])
+
+    usage = client.get(USAGE_URL).json()
+    assert (usage["file_count"], usage["total_bytes"]) == (1, 10)